@@ -17,9 +17,11 @@ if root_dir not in sys.path:
     sys.path.append(root_dir)
 
 # Importation de vos modules NLP situés dans /app/src/
-from src.matching import TalentSearcher
-from src.agent import extract_skills, generate_summary, score_with_context
+from src.profile_store import update_agent_scores
+from src.enrichment_store import EnrichmentStore, aanalyse_with_store
+from src.query_cache import DEFAULT_MAX_ENTRIES, QueryEmbeddingCache
 from api.model_manager import ModelManager
+from api.searcher_manager import SearcherManager
 
 # Configuration MLflow
 MLFLOW_TRACKING_URI = os.getenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
@@ -36,28 +38,24 @@ app.add_middleware(
 )
 
 # --- 2. INITIALISATION ET CHARGEMENT DES DONNÉES ---
-# Le chemin pointe vers /app/data/processed/profiles_enriched.csv
-PROFILES_PATH = os.path.join(root_dir, "data", "processed", "profiles_enriched.csv")
-full_profiles_df = pd.DataFrame() 
+# Cache LRU des embeddings de requêtes, partagé par la recherche et /predict
+query_cache = QueryEmbeddingCache(
+    max_entries=int(os.getenv("QUERY_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+    ttl_seconds=float(os.getenv("QUERY_CACHE_TTL", 0)) or None,
+)
 
-def load_data():
-    global full_profiles_df
-    try:
-        if os.path.exists(PROFILES_PATH):
-            full_profiles_df = pd.read_csv(PROFILES_PATH)
-            print(f"[OK] {len(full_profiles_df)} profils chargés depuis {PROFILES_PATH}")
-        else:
-            print(f"[AVERTISSEMENT] Fichier non trouvé : {PROFILES_PATH}")
-            full_profiles_df = pd.DataFrame()
-    except Exception as e:
-        print(f"[ERREUR] Échec du chargement CSV : {e}")
+# Compétences / résumés LLM déjà calculés (par hash du texte du profil)
+enrichment_store = EnrichmentStore()
 
-# Chargement au démarrage
-load_data()
-searcher = TalentSearcher()
+# Index de recherche rechargeable à chaud (version courante de data/processed/index/),
+# avec les textes des profils (/agent_search) chargés et basculés en même temps
+searcher_manager = SearcherManager(
+    query_cache=query_cache,
+    watch_interval=float(os.getenv("INDEX_WATCH_INTERVAL", 0)),
+)
 
 # Initialisation du gestionnaire de modèles avec versioning MLflow
-model_manager = ModelManager(mlflow_tracking_uri=MLFLOW_TRACKING_URI)
+model_manager = ModelManager(mlflow_tracking_uri=MLFLOW_TRACKING_URI, query_cache=query_cache)
 try:
     model_manager.load_latest_model()
     print("[API] Modèle MLflow chargé avec succès")
@@ -71,6 +69,10 @@ class SearchRequest(BaseModel):
     min_stars: Optional[int] = 0
     language_filter: Optional[str] = None
 
+class BatchSearchRequest(BaseModel):
+    queries: List[SearchRequest]
+    exact: bool = False  # True = recherche exacte (sans index ni premier tri approché)
+
 class PredictRequest(BaseModel):
     text: str
     model_version: Optional[str] = None  # Version du modèle (None = dernière)
@@ -80,6 +82,9 @@ class SimilarityRequest(BaseModel):
     text2: str
     model_version: Optional[str] = None
 
+class IndexReloadRequest(BaseModel):
+    version: Optional[str] = None  # Version publiée (None = version courante)
+
 # --- 4. ENDPOINTS ---
 
 @app.get("/")
@@ -88,10 +93,15 @@ async def root():
 
 @app.post("/agent_search")
 async def agent_search(payload: SearchRequest):
-    global full_profiles_df
-
-    # Lancement de la recherche via le module src.matching
-    results_df = searcher.search(
+    # Index et textes des profils de la même version, même si un
+    # rechargement bascule pendant la requête
+    snapshot = searcher_manager.snapshot
+
+    # Lancement de la recherche via le module src.matching, dans un thread :
+    # encodage de la requête et parcours de la matrice ne bloquent pas la
+    # boucle d'événements (seuls les appels LLM attendus occupent la requête)
+    results_df = await asyncio.to_thread(
+        snapshot.searcher.search,
         job_description=payload.job_description,
         top_k=payload.top_k,
         min_stars=payload.min_stars,
@@ -106,54 +116,73 @@ async def agent_search(payload: SearchRequest):
     records = results_df.to_dict(orient="records")
     enriched_results = []
 
+    # Textes complets des profils trouvés (pour l'enrichissement IA)
+    full_texts = {r['login']: snapshot.profile_texts[r['login']] for r in records if r['login'] in snapshot.profile_texts}
+
+    async def analyse(r):
+        """Compétences, résumé (store) et score d'un candidat, en un appel LLM si possible"""
+        analysis = await aanalyse_with_store(full_texts[r['login']], payload.job_description, enrichment_store)
+        r["ai_skills"] = analysis["skills"]
+        r["ai_summary"] = analysis["summary"]
+        if analysis["score"] is None:
+            # Pas de score lisible : similarité de la recherche (plus de 0.0 silencieux)
+            print(f"[ATTENTION] Score IA indisponible pour {r.get('login')}, similarité utilisée")
+            r["agent_score"] = float(r.get("similarity", 0.0))
+        else:
+            r["agent_score"] = float(analysis["score"])
+
     for r in records:
         # Sécurité pour les valeurs non-compatibles JSON (NaN/Inf)
         for key, value in r.items():
             if isinstance(value, float) and (pd.isna(value) or value == float('inf')):
                 r[key] = 0.0
-
-        # Récupération du profil complet pour enrichissement IA
-        if not full_profiles_df.empty:
-            profile_row = full_profiles_df[full_profiles_df['login'] == r['login']]
-            
-            if not profile_row.empty:
-                full_text = str(profile_row['profile_text'].values[0])
-                try:
-                    # Appels aux fonctions de src.agent
-                    r["ai_skills"] = extract_skills(full_text)
-                    r["ai_summary"] = generate_summary(full_text)
-                    
-                    score = score_with_context(
-                        {"skills": r["ai_skills"], "raw_text": full_text}, 
-                        payload.job_description
-                    )
-                    r["agent_score"] = float(score)
-                except Exception as e:
-                    print(f"[INFO] Erreur IA pour {r.get('login')}: {e}")
-                    r["ai_skills"] = []
-                    r["ai_summary"] = "Analyse indisponible"
-                    r["agent_score"] = float(r.get("similarity", 0.0))
-        
         enriched_results.append(r)
 
+    # Candidats analysés en parallèle (appels LLM bornés par LLM_CONCURRENCY,
+    # LLM_TIMEOUT par appel) : la latence est celle du candidat le plus lent,
+    # et la boucle d'événements reste libre pour les autres requêtes
+    await asyncio.gather(*(analyse(r) for r in enriched_results if r['login'] in full_texts))
+
     # Tri par score d'agent (IA)
     enriched_results.sort(key=lambda x: x.get("agent_score", 0), reverse=True)
 
-    # Mise à jour optionnelle du CSV (Traçabilité demandée dans le cahier des charges)
+    # Sauvegarde des scores (Traçabilité demandée dans le cahier des charges)
+    # dans agent_scores.parquet, lu par src/eval_metrics.py
     try:
-        for r in enriched_results:
-            if not full_profiles_df.empty:
-                full_profiles_df.loc[full_profiles_df['login'] == r['login'], 'agent_score'] = r['agent_score']
-        
-        # On s'assure que le dossier existe avant de sauvegarder
-        os.makedirs(os.path.dirname(PROFILES_PATH), exist_ok=True)
-        full_profiles_df.to_csv(PROFILES_PATH, index=False)
+        scores = {r['login']: r['agent_score'] for r in enriched_results if 'agent_score' in r}
+        if scores:
+            await asyncio.to_thread(update_agent_scores, scores)
     except Exception as e:
         print(f"[ERREUR] Impossible de sauvegarder les scores : {e}")
 
     return {"results": enriched_results}
 
 
+@app.post("/search/batch")
+async def search_batch(payload: BatchSearchRequest):
+    """
+    Recherche groupée : plusieurs descriptions de poste (chacune avec ses
+    filtres et son top_k), encodées et scorées ensemble. Pas d'enrichissement
+    IA (cf. /agent_search) : une liste de profils par requête, dans l'ordre.
+    """
+    try:
+        # Dans un thread, comme /agent_search : la boucle d'événements reste libre
+        results = await asyncio.to_thread(
+            searcher_manager.searcher.search_many,
+            [query.model_dump() for query in payload.queries],
+            exact=payload.exact,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    batch = []
+    for results_df in results:
+        # Nettoyage des données pour JSON (NaN/Inf)
+        results_df = results_df.replace([float("inf"), float("-inf")], 0.0).fillna(0.0)
+        batch.append(results_df.to_dict(orient="records"))
+    return {"results": batch}
+
+
 @app.post("/predict")
 async def predict(payload: PredictRequest):
     """
@@ -212,6 +241,51 @@ async def get_model_info():
     return model_manager.get_model_info()
 
 
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Statistiques du cache des embeddings de requêtes (taille, hits, misses, taux de hit)
+    """
+    return query_cache.stats()
+
+
+@app.post("/index/reload", status_code=202)
+async def reload_index(payload: Optional[IndexReloadRequest] = None):
+    """
+    Recharge l'index de recherche (version publiée par src/embedding.py)
+    en arrière-plan, puis bascule : les requêtes en cours terminent sur
+    l'ancienne version. Suivi via GET /index/info.
+    """
+    version = payload.version if payload else None
+    try:
+        started = searcher_manager.reload(version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not started:
+        raise HTTPException(status_code=409, detail="Rechargement de l'index déjà en cours")
+    return {
+        "message": "Rechargement de l'index lancé",
+        "version": version or "courante",
+        "status": "reloading"
+    }
+
+
+@app.get("/index/info")
+async def get_index_info():
+    """
+    Version de l'index servie, version courante publiée, état du rechargement
+    """
+    return searcher_manager.get_index_info()
+
+
+@app.get("/enrichment/stats")
+async def get_enrichment_stats():
+    """
+    Statistiques du store des enrichissements LLM (entrées de la version courante, hits, misses)
+    """
+    return enrichment_store.stats()
+
+
 @app.post("/models/load/{version}")
 async def load_model_version(version: str):
     """
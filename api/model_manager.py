@@ -9,24 +9,46 @@ from typing import Optional, Dict
 import pandas as pd
 import numpy as np
 
+from src.query_cache import QueryEmbeddingCache
+
+DEFAULT_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
 
 class ModelManager:
     """
     Gestionnaire pour charger et gérer les versions de modèles depuis MLflow
     """
     
-    def __init__(self, mlflow_tracking_uri: str = "http://localhost:5000"):
+    def __init__(
+        self,
+        mlflow_tracking_uri: str = "http://localhost:5000",
+        query_cache: Optional[QueryEmbeddingCache] = None,
+    ):
         """
         Initialise le gestionnaire de modèles
         
         Args:
             mlflow_tracking_uri: URI du serveur MLflow
+            query_cache: Cache des embeddings de requêtes (partagé avec la recherche)
         """
         self.mlflow_tracking_uri = mlflow_tracking_uri
         mlflow.set_tracking_uri(mlflow_tracking_uri)
         self.current_model: Optional[SentenceTransformer] = None
         self.current_model_version: Optional[str] = None
         self.model_cache: Dict[str, SentenceTransformer] = {}
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
+
+    def _version_key(self, model_version: Optional[str] = None) -> str:
+        """Clé de version pour le cache des requêtes (nom du modèle par défaut)"""
+        return model_version or self.current_model_version or DEFAULT_MODEL_NAME
+
+    def _set_current_model(self, model: SentenceTransformer, version: Optional[str]):
+        """Change le modèle courant et invalide les embeddings de l'ancien"""
+        previous = self._version_key()
+        self.current_model = model
+        self.current_model_version = version
+        if self._version_key() != previous:
+            self.query_cache.invalidate(previous)
     
     def load_latest_model(self, model_name: str = "embedding_model") -> SentenceTransformer:
         """
@@ -67,8 +89,7 @@ class ModelManager:
                 print(f"[ModelManager] Chargement du modèle depuis: {model_uri}")
                 
                 model = mlflow.sentence_transformers.load_model(model_uri)
-                self.current_model = model
-                self.current_model_version = latest_run_id
+                self._set_current_model(model, latest_run_id)
                 self.model_cache[latest_run_id] = model
                 
                 print(f"[ModelManager] Modèle chargé avec succès (version: {latest_run_id})")
@@ -115,7 +136,7 @@ class ModelManager:
         """
         if self.current_model is None:
             print("[ModelManager] Chargement du modèle par défaut")
-            self.current_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+            self._set_current_model(SentenceTransformer(DEFAULT_MODEL_NAME), None)
         return self.current_model
     
     def get_model_info(self) -> Dict:
@@ -125,7 +146,8 @@ class ModelManager:
         return {
             "model_version": self.current_model_version or "default",
             "mlflow_tracking_uri": self.mlflow_tracking_uri,
-            "cached_versions": list(self.model_cache.keys())
+            "cached_versions": list(self.model_cache.keys()),
+            "query_cache": self.query_cache.stats()
         }
     
     def predict_embedding(self, text: str, model_version: Optional[str] = None) -> np.ndarray:
@@ -141,15 +163,21 @@ class ModelManager:
         """
         if model_version:
             model = self.load_model_version(model_version)
+            if self.model_cache.get(model_version) is not model:
+                # Version introuvable : repli sur le modèle courant, dont la
+                # clé est utilisée pour le cache des requêtes
+                model_version = None
         else:
             if self.current_model is None:
                 model = self.load_latest_model()
             else:
                 model = self.current_model
         
-        embedding = model.encode(
+        # Cache des requêtes : pas de ré-encodage d'un texte déjà vu
+        embedding = self.query_cache.encode(
+            model,
+            self._version_key(model_version),
             [text],
-            convert_to_numpy=True,
             normalize_embeddings=True
         )[0]
         
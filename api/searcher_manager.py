@@ -0,0 +1,161 @@
+"""
+Gestionnaire de l'index de recherche : rechargement à chaud des versions
+publiées dans data/processed/index/ (cf. src/index_registry.py)
+"""
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from src.index_registry import current_version, read_manifest, resolve_index_dir
+from src.matching import TalentSearcher
+from src.profile_store import PROFILES_STORE_PATH, read_profiles
+from src.query_cache import QueryEmbeddingCache
+
+WARMUP_QUERY = "Senior Python backend engineer"
+
+
+class IndexSnapshot(NamedTuple):
+    """Version servie : l'index et les textes de ses profils, basculés ensemble"""
+    searcher: TalentSearcher
+    profile_texts: Dict[str, str]
+
+
+def load_profile_texts(searcher: TalentSearcher) -> Dict[str, str]:
+    """
+    login -> profile_text (store des profils) des logins de l'index, lus
+    par /agent_search pour l'analyse IA. {} si le store est absent.
+    """
+    try:
+        profiles = read_profiles(columns=["login", "profile_text"])
+    except FileNotFoundError:
+        print(f"[AVERTISSEMENT] Fichier non trouvé : {PROFILES_STORE_PATH}")
+        return {}
+    logins = set(searcher.index_table.column("login").to_pylist())
+    profiles = profiles[profiles["login"].isin(logins)]
+    texts = dict(zip(profiles["login"], profiles["profile_text"].astype(str)))
+    print(f"[OK] {len(texts)} textes de profils chargés depuis {PROFILES_STORE_PATH}")
+    return texts
+
+
+class SearcherManager:
+    """
+    Garde le TalentSearcher servi (et les textes de ses profils) et le
+    remplace sans interruption : la nouvelle version est chargée et
+    préchauffée dans un thread, puis le snapshot est basculé en une
+    affectation. Les requêtes en cours terminent sur l'ancien (libéré quand
+    plus personne ne l'utilise).
+    """
+
+    def __init__(
+        self,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        watch_interval: float = 0.0,
+        **searcher_kwargs,
+    ):
+        """
+        Charge la version courante (bloquant, au démarrage de l'API)
+
+        Args:
+            query_cache: Cache des embeddings de requêtes (partagé avec /predict)
+            watch_interval: Période (s) de surveillance du fichier CURRENT,
+                0 = rechargement uniquement via reload(). Nécessaire avec
+                plusieurs workers : chacun recharge de lui-même.
+            searcher_kwargs: Arguments passés à TalentSearcher (storage, index...)
+        """
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
+        self.searcher_kwargs = searcher_kwargs
+        self.version = current_version()
+        searcher = TalentSearcher(
+            query_cache=self.query_cache,
+            index_dir=resolve_index_dir(self.version),
+            **searcher_kwargs,
+        )
+        self.snapshot = IndexSnapshot(searcher, load_profile_texts(searcher))
+        self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.last_error: Optional[str] = None
+        self._reload_lock = threading.Lock()  # un seul rechargement à la fois
+
+        if watch_interval > 0:
+            threading.Thread(target=self._watch, args=(watch_interval,), daemon=True).start()
+
+    @property
+    def searcher(self) -> TalentSearcher:
+        return self.snapshot.searcher
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def reload(self, version: Optional[str] = None) -> bool:
+        """
+        Lance le chargement de `version` (défaut : version courante) en
+        arrière-plan. Lève ValueError si la version n'existe pas ; retourne
+        False si un rechargement est déjà en cours.
+        """
+        version = version or current_version()
+        index_dir = resolve_index_dir(version)
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        threading.Thread(target=self._load, args=(version, index_dir), daemon=True).start()
+        return True
+
+    def _load(self, version: Optional[str], index_dir: str):
+        """Charge, préchauffe puis bascule (appelé avec _reload_lock acquis)"""
+        try:
+            start = time.perf_counter()
+            print(f"[INFO] Rechargement de l'index : version {version} ({index_dir})")
+            current = self.searcher
+            model_name = read_manifest(version).get("model_name", current.model_name) if version else current.model_name
+            searcher = TalentSearcher(
+                query_cache=self.query_cache,
+                index_dir=index_dir,
+                # Même modèle : pas de rechargement (ni de mémoire en double)
+                model=current.model if model_name == current.model_name else None,
+                **{**self.searcher_kwargs, "model_name": model_name},
+            )
+            # Préchauffage : la première recherche lit les pages des memmaps,
+            # avant que la version ne reçoive du trafic
+            searcher.search(WARMUP_QUERY, top_k=1)
+            profile_texts = load_profile_texts(searcher)
+
+            self.snapshot = IndexSnapshot(searcher, profile_texts)
+            self.version = version
+            self.loaded_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.last_error = None
+            print(f"[OK] Index version {version} servi ({searcher.n_profiles} profils, "
+                  f"{time.perf_counter() - start:.1f} s)")
+        except Exception as e:
+            # L'ancienne version reste servie
+            self.last_error = f"version {version} : {e}"
+            print(f"[ERREUR] Échec du rechargement de l'index, version {version} : {e}")
+        finally:
+            self._reload_lock.release()
+
+    def _watch(self, interval: float):
+        """Recharge dès que CURRENT désigne une autre version"""
+        while True:
+            time.sleep(interval)
+            try:
+                version = current_version()
+                if version is not None and version != self.version and not self.reloading:
+                    if self.last_error and self.last_error.startswith(f"version {version} "):
+                        continue  # déjà en échec : pas de nouvel essai en boucle
+                    self.reload(version)
+            except Exception as e:
+                print(f"[ERREUR] Surveillance de l'index : {e}")
+
+    def get_index_info(self) -> Dict:
+        """
+        Retourne les informations sur l'index servi
+        """
+        searcher = self.searcher
+        return {
+            "version": self.version or "data/processed",
+            "current_version": current_version(),
+            "index_dir": searcher.index_dir,
+            "n_profiles": searcher.n_profiles,
+            "model_name": searcher.model_name,
+            "loaded_at": self.loaded_at,
+            "reloading": self.reloading,
+            "last_error": self.last_error,
+        }
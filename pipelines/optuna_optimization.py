@@ -36,9 +36,11 @@ def objective(trial: optuna.Trial) -> float:
         })
         
         # Exécution du pipeline avec ces hyperparamètres
+        # L'enrichissement LLM ne dépend pas des hyperparamètres : pas à chaque essai
         pipeline_instance = nlp_training_pipeline(
             model_name=model_name,
-            batch_size=batch_size
+            batch_size=batch_size,
+            enrich_workers=0
         )
         
         metrics = pipeline_instance.run()
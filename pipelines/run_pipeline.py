@@ -39,6 +39,12 @@ if __name__ == "__main__":
         default=10,
         help="Nombre d'essais pour Optuna (mode optimize uniquement)"
     )
+    parser.add_argument(
+        "--enrich-workers",
+        type=int,
+        default=4,
+        help="Appels Ollama en parallèle pour l'enrichissement LLM (0 = étape sautée)"
+    )
     
     args = parser.parse_args()
     
@@ -46,7 +52,8 @@ if __name__ == "__main__":
         print("[PIPELINE] Mode: Entraînement simple")
         pipeline_instance = nlp_training_pipeline(
             model_name=args.model_name,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            enrich_workers=args.enrich_workers
         )
         metrics = pipeline_instance.run()
         print(f"[PIPELINE] Métriques finales: {metrics}")
@@ -1,12 +1,12 @@
 """
 Pipeline ZenML pour l'entraînement du modèle NLP
-Étapes : Chargement ➡️ Prétraitement ➡️ Entraînement ➡️ Évaluation
+Étapes : Chargement ➡️ Prétraitement ➡️ Enrichissement LLM ➡️ Entraînement ➡️ Évaluation
 """
 import os
 import sys
 import pandas as pd
 import numpy as np
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics import mean_absolute_error
 import mlflow
@@ -17,6 +17,12 @@ from zenml.integrations.mlflow.mlflow_step_decorator import enable_mlflow
 # Ajouter le répertoire racine au path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.embedding_cache import EmbeddingCache, encode_with_cache
+from src.enrichment_store import EnrichmentStore, enrich_corpus
+from src.agent import ENRICHMENT_VERSION
+from src.profiles import build_profiles_df
+from src.profile_store import PROFILES_STORE_PATH, read_profiles
+
 
 @step(enable_cache=False)
 def load_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -46,82 +52,51 @@ def preprocess_data(users_df: pd.DataFrame, repos_df: pd.DataFrame) -> pd.DataFr
     """
     print("[STEP: Preprocess] Début du prétraitement...")
     
-    # Nettoyage des utilisateurs
-    users_cols = [
-        "login", "name", "company", "location", "bio",
-        "followers", "public_repos", "public_gists"
-    ]
-    users_df = users_df[[c for c in users_cols if c in users_df.columns]].copy()
-    users_df = users_df.fillna("")
-    
-    # Agrégation des repos par utilisateur
-    repos_df["description"] = repos_df["description"].fillna("")
-    repos_df["language"] = repos_df["language"].fillna("")
-    repos_df["stargazers_count"] = pd.to_numeric(
-        repos_df.get("stargazers_count", 0), errors="coerce"
-    ).fillna(0)
-    
-    # Texte concaténé des descriptions
-    agg_desc = repos_df.groupby("owner_login")["description"].apply(
-        lambda x: " . ".join([d for d in x if isinstance(d, str) and d.strip() != ""])
-    )
+    # Nettoyage, agrégation des repos, fusion et texte profil (vectorisés)
+    merged_df = build_profiles_df(users_df, repos_df, repos_label="Number of repositories")
     
-    # Liste des langages
-    agg_lang = repos_df.groupby("owner_login")["language"].apply(
-        lambda x: ", ".join(sorted(set([l for l in x if isinstance(l, str) and l.strip() != ""])))
-    )
+    print(f"[STEP: Preprocess] {len(merged_df)} profils enrichis créés")
     
-    # Total de stars et nombre de repos
-    agg_stars = repos_df.groupby("owner_login")["stargazers_count"].sum()
-    agg_nb_repos = repos_df.groupby("owner_login")["repo_name"].count()
-    
-    repos_agg_df = pd.DataFrame({
-        "login": agg_desc.index,
-        "repos_descriptions": agg_desc.values,
-        "languages_list": agg_lang.reindex(agg_desc.index).fillna(""),
-        "total_stars": agg_stars.reindex(agg_desc.index).fillna(0).astype(int),
-        "nb_repos_fetched": agg_nb_repos.reindex(agg_desc.index).fillna(0).astype(int),
-    })
-    
-    # Fusion users + repos
-    merged_df = pd.merge(
-        users_df,
-        repos_agg_df,
-        on="login",
-        how="inner",
-    )
+    return merged_df
+
+
+@step(enable_cache=False)
+@enable_mlflow
+def enrich_profiles(processed_df: pd.DataFrame, workers: int = 4) -> Dict[str, float]:
+    """
+    Étape 2b : Enrichissement LLM hors ligne (compétences + résumé)
+    Précalcule pour tout le corpus ce que lit /agent_search (cf.
+    src/enrichment_store.py) : seuls les profils dont le texte a changé
+    depuis le dernier run sont envoyés à Ollama, par `workers` appels en
+    parallèle, avec reprise après interruption.
+    Textes du store des profils, ceux que sert l'API (et non ceux de
+    preprocess_data, construits avec un autre libellé : hashes différents).
+    processed_df place l'étape après le prétraitement. Sans store (pas de
+    src/build_profiles.py), l'étape est sautée : l'API n'a aucun texte à analyser.
+    """
+    try:
+        texts = read_profiles(columns=["profile_text"])["profile_text"].astype(str).tolist()
+    except FileNotFoundError:
+        print(f"[AVERTISSEMENT] Store des profils absent ({PROFILES_STORE_PATH}), enrichissement sauté "
+              "(lancer src/build_profiles.py)")
+        return {}
+    print(f"[STEP: Enrich] Enrichissement de {len(texts)} profils ({workers} workers)...")
     
-    # Construction du texte profil
-    def build_profile_text(row):
-        parts = []
-        if row.get("name"):
-            parts.append(str(row["name"]))
-        if row.get("bio"):
-            parts.append(str(row["bio"]))
-        if row.get("company"):
-            parts.append(f"Company: {row['company']}")
-        if row.get("location"):
-            parts.append(f"Location: {row['location']}")
-        if row.get("languages_list"):
-            parts.append(f"Languages: {row['languages_list']}")
-        if row.get("nb_repos_fetched", 0) > 0:
-            parts.append(f"Number of repositories: {row['nb_repos_fetched']}")
-        if row.get("total_stars", 0) > 0:
-            parts.append(f"Total stars: {row['total_stars']}")
-        if row.get("repos_descriptions"):
-            parts.append(f"Projects: {row['repos_descriptions']}")
-        
-        text = " . ".join([p for p in parts if isinstance(p, str) and p.strip() != ""])
-        return text
-    
-    merged_df["profile_text"] = merged_df.apply(build_profile_text, axis=1)
-    merged_df = merged_df[merged_df["profile_text"].str.strip() != ""].copy()
-    merged_df["total_stars"] = pd.to_numeric(merged_df["total_stars"], errors="coerce").fillna(0).astype(int)
-    merged_df = merged_df.sort_values("total_stars", ascending=False)
+    mlflow.log_param("enrichment_version", ENRICHMENT_VERSION)
+    mlflow.log_param("enrichment_workers", workers)
     
-    print(f"[STEP: Preprocess] {len(merged_df)} profils enrichis créés")
+    store = EnrichmentStore()
+    stats = enrich_corpus(texts, store, workers=workers)
+    store.close()
     
-    return merged_df
+    # Débit : profils enrichis / s et tokens (prompt + réponse) / s
+    for key, value in stats.items():
+        mlflow.log_metric(f"enrichment_{key}", value)
+    
+    print(f"[STEP: Enrich] {stats['enriched']} enrichis, {stats['skipped']} inchangés, "
+          f"{stats['failed']} échecs ({stats['profiles_per_s']:.2f} profils/s, {stats['tokens_per_s']:.0f} tokens/s)")
+    
+    return stats
 
 
 @step(enable_cache=False)
@@ -129,16 +104,23 @@ def preprocess_data(users_df: pd.DataFrame, repos_df: pd.DataFrame) -> pd.DataFr
 def train_model(
     processed_df: pd.DataFrame,
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
-    batch_size: int = 32
+    batch_size: int = 32,
+    use_embedding_cache: bool = True,
+    token_budget: Optional[int] = None
 ) -> Tuple[SentenceTransformer, np.ndarray]:
     """
     Étape 3 : Entraînement (génération des embeddings)
+    Les profils déjà encodés avec ce modèle sont lus dans le cache
+    d'embeddings (cf. src/embedding_cache.py). Si token_budget est fourni,
+    les lots sont construits par longueur de tokens (cf. src/encoding.py)
+    et batch_size est ignoré.
     """
     print(f"[STEP: Train] Chargement du modèle : {model_name}")
     
     # Log des hyperparamètres dans MLflow
     mlflow.log_param("model_name", model_name)
     mlflow.log_param("batch_size", batch_size)
+    mlflow.log_param("token_budget", token_budget)
     mlflow.log_param("num_profiles", len(processed_df))
     
     # Chargement du modèle
@@ -148,13 +130,21 @@ def train_model(
     texts = processed_df["profile_text"].astype(str).tolist()
     print(f"[STEP: Train] Encodage de {len(texts)} profils...")
     
-    embeddings = model.encode(
+    cache = EmbeddingCache() if use_embedding_cache else None
+    embeddings = encode_with_cache(
+        model,
         texts,
+        model_name,
+        cache=cache,
         batch_size=batch_size,
-        show_progress_bar=True,
-        convert_to_numpy=True,
         normalize_embeddings=True,
+        token_budget=token_budget,
     )
+    if cache is not None:
+        cache.report()
+        mlflow.log_metric("embedding_cache_hits", cache.hits)
+        mlflow.log_metric("embedding_cache_misses", cache.misses)
+        cache.close()
     
     print(f"[STEP: Train] Embeddings générés : shape {embeddings.shape}")
     
@@ -231,10 +221,13 @@ def evaluate_model(
 @pipeline(enable_cache=False)
 def nlp_training_pipeline(
     model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
-    batch_size: int = 32
+    batch_size: int = 32,
+    token_budget: Optional[int] = None,
+    enrich_workers: int = 4
 ):
     """
     Pipeline complet d'entraînement NLP
+    enrich_workers : appels Ollama en parallèle pour l'enrichissement (0 = étape sautée)
     """
     # Chargement des données
     users_df, repos_df = load_data()
@@ -242,8 +235,12 @@ def nlp_training_pipeline(
     # Prétraitement
     processed_df = preprocess_data(users_df, repos_df)
     
+    # Enrichissement LLM (compétences, résumés) lu par /agent_search
+    if enrich_workers > 0:
+        enrich_profiles(processed_df, enrich_workers)
+    
     # Entraînement
-    model, embeddings = train_model(processed_df, model_name, batch_size)
+    model, embeddings = train_model(processed_df, model_name, batch_size, token_budget=token_budget)
     
     # Évaluation
     metrics = evaluate_model(processed_df, embeddings, model)
@@ -0,0 +1,87 @@
+"""
+Benchmark : analyse IA des candidats de /agent_search (compétences, résumé,
+score), appels synchrones en boucle contre appels asynchrones concurrents,
+sur le serveur LLM factice (scripts/stub_llm_server.py) avec une latence
+fixe par appel. Sans store d'enrichissement : tous les appels vont au LLM.
+
+Mesure aussi le retard maximal d'une tâche « ping » (toutes les 10 ms)
+exécutée pendant l'analyse : ce que subissent les autres requêtes de l'API.
+
+Usage :
+    python scripts/bench_agent_search.py --top-k 10 --latency 0.2 --concurrency 8
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def ping_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Retard max (s) d'un réveil programmé toutes les `interval` secondes."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def measure(analyse, texts):
+    """Durée de analyse(texts) et retard max de la boucle d'événements pendant ce temps."""
+    stop = asyncio.Event()
+    ping = asyncio.create_task(ping_lag(stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await analyse(texts)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await ping
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse IA de /agent_search")
+    parser.add_argument("--top-k", type=int, default=10, help="Candidats analysés")
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence du LLM factice par appel (s)")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM_CONCURRENCY")
+    parser.add_argument("--port", type=int, default=8012)
+    args = parser.parse_args()
+
+    from scripts.stub_llm_server import start_server
+
+    server = start_server(args.port, args.latency)
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ["LLM_CONCURRENCY"] = str(args.concurrency)
+
+    from src.agent import aenrich_profile, ascore_with_context, enrich_profile, score_with_context
+
+    job = "Senior Python backend engineer"
+    texts = [f"Profil {i} : développeur Python, {i} dépôts" for i in range(args.top_k)]
+
+    async def sync_loop(texts):
+        # Ancien /agent_search : 3 appels bloquants par candidat, à la suite
+        for text in texts:
+            enrichment = enrich_profile(text)
+            score_with_context({"skills": enrichment["skills"], "raw_text": text}, job)
+
+    async def concurrent(texts):
+        async def one(text):
+            enrichment = await aenrich_profile(text)
+            await ascore_with_context({"skills": enrichment["skills"], "raw_text": text}, job)
+        await asyncio.gather(*(one(text) for text in texts))
+
+    async def main():
+        # Premier appel hors mesure (connexions)
+        await concurrent(texts[:1])
+        print(f"\n{args.top_k} candidats, {3 * args.top_k} appels LLM de {args.latency * 1000:.0f} ms, "
+              f"LLM_CONCURRENCY = {args.concurrency}")
+        print(f"{'mode':>22} | {'latence (s)':>11} | {'retard max boucle (ms)':>22}")
+        for label, analyse in (("synchrone en boucle", sync_loop), ("asynchrone concurrent", concurrent)):
+            elapsed, lag = await measure(analyse, texts)
+            print(f"{label:>22} | {elapsed:>11.2f} | {lag * 1000:>22.0f}")
+
+    asyncio.run(main())
+    server.shutdown()
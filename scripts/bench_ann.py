@@ -0,0 +1,95 @@
+"""
+Benchmark : recherche exacte (float32, toute la matrice) contre l'index
+IVF de src/ann_index.py, pour plusieurs valeurs de nprobe.
+Mesure recall@k, latence moyenne et p99 par requête.
+
+Sans --embeddings, on génère des embeddings normalisés regroupés en
+grappes (plus proches de vrais profils qu'un bruit isotrope).
+
+Usage :
+    python scripts/bench_ann.py --n 1000000 --nprobe 4 8 16 32 64
+    python scripts/bench_ann.py --embeddings data/processed/profiles_embeddings.npy
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ann_index import IVFIndex, build_ivf, ivf_path
+from src.quantization import BLOCK_ROWS, top_indices
+
+
+def make_embeddings(path, n, dim=384, n_clusters=1000, seed=0):
+    """Embeddings synthétiques (centre de grappe + bruit), écrits en memmap."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n, dim))
+    for start in range(0, n, BLOCK_ROWS):
+        size = min(BLOCK_ROWS, n - start)
+        block = centers[rng.integers(0, n_clusters, size)] + rng.standard_normal((size, dim), dtype=np.float32)
+        out[start:start + size] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    out.flush()
+    del out
+
+
+def latencies(search, queries):
+    times, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        times.append((time.perf_counter() - start) * 1000)
+    return results, np.mean(times), np.percentile(times, 99)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark index IVF vs recherche exacte")
+    parser.add_argument("--embeddings", default=None, help="Fichier .npy existant (sinon synthétique)")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Profils synthétiques")
+    parser.add_argument("--nlist", type=int, default=None, help="Listes IVF (défaut : 4 * sqrt(N))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        embeddings_path = args.embeddings
+        if embeddings_path is None:
+            embeddings_path = os.path.join(tmp_dir, "embeddings.npy")
+            print(f"[INFO] Génération de {args.n} embeddings synthétiques...")
+            make_embeddings(embeddings_path, args.n)
+
+        if args.nlist or not os.path.exists(ivf_path(embeddings_path)):
+            start = time.perf_counter()
+            nlist = build_ivf(embeddings_path, args.nlist)
+            print(f"[INFO] Index IVF construit en {time.perf_counter() - start:.1f} s ({nlist} listes)")
+
+        full = np.load(embeddings_path)
+        index = IVFIndex(embeddings_path)
+        rng = np.random.default_rng(1)
+        # Requêtes : profils bruités (jamais exactement un point de l'index)
+        queries = full[rng.choice(len(full), min(args.queries, len(full)), replace=False)]
+        queries = queries + 0.05 * rng.standard_normal(queries.shape, dtype=np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+        exact, mean_ms, p99_ms = latencies(lambda q: top_indices(full @ q, args.k), queries)
+
+        print(f"\n{len(full)} profils, {len(queries)} requêtes, {index.nlist} listes")
+        print(f"{'recherche':>12} | {'moy. (ms)':>9} | {'p99 (ms)':>8} | {'recall@' + str(args.k):>9}")
+        print(f"{'exacte':>12} | {mean_ms:>9.2f} | {p99_ms:>8.2f} | {1.0:>9.4f}")
+
+        for nprobe in args.nprobe:
+            def ivf_search(query, nprobe=nprobe):
+                ids, scores = index.search(query, nprobe)
+                return ids[top_indices(scores, args.k)]
+
+            found, mean_ms, p99_ms = latencies(ivf_search, queries)
+            recall = np.mean([len(np.intersect1d(e, f)) / len(e) for e, f in zip(exact, found)])
+            print(f"{f'nprobe={nprobe}':>12} | {mean_ms:>9.2f} | {p99_ms:>8.2f} | {recall:>9.4f}")
+
+        del full, index
@@ -0,0 +1,70 @@
+"""
+Benchmark : N appels à TalentSearcher.search contre search_many par lots
+(un seul encodage + un produit matrice-matrice par lot), sur les
+embeddings et l'index de data/processed.
+
+Usage :
+    python scripts/bench_batch_search.py --queries 256 --batch-sizes 8 32 128
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import EMBEDDING_MODEL_NAME
+from src.matching import TalentSearcher
+
+ROLES = ["Backend", "Data", "ML", "Frontend", "DevOps", "Mobile", "Security", "Platform"]
+STACKS = ["Python, Django", "Go, Kubernetes", "TypeScript, React", "Rust", "Java, Spring", "PyTorch", "Swift", "C++"]
+
+
+def make_queries(n, seed=0):
+    """Descriptions de poste synthétiques, une sur trois avec un filtre."""
+    rng = np.random.default_rng(seed)
+    queries = []
+    for i in range(n):
+        role, stack = rng.choice(ROLES), rng.choice(STACKS)
+        queries.append({
+            "job_description": f"{role} engineer ({stack}) with {rng.integers(2, 10)} years of open-source work",
+            "top_k": 10,
+            "min_stars": 100 if i % 3 == 1 else None,
+            "language_filter": stack.split(",")[0].lower() if i % 3 == 2 else None,
+        })
+    return queries
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche groupée")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--queries", type=int, default=256, help="Nombre de requêtes")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128])
+    args = parser.parse_args()
+
+    searcher = TalentSearcher(model_name=args.model)
+    queries = make_queries(args.queries)
+
+    start = time.perf_counter()
+    reference = [searcher.search(**query) for query in queries]
+    sequential = time.perf_counter() - start
+
+    print(f"\n{searcher.n_profiles} profils, {len(queries)} requêtes")
+    print(f"{'mode':>16} | {'temps (s)':>9} | {'ms / requête':>12} | {'requêtes/s':>10} | {'speedup':>7}")
+    print(f"{'séquentiel':>16} | {sequential:>9.2f} | {sequential / len(queries) * 1000:>12.2f} | "
+          f"{len(queries) / sequential:>10.1f} | {'1.0x':>7}")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        results = []
+        for i in range(0, len(queries), batch_size):
+            results.extend(searcher.search_many(queries[i:i + batch_size]))
+        elapsed = time.perf_counter() - start
+
+        same = all(a["login"].tolist() == b["login"].tolist() for a, b in zip(reference, results))
+        print(f"{f'lots de {batch_size}':>16} | {elapsed:>9.2f} | {elapsed / len(queries) * 1000:>12.2f} | "
+              f"{len(queries) / elapsed:>10.1f} | {sequential / elapsed:>6.1f}x"
+              + ("" if same else "  [ATTENTION] résultats différents"))
@@ -0,0 +1,89 @@
+"""
+Benchmark : encodage des profils, lots fixes (model.encode, batch_size=32)
+contre lots triés par longueur avec budget de tokens (src/encoding.py).
+
+Les textes sont générés au format profile_text, avec un nombre variable de
+descriptions de projets (des bios courtes aux profils très longs).
+
+Usage :
+    python scripts/bench_encoding.py --n 20000 --budgets 4096 8192 16384
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import EMBEDDING_MODEL_NAME
+from src.encoding import encode_texts, token_lengths
+
+
+def make_texts(n, seed=0):
+    """profile_text synthétiques : 0 à 30 descriptions de projets par profil."""
+    rng = np.random.default_rng(seed)
+    bios = ["Backend developer", "ML engineer", "Student", "Open source maintainer", ""]
+    langs = ["Python", "Go", "Rust", "JavaScript", "Java", "C++"]
+    descriptions = [
+        "A fast web framework",
+        "CLI tool for data pipelines",
+        "Machine learning experiments on tabular data",
+        "Personal website built with a static site generator",
+        "Bindings for a high performance networking library",
+    ]
+
+    texts = []
+    for i in range(n):
+        nb_projects = int(rng.geometric(0.2)) - 1
+        parts = [f"User {i}", bios[rng.integers(len(bios))]]
+        parts.append("Languages: " + ", ".join(rng.choice(langs, rng.integers(1, 4), replace=False)))
+        parts.append(f"Total stars: {rng.integers(0, 5000)}")
+        if nb_projects:
+            parts.append("Projects: " + " . ".join(rng.choice(descriptions, min(nb_projects, 30))))
+        texts.append(" . ".join(p for p in parts if p))
+    return texts
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from sentence_transformers import SentenceTransformer
+
+    parser = argparse.ArgumentParser(description="Benchmark de l'encodage des profils")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--n", type=int, default=20_000, help="Nombre de profils")
+    parser.add_argument("--batch-size", type=int, default=32, help="Taille des lots fixes (référence)")
+    parser.add_argument("--budgets", type=int, nargs="+", default=[4096, 8192, 16384])
+    args = parser.parse_args()
+
+    model = SentenceTransformer(args.model)
+    texts = make_texts(args.n)
+
+    lengths = token_lengths(model, texts)
+    print(
+        f"[INFO] {len(texts)} profils, tokens : médiane {int(np.median(lengths))}, "
+        f"p95 {int(np.percentile(lengths, 95))}, max {lengths.max()}"
+    )
+
+    reference, ref_time = timed(
+        encode_texts, model, texts, batch_size=args.batch_size, show_progress_bar=False
+    )
+    print(f"{'mode':>22} | {'temps (s)':>9} | {'profils/s':>9} | {'speedup':>7} | {'écart max':>9}")
+    print(f"{f'fixe ({args.batch_size})':>22} | {ref_time:>9.2f} | {len(texts) / ref_time:>9.0f} | {'1.0x':>7} | {'-':>9}")
+
+    for budget in args.budgets:
+        embeddings, elapsed = timed(
+            encode_texts, model, texts, token_budget=budget, show_progress_bar=False
+        )
+        diff = float(np.abs(embeddings - reference).max())
+        print(
+            f"{f'budget {budget} tokens':>22} | {elapsed:>9.2f} | {len(texts) / elapsed:>9.0f} | "
+            f"{ref_time / elapsed:>6.1f}x | {diff:>9.1e}"
+        )
@@ -0,0 +1,103 @@
+"""
+Benchmark : analyse IA d'un candidat en trois appels (compétences, résumé,
+score : le texte du profil est envoyé trois fois) contre un appel combiné
+à sortie JSON (src/agent.aanalyse_profile), et profil déjà dans le store
+d'enrichissement (score seul). Serveur LLM factice
+(scripts/stub_llm_server.py) dont la latence suit le nombre de tokens.
+
+Vérifie aussi le repli sur réponse invalide (--malformed-rate, appliqué à
+tous les appels) : champs redemandés par les appels séparés, score None
+(=> similarité dans l'API) plutôt qu'un 0.0 silencieux.
+
+Usage :
+    python scripts/bench_llm_calls.py --top-k 10 --profile-words 300 --prefill-ms 2 --decode-ms 30
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = "développeur Python Go Docker Kubernetes open-source backend API microservices PostgreSQL".split()
+
+
+def make_profiles(n, n_words):
+    return [
+        f"Profil {i} : " + " ".join(WORDS[(i + j) % len(WORDS)] for j in range(n_words))
+        for i in range(n)
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark trois appels LLM contre un appel JSON")
+    parser.add_argument("--top-k", type=int, default=10, help="Candidats analysés (en parallèle)")
+    parser.add_argument("--profile-words", type=int, default=300, help="Longueur des profils (mots)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence fixe par appel (s)")
+    parser.add_argument("--prefill-ms", type=float, default=2.0, help="Latence par token du prompt (ms)")
+    parser.add_argument("--decode-ms", type=float, default=30.0, help="Latence par token de la réponse (ms)")
+    parser.add_argument("--malformed-rate", type=float, default=0.3, help="Réponses sans JSON (test du repli)")
+    parser.add_argument("--port", type=int, default=8014)
+    args = parser.parse_args()
+
+    from scripts.stub_llm_server import start_server
+
+    server = start_server(args.port, args.latency, prefill_ms=args.prefill_ms, decode_ms=args.decode_ms)
+    fallback_server = start_server(
+        args.port + 1, args.latency, prefill_ms=args.prefill_ms, decode_ms=args.decode_ms,
+        malformed_rate=args.malformed_rate,
+    )
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("LLM_CONCURRENCY", str(3 * args.top_k))
+
+    import src.agent as agent
+    from src.enrichment_store import aanalyse_with_store
+
+    job = "Senior Python backend engineer, Kubernetes, PostgreSQL"
+    profiles = make_profiles(args.top_k, args.profile_words)
+
+    async def three_calls(text):
+        enrichment = await agent.aenrich_profile(text)
+        await agent.ascore_with_context({"skills": enrichment["skills"], "raw_text": text}, job)
+
+    async def one_call(text):
+        await agent.aanalyse_profile(text, job)
+
+    async def score_only(text):
+        await agent.ascore_with_context({"skills": ["Python"], "raw_text": text}, job)
+
+    async def run(analyse):
+        start = time.perf_counter()
+        await asyncio.gather(*(analyse(text) for text in profiles))
+        return time.perf_counter() - start
+
+    async def main():
+        await one_call(profiles[0])  # connexions
+        print(f"\n{args.top_k} candidats de {args.profile_words} mots analysés en parallèle "
+              f"(prefill {args.prefill_ms} ms/token, génération {args.decode_ms} ms/token)")
+        print(f"{'mode':>24} | {'latence (s)':>11} | {'appels':>6} | {'tokens prompt':>13} | "
+              f"{'tokens réponse':>14} | {'tokens / candidat':>17}")
+        for label, analyse in (("3 appels", three_calls), ("1 appel JSON", one_call),
+                               ("store chaud (score seul)", score_only)):
+            server.reset()
+            elapsed = await run(analyse)
+            total = server.prompt_tokens + server.completion_tokens
+            print(f"{label:>24} | {elapsed:>11.2f} | {server.calls:>6} | {server.prompt_tokens:>13} | "
+                  f"{server.completion_tokens:>14} | {total / args.top_k:>17.0f}")
+
+        # Repli : réponses invalides => appels séparés, score None plutôt que 0.0
+        agent.client.base_url = f"http://127.0.0.1:{args.port + 1}/v1"
+        agent._async_state = None
+        results = await asyncio.gather(*(aanalyse_with_store(text, job) for text in make_profiles(50, 50)))
+        complete = sum(1 for r in results if r["skills"] and r["summary"] and r["score"] is not None)
+        no_score = sum(1 for r in results if r["score"] is None)
+        zero = sum(1 for r in results if r["score"] == 0.0)
+        print(f"\nRéponses invalides : {args.malformed_rate:.0%} -> {complete}/{len(results)} candidats complets "
+              f"après repli, {no_score} sans score (None), {zero} à 0.0 "
+              f"({fallback_server.calls} appels pour {len(results)} candidats)")
+
+    asyncio.run(main())
+    server.shutdown()
+    fallback_server.shutdown()
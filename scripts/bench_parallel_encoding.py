@@ -0,0 +1,78 @@
+"""
+Benchmark : encodage du corpus en un seul process (torch sur tous les
+cœurs) contre le mode multi-process de src/encoding.py, pour plusieurs
+combinaisons workers x threads.
+
+Usage (nœud 32 cœurs) :
+    python scripts/bench_parallel_encoding.py --n 50000 --configs 2x16 4x8 8x4 16x2 32x1
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_encoding import make_texts
+from src.config import EMBEDDING_MODEL_NAME
+from src.encoding import DEFAULT_TOKEN_BUDGET, encode_parallel, encode_texts
+
+
+def parse_config(value):
+    workers, threads = value.lower().split("x")
+    return int(workers), int(threads)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    parser = argparse.ArgumentParser(description="Benchmark de l'encodage multi-process")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--n", type=int, default=50_000, help="Nombre de profils")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="0 = lots fixes de 32")
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        default=["2x16", "4x8", "8x4", "16x2", "32x1"],
+        help="Combinaisons workers x threads",
+    )
+    args = parser.parse_args()
+
+    token_budget = args.token_budget or None
+    texts = make_texts(args.n)
+    cores = os.cpu_count() or 1
+
+    # Référence : un seul process, torch sur tous les cœurs
+    torch.set_num_threads(cores)
+    model = SentenceTransformer(args.model, device="cpu")
+    start = time.perf_counter()
+    reference = encode_texts(model, texts, token_budget=token_budget, show_progress_bar=False)
+    ref_time = time.perf_counter() - start
+
+    print(f"{'config':>14} | {'temps (s)':>9} | {'profils/s':>9} | {'speedup':>7} | {'écart max':>9}")
+    print(f"{f'1x{cores} (réf.)':>14} | {ref_time:>9.2f} | {len(texts) / ref_time:>9.0f} | {'1.0x':>7} | {'-':>9}")
+
+    for config in args.configs:
+        workers, threads = parse_config(config)
+        # Le temps inclut le démarrage des workers et le chargement des modèles
+        start = time.perf_counter()
+        embeddings = encode_parallel(
+            args.model,
+            texts,
+            workers=workers,
+            threads_per_worker=threads,
+            token_budget=token_budget,
+            show_progress_bar=False,
+            dim=reference.shape[1],
+        )
+        elapsed = time.perf_counter() - start
+        diff = float(np.abs(embeddings - reference).max())
+        print(
+            f"{config:>14} | {elapsed:>9.2f} | {len(texts) / elapsed:>9.0f} | "
+            f"{ref_time / elapsed:>6.1f}x | {diff:>9.1e}"
+        )
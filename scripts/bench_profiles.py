@@ -0,0 +1,130 @@
+"""
+Benchmark : construction des profils, ancienne version (groupby().apply +
+apply(axis=1)) contre src/profiles.py (vectorisée).
+
+Usage :
+    python scripts/bench_profiles.py --sizes 100000 1000000
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.profiles import build_profiles_df
+
+
+def make_data(n_users, repos_per_user=5, seed=0):
+    """Données synthétiques au format github_users.csv / github_repos.csv."""
+    rng = np.random.default_rng(seed)
+    logins = np.array([f"user{i}" for i in range(n_users)], dtype=object)
+
+    def pick(values, n):
+        return rng.choice(np.array(values, dtype=object), n)
+
+    users_df = pd.DataFrame({
+        "login": logins,
+        "name": pick(["Alice Martin", "Bob", None, ""], n_users),
+        "company": pick(["ACME", "@github", None], n_users),
+        "location": pick(["Paris", "Berlin", None], n_users),
+        "bio": pick(["Backend developer", "ML engineer", None], n_users),
+        "followers": rng.integers(0, 10_000, n_users),
+    })
+
+    n_repos = n_users * repos_per_user
+    repos_df = pd.DataFrame({
+        "owner_login": np.repeat(logins, repos_per_user),
+        "repo_name": [f"repo{i}" for i in range(n_repos)],
+        "description": pick(["A fast web framework", "CLI tool for data", None, ""], n_repos),
+        "language": pick(["Python", "Go", "Rust", "JavaScript", None], n_repos),
+        "stargazers_count": rng.integers(0, 500, n_repos),
+        "html_url": "",
+    })
+    return users_df, repos_df
+
+
+def build_profiles_legacy(users_df, repos_df):
+    """Copie de l'ancienne implémentation (boucles Python), pour comparaison."""
+    users_df = users_df[[c for c in ["login", "name", "company", "location", "bio", "followers"] if c in users_df.columns]]
+    users_df = users_df.fillna("")
+    repos_df = repos_df.copy()
+    repos_df["description"] = repos_df["description"].fillna("")
+    repos_df["language"] = repos_df["language"].fillna("")
+
+    agg_desc = repos_df.groupby("owner_login")["description"].apply(
+        lambda x: " . ".join([d for d in x if isinstance(d, str) and d.strip() != ""])
+    )
+    agg_lang = repos_df.groupby("owner_login")["language"].apply(
+        lambda x: ", ".join(sorted(set([l for l in x if isinstance(l, str) and l.strip() != ""])))
+    )
+    agg_stars = repos_df.groupby("owner_login")["stargazers_count"].sum()
+    agg_nb_repos = repos_df.groupby("owner_login")["repo_name"].count()
+
+    repos_agg_df = pd.DataFrame({
+        "login": agg_desc.index,
+        "repos_descriptions": agg_desc.values,
+        "languages_list": agg_lang.reindex(agg_desc.index).fillna(""),
+        "total_stars": agg_stars.reindex(agg_desc.index).fillna(0).astype(int),
+        "nb_repos_fetched": agg_nb_repos.reindex(agg_desc.index).fillna(0).astype(int),
+    })
+    merged_df = pd.merge(users_df, repos_agg_df, on="login", how="inner")
+
+    def build_profile_text(row):
+        parts = []
+        if row.get("name"):
+            parts.append(str(row["name"]))
+        if row.get("bio"):
+            parts.append(str(row["bio"]))
+        if row.get("company"):
+            parts.append(f"Company: {row['company']}")
+        if row.get("location"):
+            parts.append(f"Location: {row['location']}")
+        if row.get("languages_list"):
+            parts.append(f"Languages: {row['languages_list']}")
+        if row.get("nb_repos_fetched", 0) > 0:
+            parts.append(f"Number of repositories fetched: {row['nb_repos_fetched']}")
+        if row.get("total_stars", 0) > 0:
+            parts.append(f"Total stars: {row['total_stars']}")
+        if row.get("repos_descriptions"):
+            parts.append(f"Projects: {row['repos_descriptions']}")
+        return " . ".join([p for p in parts if isinstance(p, str) and p.strip() != ""])
+
+    merged_df["profile_text"] = merged_df.apply(build_profile_text, axis=1)
+    merged_df = merged_df[merged_df["profile_text"].str.strip() != ""].copy()
+    return merged_df.sort_values("total_stars", ascending=False)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de la construction des profils")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repos-per-user", type=int, default=5)
+    parser.add_argument("--skip-legacy", action="store_true", help="Ne mesure que la version vectorisée")
+    args = parser.parse_args()
+
+    print(f"{'users':>10} | {'legacy (s)':>10} | {'vectorisé (s)':>13} | {'speedup':>7}")
+    for n_users in args.sizes:
+        users_df, repos_df = make_data(n_users, repos_per_user=args.repos_per_user)
+
+        new_df, new_time = timed(build_profiles_df, users_df, repos_df)
+
+        if args.skip_legacy:
+            print(f"{n_users:>10} | {'-':>10} | {new_time:>13.2f} | {'-':>7}")
+            continue
+
+        old_df, old_time = timed(build_profiles_legacy, users_df, repos_df)
+        same = old_df["profile_text"].sort_index().equals(new_df["profile_text"].sort_index())
+        print(
+            f"{n_users:>10} | {old_time:>10.2f} | {new_time:>13.2f} | {old_time / new_time:>6.1f}x"
+            + ("" if same else "  (!) profile_text différent")
+        )
@@ -0,0 +1,134 @@
+"""
+Benchmark : assemblage du résultat de TalentSearcher.search, ancienne
+version (copie de l'index + colonne similarity + filtres + sort_values)
+contre la sélection partielle de src/matching.py (masque + argpartition,
+puis iloc des seuls top_k).
+
+Les filtres passent par src/filter_index.py (index inversé des langages,
+ids triés par stars) : seuls les profils retenus sont scorés.
+
+Sans --dim, les scores sont tirés au hasard : le produit scalaire est le
+même dans les deux versions, seul ce qui suit est mesuré. Avec --dim, une
+matrice d'embeddings aléatoire est scorée à chaque requête (la version
+actuelle ne score que les profils retenus par les filtres). Mesures : temps
+et pic d'allocation Python/numpy par requête (tracemalloc).
+
+Usage :
+    python scripts/bench_search.py --n 1000000
+    python scripts/bench_search.py --n 200000 --dim 384
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.filter_index import FilterIndex
+from src.matching import select_top_k, subset_scores
+from src.quantization import BLOCK_ROWS
+
+
+def make_index(n, seed=0):
+    """Index synthétique au format profiles_index (colonnes de INDEX_COLS)."""
+    rng = np.random.default_rng(seed)
+
+    def pick(values):
+        return rng.choice(np.array(values, dtype=object), n)
+
+    return pd.DataFrame({
+        "login": [f"user{i}" for i in range(n)],
+        "name": pick(["Alice Martin", "Bob", None]),
+        "company": pick(["ACME", "@github", None]),
+        "location": pick(["Paris", "Berlin", None]),
+        "total_stars": rng.integers(0, 5_000, n),
+        "nb_repos_fetched": rng.integers(0, 30, n),
+        "languages_list": pick(["Python, Go", "JavaScript", "Rust, C++", None]),
+    })
+
+
+def make_embeddings(n, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, BLOCK_ROWS):
+        block = rng.standard_normal((min(BLOCK_ROWS, n - start), dim), dtype=np.float32)
+        embeddings[start:start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    return embeddings
+
+
+def legacy_search(index_df, score_rows, top_k, min_stars, language_filter):
+    """Ancienne version de TalentSearcher.search : tout scorer, copier, filtrer, trier."""
+    df = index_df.copy()
+    df["similarity"] = score_rows(slice(None))
+    if min_stars is not None:
+        df = df[df["total_stars"] >= min_stars]
+    if language_filter:
+        df = df[df["languages_list"].fillna("").str.lower().str.contains(language_filter.lower())]
+    df = df.sort_values("similarity", ascending=False)
+    return df.head(min(top_k, len(df))).reset_index(drop=True)
+
+
+def current_search(index_df, filters, score_rows, top_k, min_stars, language_filter):
+    """Version actuelle : ids filtrés, scores des seuls retenus, sélection partielle."""
+    candidates = filters.candidates(min_stars, language_filter)
+    scores = subset_scores(score_rows, candidates, len(index_df))
+    top, top_scores = select_top_k(scores, top_k, candidates)
+    return index_df.iloc[top].assign(similarity=top_scores).reset_index(drop=True)
+
+
+def measure(search, queries):
+    times, peaks = [], []
+    for scores in queries:
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = search(scores)
+        times.append((time.perf_counter() - start) * 1000)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+        tracemalloc.stop()
+    return result, np.mean(times), np.percentile(times, 99), np.mean(peaks)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark de l'assemblage des résultats de recherche")
+    parser.add_argument("--n", type=int, default=1_000_000, help="Nombre de profils")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--dim", type=int, default=0, help="Dimension des embeddings scorés (0 = scores aléatoires)")
+    args = parser.parse_args()
+
+    index_df = make_index(args.n)
+    filters = FilterIndex(index_df)
+    rng = np.random.default_rng(1)
+    if args.dim:
+        embeddings = make_embeddings(args.n, args.dim)
+        queries = [embeddings[i] for i in rng.choice(args.n, args.queries, replace=False)]
+
+        def score_fns(query):
+            return lambda rows: embeddings[rows] @ query
+    else:
+        queries = [rng.random(args.n, dtype=np.float32) for _ in range(args.queries)]
+
+        def score_fns(scores):
+            return lambda rows: scores[rows]
+
+    print(f"\n{args.n} profils, top_k = {args.top_k}, {args.queries} requêtes, dim = {args.dim or 'scores aléatoires'}")
+    print(f"{'filtres':>22} | {'retenus':>7} | {'version':>9} | {'moy. (ms)':>9} | {'p99 (ms)':>8} | {'pic alloc (Mo)':>14}")
+    for min_stars, language_filter in [(None, None), (1000, None), (1000, "python"), (4990, None), (4990, "rust")]:
+        label = f"stars={min_stars} lang={language_filter}"
+        candidates = filters.candidates(min_stars, language_filter)
+        kept = f"{(len(candidates) if candidates is not None else args.n) / args.n:.1%}"
+        legacy, *legacy_stats = measure(
+            lambda q: legacy_search(index_df, score_fns(q), args.top_k, min_stars, language_filter), queries
+        )
+        current, *current_stats = measure(
+            lambda q: current_search(index_df, filters, score_fns(q), args.top_k, min_stars, language_filter), queries
+        )
+        for version, (mean_ms, p99_ms, peak_mb) in (("ancienne", legacy_stats), ("actuelle", current_stats)):
+            print(f"{label:>22} | {kept:>7} | {version:>9} | {mean_ms:>9.1f} | {p99_ms:>8.1f} | {peak_mb:>14.1f}")
+        # Même top_k dans les deux versions (scores aléatoires : pas d'ex aequo)
+        assert legacy["login"].tolist() == current["login"].tolist()
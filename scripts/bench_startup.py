@@ -0,0 +1,86 @@
+"""
+Benchmark : démarrage et mémoire de N workers qui servent la recherche
+(comme `uvicorn --workers N`), index chargé en RAM (EMBEDDINGS_MMAP=0)
+contre index en memmap (défaut), sur data/processed.
+
+Chaque worker construit un TalentSearcher, fait une recherche (toutes les
+pages de la matrice sont lues), puis attend les autres : la mémoire est
+mesurée quand les N workers sont vivants. Linux uniquement (lit
+/proc/self/smaps_rollup) :
+- RSS : pages résidentes du process (pages partagées comptées en entier)
+- PSS : pages partagées divisées par le nombre de process qui les ont
+        -> la part réelle de chaque worker
+- PSS anon / fichier : mémoire privée (tas numpy, pandas) / pages du cache
+        disque (memmap, bibliothèques)
+
+Usage :
+    python scripts/bench_startup.py --workers 4
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import EMBEDDING_MODEL_NAME
+
+
+def memory_mb():
+    """Rss, Pss, Pss_Anon, Pss_File du process courant, en Mo."""
+    fields = {}
+    with open("/proc/self/smaps_rollup", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {key: fields.get(key, 0.0) for key in ("Rss", "Pss", "Pss_Anon", "Pss_File")}
+
+
+def worker(model_name, mmap, barrier, results):
+    from src.matching import TalentSearcher
+
+    start = time.perf_counter()
+    searcher = TalentSearcher(model_name=model_name, mmap=mmap)
+    startup = time.perf_counter() - start
+    searcher.search("Senior Python backend engineer", top_k=5)
+
+    barrier.wait()
+    results.put({"startup": startup, **memory_mb()})
+    barrier.wait()
+
+
+def run(model_name, mmap, n_workers):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(n_workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(model_name, mmap, barrier, results)) for _ in range(n_workers)]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="Benchmark démarrage / mémoire par worker")
+    parser.add_argument("--model", default=EMBEDDING_MODEL_NAME)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"\n{args.workers} workers, moyennes par worker")
+    print(f"{'chargement':>10} | {'démarrage (s)':>13} | {'RSS (Mo)':>8} | {'PSS (Mo)':>8} | "
+          f"{'PSS anon (Mo)':>13} | {'PSS fichier (Mo)':>16}")
+    for label, mmap in (("RAM", False), ("memmap", True)):
+        stats = run(args.model, mmap, args.workers)
+
+        def mean(key):
+            return np.mean([s[key] for s in stats])
+
+        print(f"{label:>10} | {mean('startup'):>13.2f} | {mean('Rss'):>8.0f} | {mean('Pss'):>8.0f} | "
+              f"{mean('Pss_Anon'):>13.0f} | {mean('Pss_File'):>16.0f}")
@@ -30,10 +30,30 @@ if exist "data\processed\profiles_embeddings.npy" (
     dvc add data\processed\profiles_embeddings.npy
 )
 
+if exist "data\processed\profiles_embeddings.pca.npz" (
+    dvc add data\processed\profiles_embeddings.pca.npz
+    dvc add data\processed\profiles_embeddings.pca.npy
+)
+
+if exist "data\processed\profiles_embeddings.ivf.npz" (
+    dvc add data\processed\profiles_embeddings.ivf.npz
+    dvc add data\processed\profiles_embeddings.ivf.npy
+)
+
 if exist "data\processed\profiles_index.csv" (
     dvc add data\processed\profiles_index.csv
 )
 
+if exist "data\processed\profiles_processed.parquet" (
+    dvc add data\processed\profiles_processed.parquet
+)
+
+if exist "data\processed\profiles_index.parquet" (
+    dvc add data\processed\profiles_index.parquet
+    dvc add data\processed\profiles_index.arrow
+    dvc add data\processed\profiles_index.filters
+)
+
 echo === Configuration du remote MinIO (optionnel) ===
 echo Pour configurer MinIO comme remote DVC, executez:
 echo dvc remote add -d minio s3://dvc-data --local
@@ -30,10 +30,30 @@ if [ -f "data/processed/profiles_embeddings.npy" ]; then
     dvc add data/processed/profiles_embeddings.npy
 fi
 
+if [ -f "data/processed/profiles_embeddings.pca.npz" ]; then
+    dvc add data/processed/profiles_embeddings.pca.npz
+    dvc add data/processed/profiles_embeddings.pca.npy
+fi
+
+if [ -f "data/processed/profiles_embeddings.ivf.npz" ]; then
+    dvc add data/processed/profiles_embeddings.ivf.npz
+    dvc add data/processed/profiles_embeddings.ivf.npy
+fi
+
 if [ -f "data/processed/profiles_index.csv" ]; then
     dvc add data/processed/profiles_index.csv
 fi
 
+if [ -f "data/processed/profiles_processed.parquet" ]; then
+    dvc add data/processed/profiles_processed.parquet
+fi
+
+if [ -f "data/processed/profiles_index.parquet" ]; then
+    dvc add data/processed/profiles_index.parquet
+    dvc add data/processed/profiles_index.arrow
+    dvc add data/processed/profiles_index.filters
+fi
+
 echo "=== Configuration du remote MinIO (optionnel) ==="
 echo "Pour configurer MinIO comme remote DVC, exécutez:"
 echo "dvc remote add -d minio s3://dvc-data --local"
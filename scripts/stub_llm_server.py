@@ -0,0 +1,135 @@
+"""
+Serveur LLM factice compatible OpenAI (POST /v1/chat/completions), pour
+tester l'enrichissement et /agent_search sans Ollama : réponses fixes
+selon le prompt, usage (tokens) renvoyé comme Ollama, latence simulée.
+
+Latence d'un appel : latency + prefill_ms x tokens du prompt + decode_ms x
+tokens de la réponse (un token par mot). Avec --prefill-ms, renvoyer le
+texte du profil dans plusieurs appels se paie à chaque fois.
+
+Usage :
+    python scripts/stub_llm_server.py --port 8001 --latency 0.2
+    OLLAMA_BASE_URL=http://localhost:8001/v1 python src/enrichment_store.py --workers 8
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SKILLS = ["Python", "Docker", "Kubernetes", "PostgreSQL", "FastAPI", "Git"]
+SUMMARY = "Développeur backend expérimenté. Profil solide pour un poste d'ingénieur logiciel."
+
+
+def reply(prompt: str) -> str:
+    """Réponse fixe selon le type de prompt (cf. src/agent.py)."""
+    if "objet JSON" in prompt:
+        return json.dumps({"skills": SKILLS, "summary": SUMMARY, "score": 0.5}, ensure_ascii=False)
+    if "compétences" in prompt:
+        return ", ".join(SKILLS)
+    if "score" in prompt:
+        return "0.5"
+    return SUMMARY
+
+
+class StubServer(ThreadingHTTPServer):
+    # File d'attente de connexions assez longue pour des appels concurrents
+    # (5 par défaut : les connexions en trop attendent ~1 s une retransmission)
+    request_queue_size = 128
+    daemon_threads = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def count(self, prompt_tokens: int, completion_tokens: int):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def reset(self):
+        with self._lock:
+            self.calls = self.prompt_tokens = self.completion_tokens = 0
+
+
+def make_handler(latency: float, fail_rate: float, prefill_ms: float = 0.0, decode_ms: float = 0.0,
+                 malformed_rate: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = body["messages"][-1]["content"]
+            content = reply(prompt)
+            if random.random() < malformed_rate:
+                content = "Voici mon analyse : profil intéressant, score élevé."
+            # Approximation : un token par mot
+            prompt_tokens, completion_tokens = len(prompt.split()), len(content.split())
+
+            time.sleep(latency + (prefill_ms * prompt_tokens + decode_ms * completion_tokens) / 1000)
+            if random.random() < fail_rate:
+                self.send_error(503, "Échec simulé")
+                return
+            self.server.count(prompt_tokens, completion_tokens)
+
+            payload = json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port: int = 8001, latency: float = 0.0, fail_rate: float = 0.0, prefill_ms: float = 0.0,
+                 decode_ms: float = 0.0, malformed_rate: float = 0.0) -> StubServer:
+    """Démarre le serveur dans un thread (pour les benchmarks) et le retourne."""
+    server = StubServer(
+        ("127.0.0.1", port), make_handler(latency, fail_rate, prefill_ms, decode_ms, malformed_rate)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serveur LLM factice compatible OpenAI")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="Latence fixe par appel (s)")
+    parser.add_argument("--prefill-ms", type=float, default=0.0, help="Latence par token du prompt (ms)")
+    parser.add_argument("--decode-ms", type=float, default=0.0, help="Latence par token de la réponse (ms)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Fraction d'appels en erreur 503")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction de réponses sans JSON")
+    args = parser.parse_args()
+
+    server = StubServer(
+        ("127.0.0.1", args.port),
+        make_handler(args.latency, args.fail_rate, args.prefill_ms, args.decode_ms, args.malformed_rate),
+    )
+    print(f"[INFO] Serveur LLM factice sur http://127.0.0.1:{args.port}/v1 (latence {args.latency} s)")
+    server.serve_forever()
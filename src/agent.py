@@ -1,52 +1,248 @@
+import asyncio
+import hashlib
+import json
+import math
 import os
-from openai import OpenAI
+import re
+from openai import AsyncOpenAI, OpenAI
 
 # On se connecte à Ollama (qui tourne localement sur le port 11434)
+# OLLAMA_BASE_URL : tout serveur compatible OpenAI (ex. scripts/stub_llm_server.py)
 client = OpenAI(
-    base_url="http://localhost:11434/v1",
+    base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
     api_key="ollama" # La clé n'est pas vérifiée par Ollama
 )
 
+LLM_MODEL = "llama3"
+
+# Appels asynchrones (API) : appels simultanés max vers Ollama (tous
+# requêtes confondues) et délai max par appel, en secondes
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", 8))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+
+SKILLS_PROMPT = "Liste les 6 compétences techniques principales présentes dans ce texte (séparées par des virgules) :\n----\n{text}\n----"
+SUMMARY_PROMPT = "Résume ce profil en deux phrases orientées recrutement / HR :\n----\n{text}\n----"
+# Appel combiné : le texte du profil n'est envoyé (et pré-rempli) qu'une fois.
+# Compétences et résumé ne portent que sur le profil (mis en cache par profil,
+# cf. src/enrichment_store.py) ; seul le score dépend du poste
+ANALYSIS_PROMPT = (
+    "Analyse ce profil. Les compétences et le résumé décrivent le profil seul, indépendamment du poste ; "
+    "seul le score tient compte du poste ci-dessous. Réponds uniquement avec un objet JSON de la forme "
+    '{{"skills": ["6 compétences techniques principales"], '
+    '"summary": "résumé du profil en deux phrases orientées recrutement / HR", '
+    '"score": "pertinence du profil pour le poste, nombre entre 0.0 et 1.0"}}'
+    "\n----\nProfil :\n{text}\n----\nPoste :\n{job}\n----"
+)
+
+
+def _prompt_version(*prompts: str) -> str:
+    return f"{LLM_MODEL}|" + hashlib.sha256("".join(prompts).encode("utf-8")).hexdigest()[:12]
+
+
+# Versions des enrichissements (compétences + résumé), une par famille de
+# prompts : appels séparés (enrich_profile, pipeline) ou appel combiné
+# (analyse_profile). Changent avec le modèle ou les prompts, ce qui invalide
+# les entrées du store (cf. src/enrichment_store.py)
+ENRICHMENT_VERSION = _prompt_version(SKILLS_PROMPT, SUMMARY_PROMPT)
+ANALYSIS_VERSION = _prompt_version(ANALYSIS_PROMPT)
+
+
+def _complete(prompt: str, temperature: float, **kwargs):
+    return client.chat.completions.create(
+        model=LLM_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature,
+        **kwargs,
+    )
+
+
+def _chat(prompt: str, temperature: float) -> str:
+    return _complete(prompt, temperature).choices[0].message.content
+
+
+def _tokens(response) -> int:
+    """Tokens (prompt + réponse) d'un appel, 0 si le serveur ne les renvoie pas."""
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None) or 0
+
+
+_async_state = None
+
+
+def _async_client():
+    """
+    Client asynchrone et sémaphore partagés, créés pour la boucle asyncio
+    courante (les connexions httpx et le sémaphore y sont liés).
+    """
+    global _async_state
+    loop = asyncio.get_running_loop()
+    if _async_state is None or _async_state[0] is not loop:
+        client_async = AsyncOpenAI(base_url=str(client.base_url), api_key=client.api_key)
+        _async_state = (loop, client_async, asyncio.Semaphore(LLM_CONCURRENCY))
+    return _async_state[1], _async_state[2]
+
+
+async def _acomplete(prompt: str, temperature: float, **kwargs):
+    """Équivalent asynchrone de _complete : attend une place, puis LLM_TIMEOUT max."""
+    client_async, slots = _async_client()
+    async with slots:
+        return await asyncio.wait_for(
+            client_async.chat.completions.create(
+                model=LLM_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=temperature,
+                **kwargs,
+            ),
+            timeout=LLM_TIMEOUT,
+        )
+
+
+def _parse_skills(raw: str) -> list[str]:
+    return [s.strip() for s in raw.split(",") if s.strip()]
+
+
+def parse_score(value) -> float | None:
+    """
+    Score entre 0.0 et 1.0 lu dans une réponse du LLM (nombre ou texte :
+    "0.8", "Score : 0,8", "8/10", "80"), None si illisible ou hors bornes.
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        score = float(value)
+    else:
+        match = re.search(r"\d+(?:[.,]\d+)?", str(value))
+        if match is None:
+            return None
+        score = float(match.group().replace(",", "."))
+    # Échelles sur 10 ou sur 100
+    if 1.0 < score <= 10.0:
+        score /= 10.0
+    elif 10.0 < score <= 100.0:
+        score /= 100.0
+    if math.isnan(score) or not 0.0 <= score <= 1.0:
+        return None
+    return score
+
+
+def _json_object(raw: str) -> dict:
+    """Objet JSON de la réponse (tolère un bloc ```json ou du texte autour), {} sinon."""
+    start, end = raw.find("{"), raw.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        data = json.loads(raw[start:end + 1])
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def parse_analysis(raw: str) -> dict:
+    """
+    Réponse de ANALYSIS_PROMPT validée champ par champ : skills (liste de
+    chaînes), summary (chaîne), score (0.0 à 1.0). Un champ absent ou
+    invalide vaut None (à redemander par un appel séparé).
+    """
+    data = _json_object(raw)
+
+    skills = data.get("skills")
+    if isinstance(skills, str):
+        skills = _parse_skills(skills)
+    if isinstance(skills, list):
+        skills = [str(skill).strip() for skill in skills if isinstance(skill, (str, int, float)) and str(skill).strip()]
+    else:
+        skills = None
+
+    summary = data.get("summary")
+    summary = summary.strip() if isinstance(summary, str) and summary.strip() else None
+
+    return {"skills": skills or None, "summary": summary, "score": parse_score(data.get("score"))}
+
+
 def extract_skills(text: str) -> list[str]:
-    prompt = f"Liste les 6 compétences techniques principales présentes dans ce texte (séparées par des virgules) :\n----\n{text}\n----"
     try:
-        response = client.chat.completions.create(
-            model="llama3",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-        )
-        raw = response.choices[0].message.content
-        return [s.strip() for s in raw.split(",") if s.strip()]
+        return _parse_skills(_chat(SKILLS_PROMPT.format(text=text), temperature=0.0))
     except Exception as e:
         print(f"Erreur Ollama Skills: {e}")
         return []
 
 def generate_summary(profile_text: str) -> str:
-    prompt = f"Résume ce profil en deux phrases orientées recrutement / HR :\n----\n{profile_text}\n----"
     try:
-        response = client.chat.completions.create(
-            model="llama3",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-        )
-        return response.choices[0].message.content.strip()
+        return _chat(SUMMARY_PROMPT.format(text=profile_text), temperature=0.3).strip()
     except Exception as e:
         print(f"Erreur Ollama Summary: {e}")
         return "Résumé non disponible."
 
-def score_with_context(profile_info: dict, job_description: str) -> float:
+def enrich_profile(profile_text: str) -> dict:
+    """
+    Compétences et résumé d'un profil : ne dépendent que du texte, pas du
+    poste. Lève une exception si Ollama échoue (rien ne doit être mis en cache).
+    "tokens" : tokens consommés par les deux appels (non stocké).
+    """
+    skills = _complete(SKILLS_PROMPT.format(text=profile_text), temperature=0.0)
+    summary = _complete(SUMMARY_PROMPT.format(text=profile_text), temperature=0.3)
+    return {
+        "skills": _parse_skills(skills.choices[0].message.content),
+        "summary": summary.choices[0].message.content.strip(),
+        "tokens": _tokens(skills) + _tokens(summary),
+    }
+
+async def aenrich_profile(profile_text: str) -> dict:
+    """Version asynchrone de enrich_profile : les deux appels en parallèle."""
+    skills, summary = await asyncio.gather(
+        _acomplete(SKILLS_PROMPT.format(text=profile_text), temperature=0.0),
+        _acomplete(SUMMARY_PROMPT.format(text=profile_text), temperature=0.3),
+    )
+    return {
+        "skills": _parse_skills(skills.choices[0].message.content),
+        "summary": summary.choices[0].message.content.strip(),
+        "tokens": _tokens(skills) + _tokens(summary),
+    }
+
+def _score_prompt(profile_info: dict, job_description: str) -> str:
     combined = (
         f"Profil skills: {profile_info.get('skills')}\n"
         f"Texte brut: {profile_info.get('raw_text')}\n"
         f"Job description: {job_description}"
     )
-    prompt = f"Sur une échelle de 0.0 à 1.0, donne un score de pertinence (seulement le nombre) entre ce profil et ce job :\n----\n{combined}\n----"
+    return f"Sur une échelle de 0.0 à 1.0, donne un score de pertinence (seulement le nombre) entre ce profil et ce job :\n----\n{combined}\n----"
+
+def score_with_context(profile_info: dict, job_description: str) -> float | None:
+    """Score de pertinence (0.0 à 1.0), None si Ollama échoue ou si la réponse est illisible."""
     try:
-        response = client.chat.completions.create(
-            model="llama3",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.0,
-        )
-        return float(response.choices[0].message.content.strip())
-    except:
-        return 0.0
\ No newline at end of file
+        response = _complete(_score_prompt(profile_info, job_description), temperature=0.0)
+        return parse_score(response.choices[0].message.content)
+    except Exception as e:
+        print(f"Erreur Ollama Score: {e!r}")
+        return None
+
+async def ascore_with_context(profile_info: dict, job_description: str) -> float | None:
+    """Version asynchrone de score_with_context (None en cas d'échec ou de délai dépassé)."""
+    try:
+        response = await _acomplete(_score_prompt(profile_info, job_description), temperature=0.0)
+        return parse_score(response.choices[0].message.content)
+    except Exception as e:
+        print(f"Erreur Ollama Score: {e!r}")
+        return None
+
+def analyse_profile(profile_text: str, job_description: str) -> dict:
+    """
+    Compétences, résumé et score en un seul appel (sortie JSON), au lieu
+    de extract_skills + generate_summary + score_with_context. Champs
+    invalides à None (cf. parse_analysis). Lève une exception si Ollama échoue.
+    """
+    response = _complete(
+        ANALYSIS_PROMPT.format(text=profile_text, job=job_description),
+        temperature=0.0,
+        response_format={"type": "json_object"},
+    )
+    return {**parse_analysis(response.choices[0].message.content), "tokens": _tokens(response)}
+
+async def aanalyse_profile(profile_text: str, job_description: str) -> dict:
+    """Version asynchrone de analyse_profile."""
+    response = await _acomplete(
+        ANALYSIS_PROMPT.format(text=profile_text, job=job_description),
+        temperature=0.0,
+        response_format={"type": "json_object"},
+    )
+    return {**parse_analysis(response.choices[0].message.content), "tokens": _tokens(response)}
@@ -0,0 +1,143 @@
+"""
+ann_index.py
+Index IVF (inverted file) en numpy pour la recherche approchée.
+
+Construction (embedding.py --ann) :
+1. k-means sphérique sur un échantillon des embeddings -> `nlist` centroïdes
+2. chaque profil est rangé dans la liste de son centroïde le plus proche
+3. les vecteurs sont recopiés liste par liste, de façon contiguë
+
+Recherche : on score les centroïdes, on ne parcourt que les `nprobe`
+listes les plus proches (≈ N * nprobe / nlist profils au lieu de N). Les
+scores des candidats sont exacts (vecteurs float32), seul le rappel est
+approché. nprobe règle le compromis rappel / vitesse.
+
+Fichiers écrits à côté des embeddings :
+- profiles_embeddings.ivf.npz : centroids, offsets, ids
+- profiles_embeddings.ivf.npy : vecteurs réordonnés par liste
+"""
+
+import os
+
+import numpy as np
+
+from src.quantization import BLOCK_ROWS
+
+DEFAULT_NPROBE = 16
+KMEANS_ITERATIONS = 10
+# Points d'entraînement du k-means par centroïde
+KMEANS_POINTS_PER_LIST = 64
+
+
+def ivf_path(embeddings_path: str) -> str:
+    root, _ = os.path.splitext(embeddings_path)
+    return f"{root}.ivf.npz"
+
+
+def ivf_vectors_path(embeddings_path: str) -> str:
+    root, ext = os.path.splitext(embeddings_path)
+    return f"{root}.ivf{ext}"
+
+
+def default_nlist(n: int) -> int:
+    return int(min(max(1, 4 * np.sqrt(n)), n))
+
+
+def _assign(embeddings: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Liste (centroïde le plus proche) de chaque vecteur, bloc par bloc."""
+    labels = np.empty(len(embeddings), dtype=np.int32)
+    for start in range(0, len(embeddings), BLOCK_ROWS):
+        block = np.asarray(embeddings[start:start + BLOCK_ROWS], dtype=np.float32)
+        labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(embeddings: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """k-means sphérique (produit scalaire, centroïdes normalisés) sur un échantillon."""
+    rng = np.random.default_rng(seed)
+    n = len(embeddings)
+    sample_size = min(n, nlist * KMEANS_POINTS_PER_LIST)
+    sample = np.asarray(embeddings[np.sort(rng.choice(n, sample_size, replace=False))], dtype=np.float32)
+
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = _assign(sample, centroids)
+        counts = np.bincount(labels, minlength=nlist)
+
+        # Somme des points de chaque liste (tri par liste + reduceat, bien plus rapide que np.add.at)
+        order = np.argsort(labels, kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros_like(centroids)
+        filled = counts > 0
+        sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+
+        # Liste vide : on la réinitialise sur un point au hasard
+        empty = counts == 0
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+
+def build_ivf(embeddings_path: str, nlist: int | None = None):
+    """Construit et écrit l'index IVF de `embeddings_path`. Retourne nlist."""
+    embeddings = np.load(embeddings_path, mmap_mode="r")
+    n, dim = embeddings.shape
+    nlist = min(nlist or default_nlist(n), n)
+
+    centroids = train_centroids(embeddings, nlist)
+    labels = _assign(embeddings, centroids)
+
+    ids = np.argsort(labels, kind="stable").astype(np.int64)
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(labels, minlength=nlist))
+
+    out_path = ivf_vectors_path(embeddings_path)
+    tmp_path = f"{out_path}.tmp.npy"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(n, dim))
+    for start in range(0, n, BLOCK_ROWS):
+        block_ids = ids[start:start + BLOCK_ROWS]
+        out[start:start + len(block_ids)] = embeddings[block_ids]
+    out.flush()
+    del out
+
+    np.savez(ivf_path(embeddings_path), centroids=centroids, offsets=offsets, ids=ids)
+    os.replace(tmp_path, out_path)
+    return nlist
+
+
+def remove_ivf(embeddings_path: str):
+    """Supprime l'index IVF (périmé dès que le float32 change)."""
+    for path in (ivf_path(embeddings_path), ivf_vectors_path(embeddings_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class IVFIndex:
+    """Index IVF : centroïdes et listes en RAM, vecteurs réordonnés en RAM ou en memmap."""
+
+    def __init__(self, embeddings_path: str, mmap_mode: str | None = None):
+        with np.load(ivf_path(embeddings_path)) as artifact:
+            self.centroids = artifact["centroids"]
+            self.offsets = artifact["offsets"]
+            self.ids = artifact["ids"]
+        self.vectors = np.load(ivf_vectors_path(embeddings_path), mmap_mode=mmap_mode)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def search(self, query: np.ndarray, nprobe: int = DEFAULT_NPROBE):
+        """
+        (ids, scores) de tous les profils des `nprobe` listes les plus
+        proches de la requête. Les scores sont exacts.
+        """
+        query = query.astype(np.float32)
+        nprobe = min(nprobe, self.nlist)
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+
+        starts = self.offsets[probes]
+        ends = self.offsets[probes + 1]
+        positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        scores = np.concatenate([self.vectors[s:e] @ query for s, e in zip(starts, ends)])
+        return self.ids[positions], scores
@@ -1,138 +1,125 @@
 import os
+import sys
 import pandas as pd
 
+# Ajouter le répertoire racine au path (pour les imports src.*)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.profile_store import (
+    FINGERPRINTS_PATH,
+    PROFILES_CSV_PATH,
+    PROFILES_STORE_PATH,
+    export_csv,
+    write_profiles,
+)
+from src.profiles import build_profiles_df
+from src.profiles_incremental import build_profiles_incremental
+from src.profiles_streaming import build_profiles_streaming
+
 
 def get_base_dir():
     return os.path.dirname(os.path.dirname(__file__))
 
 
-def main():
+def main(streaming=False, chunksize=100_000, max_memory_mb=1024, csv=False, full=False):
+    """
+    Par défaut         : reconstruction incrémentale, seuls les logins dont
+                         les données ont changé sont recalculés (cf.
+                         src/profiles_incremental.py).
+    full=True          : tout est recalculé en mémoire (comportement historique).
+    streaming=True     : lecture par chunks et agrégation par partitions sur
+                         disque (cf. src/profiles_streaming.py), mémoire bornée
+                         par max_memory_mb. Même fichier de sortie.
+    csv=True           : exporte aussi profiles_enriched.csv.
+
+    Les profils sont écrits dans le store Parquet (cf. src/profile_store.py).
+    """
     base_dir = get_base_dir()
 
     users_path = os.path.join(base_dir, "data", "raw", "github_users.csv")
     repos_path = os.path.join(base_dir, "data", "raw", "github_repos.csv")
     processed_dir = os.path.join(base_dir, "data", "processed")
     os.makedirs(processed_dir, exist_ok=True)
+    output_path = PROFILES_STORE_PATH
 
-    print(f"[INFO] Lecture utilisateurs : {users_path}")
-    users_df = pd.read_csv(users_path)
-
-    print(f"[INFO] Lecture repos : {repos_path}")
-    repos_df = pd.read_csv(repos_path)
-
-    # --- Nettoyage basique ---
-
-    # On s'assure que les colonnes clés existent
-    if "login" not in users_df.columns:
-        raise ValueError("La colonne 'login' est absente de github_users.csv")
-    if "owner_login" not in repos_df.columns:
-        raise ValueError("La colonne 'owner_login' est absente de github_repos.csv")
-
-    # On ne garde que les colonnes utiles côté users
-    users_cols = [
-        "login",
-        "name",
-        "company",
-        "location",
-        "bio",
-        "followers",
-        "public_repos",
-        "public_gists",
-    ]
-    users_df = users_df[[c for c in users_cols if c in users_df.columns]].copy()
-
-    users_df = users_df.fillna("")
-
-    # --- Agrégation des repos par utilisateur ---
-
-    # On remplace NaN par vide et 0
-    repos_df["description"] = repos_df["description"].fillna("")
-    repos_df["language"] = repos_df["language"].fillna("")
-    repos_df["stargazers_count"] = pd.to_numeric(
-        repos_df.get("stargazers_count", 0), errors="coerce"
-    ).fillna(0)
-
-    # Texte concaténé des descriptions de repos
-    agg_desc = repos_df.groupby("owner_login")["description"].apply(
-        lambda x: " . ".join([d for d in x if isinstance(d, str) and d.strip() != ""])
-    )
-
-    # Liste unique des langages par user
-    agg_lang = repos_df.groupby("owner_login")["language"].apply(
-        lambda x: ", ".join(sorted(set([l for l in x if isinstance(l, str) and l.strip() != ""])))
-    )
+    if streaming:
+        nb_profiles = build_profiles_streaming(
+            users_path,
+            repos_path,
+            output_path,
+            chunksize=chunksize,
+            max_memory_mb=max_memory_mb,
+            tmp_dir=processed_dir,
+        )
+        print(f"[INFO] Taille finale : {nb_profiles}")
 
-    # Total de stars et nb de repos
-    agg_stars = repos_df.groupby("owner_login")["stargazers_count"].sum()
-    agg_nb_repos = repos_df.groupby("owner_login")["repo_name"].count()
-
-    repos_agg_df = pd.DataFrame({
-        "login": agg_desc.index,
-        "repos_descriptions": agg_desc.values,
-        "languages_list": agg_lang.reindex(agg_desc.index).fillna(""),
-        "total_stars": agg_stars.reindex(agg_desc.index).fillna(0).astype(int),
-        "nb_repos_fetched": agg_nb_repos.reindex(agg_desc.index).fillna(0).astype(int),
-    })
-
-    print(f"[INFO] Utilisateurs avec au moins un repo récupéré : {len(repos_agg_df)}")
-
-    # --- Fusion users + repos agrégés ---
-
-    merged_df = pd.merge(
-        users_df,
-        repos_agg_df,
-        on="login",
-        how="inner",  # on garde seulement ceux pour lesquels on a des repos
-    )
+        # Pas d'empreintes en streaming : le prochain run incrémental repartira de zéro
+        if os.path.exists(FINGERPRINTS_PATH):
+            os.remove(FINGERPRINTS_PATH)
+    elif not full:
+        # dtype=str : le hash d'une ligne ne dépend pas des types inférés sur tout le fichier
+        print(f"[INFO] Lecture utilisateurs : {users_path}")
+        users_df = pd.read_csv(users_path, dtype=str)
 
-    print(f"[INFO] Taille finale après merge : {len(merged_df)}")
+        print(f"[INFO] Lecture repos : {repos_path}")
+        repos_df = pd.read_csv(repos_path, dtype=str)
 
-    # --- Construction du texte profil pour le NLP ---
+        nb_profiles = build_profiles_incremental(users_df, repos_df, output_path)
+        print(f"[INFO] Taille finale : {nb_profiles}")
+    else:
+        print(f"[INFO] Lecture utilisateurs : {users_path}")
+        users_df = pd.read_csv(users_path)
 
-    def build_profile_text(row):
-        parts = []
+        print(f"[INFO] Lecture repos : {repos_path}")
+        repos_df = pd.read_csv(repos_path)
 
-        # Infos perso
-        if row.get("name"):
-            parts.append(str(row["name"]))
-        if row.get("bio"):
-            parts.append(str(row["bio"]))
-        if row.get("company"):
-            parts.append(f"Company: {row['company']}")
-        if row.get("location"):
-            parts.append(f"Location: {row['location']}")
+        # --- Agrégation des repos + fusion + texte profil (cf. src/profiles.py) ---
+        merged_df = build_profiles_df(users_df, repos_df)
 
-        # Langages
-        if row.get("languages_list"):
-            parts.append(f"Languages: {row['languages_list']}")
+        # Sauvegarde
+        write_profiles(merged_df, output_path)
 
-        # Infos sur les repos
-        if row.get("nb_repos_fetched", 0) > 0:
-            parts.append(f"Number of repositories fetched: {row['nb_repos_fetched']}")
-        if row.get("total_stars", 0) > 0:
-            parts.append(f"Total stars: {row['total_stars']}")
+        if os.path.exists(FINGERPRINTS_PATH):
+            os.remove(FINGERPRINTS_PATH)
 
-        if row.get("repos_descriptions"):
-            parts.append(f"Projects: {row['repos_descriptions']}")
+    print(f"[OK] Profils enrichis sauvegardés dans : {output_path}")
 
-        text = " . ".join([p for p in parts if isinstance(p, str) and p.strip() != ""])
-        return text
+    if csv:
+        export_csv(output_path, PROFILES_CSV_PATH)
+        print(f"[OK] Export CSV : {PROFILES_CSV_PATH}")
 
-    merged_df["profile_text"] = merged_df.apply(build_profile_text, axis=1)
 
-    # On enlève les lignes où le texte profil est vide
-    merged_df = merged_df[merged_df["profile_text"].str.strip() != ""].copy()
-
-    # On peut trier par total_stars pour avoir les plus 'forts' en premier
-    merged_df["total_stars"] = pd.to_numeric(merged_df["total_stars"], errors="coerce").fillna(0).astype(int)
-    merged_df = merged_df.sort_values("total_stars", ascending=False)
-
-    # Sauvegarde
-    output_path = os.path.join(processed_dir, "profiles_enriched.csv")
-    merged_df.to_csv(output_path, index=False, encoding="utf-8")
-
-    print(f"[OK] Fichier enrichi sauvegardé dans : {output_path}")
+if __name__ == "__main__":
+    import argparse
 
+    parser = argparse.ArgumentParser(description="Construction des profils enrichis")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Lecture par chunks pour les dumps de repos plus gros que la RAM"
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help="Nombre de lignes lues à la fois (mode streaming)"
+    )
+    parser.add_argument(
+        "--max-memory-mb",
+        type=int,
+        default=1024,
+        help="Mémoire visée pour l'agrégation (mode streaming)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recalcule tous les profils au lieu des seuls logins modifiés"
+    )
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="Exporte aussi profiles_enriched.csv"
+    )
+    args = parser.parse_args()
 
-if __name__ == "__main__":
-    main()
+    main(streaming=args.streaming, chunksize=args.chunksize, max_memory_mb=args.max_memory_mb, csv=args.csv, full=args.full)
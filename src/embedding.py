@@ -1,30 +1,78 @@
 # génération des embeddings
 import os
+import sys
+from contextlib import nullcontext
+
 import numpy as np
-import pandas as pd
 from sentence_transformers import SentenceTransformer
 
+# Ajouter le répertoire racine au path (pour les imports src.*)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ann_index import build_ivf, remove_ivf
+from src.embedding_cache import EmbeddingCache, encode_with_cache
+from src.embedding_writer import DEFAULT_CHUNK_SIZE, encode_to_file
+from src.filter_index import FilterIndex, filters_path
+from src.index_registry import publish_index
+from src.encoding import DEFAULT_TOKEN_BUDGET, EncoderPool
+from src.projection import remove_projection, write_projection
+from src.quantization import approx_scores, load_compact, recall_at_k, remove_quantized, write_quantized
+from src.profile_store import INDEX_COLS, INDEX_STORE_PATH, PROFILES_STORE_PATH, read_index, read_profiles, write_index
+
 
 def get_base_dir():
     return os.path.dirname(os.path.dirname(__file__))
 
 
-def main():
+def main(
+    use_cache=True,
+    cache_max_mb=2048,
+    token_budget=DEFAULT_TOKEN_BUDGET,
+    workers=1,
+    threads=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    quantize=None,
+    pca_dim=None,
+    ann=False,
+    nlist=None,
+    publish=True,
+):
+    """
+    use_cache    : ne ré-encode que les profils absents du cache d'embeddings
+                   (data/cache/embeddings.sqlite, cf. src/embedding_cache.py).
+    cache_max_mb : taille max du cache (éviction LRU au-delà).
+    token_budget : lots triés par longueur, N tokens paddés max par lot
+                   (cf. src/encoding.py). None = lots fixes de 32 textes.
+    workers      : nb de processus d'encodage, chacun avec sa copie du modèle.
+    threads      : threads torch par worker (défaut : cœurs / workers).
+    chunk_size   : profils encodés puis écrits à la fois dans le .npy
+                   (memmap, cf. src/embedding_writer.py).
+    quantize     : "float16" ou "int8" : écrit aussi la matrice compacte
+                   utilisée par TalentSearcher(storage=...) et affiche le
+                   recall@10 obtenu avec re-scoring (cf. src/quantization.py).
+    pca_dim      : ajuste une PCA à pca_dim dimensions pour le premier tri
+                   de TalentSearcher(projection=True) (cf. src/projection.py).
+    ann          : construit l'index IVF de TalentSearcher(index="ivf")
+                   (cf. src/ann_index.py), avec nlist listes (défaut : 4 * sqrt(N)).
+    publish      : copie les artefacts dans une nouvelle version de
+                   data/processed/index/ et la rend courante : l'API la
+                   recharge sans redémarrer (cf. src/index_registry.py).
+    """
     base_dir = get_base_dir()
 
     processed_dir = os.path.join(base_dir, "data", "processed")
     os.makedirs(processed_dir, exist_ok=True)
 
-    profiles_path = os.path.join(processed_dir, "profiles_enriched.csv")
     embeddings_path = os.path.join(processed_dir, "profiles_embeddings.npy")
-    index_path = os.path.join(processed_dir, "profiles_index.csv")
+    index_path = INDEX_STORE_PATH
 
-    print(f"[INFO] Lecture des profils enrichis : {profiles_path}")
-    df = pd.read_csv(profiles_path)
+    # On ne charge que le texte à encoder et les colonnes de l'index
+    print(f"[INFO] Lecture des profils enrichis : {PROFILES_STORE_PATH}")
+    df = read_profiles(columns=["profile_text"] + INDEX_COLS)
 
     # On vérifie qu'on a bien la colonne profile_text
     if "profile_text" not in df.columns:
-        raise ValueError("La colonne 'profile_text' est absente de profiles_enriched.csv")
+        raise ValueError("La colonne 'profile_text' est absente des profils enrichis")
 
     # Optionnel : si on avait beaucoup de profils, on pourrait limiter
     # Ici, on garde tout
@@ -37,32 +85,172 @@ def main():
     model = SentenceTransformer(model_name)
 
     print("[INFO] Encodage des textes (embeddings)...")
-    embeddings = model.encode(
-        texts,
-        batch_size=32,
-        show_progress_bar=True,
-        convert_to_numpy=True,
-        normalize_embeddings=True,  # on normalise pour que cosine = dot
-    )
+    cache = EmbeddingCache(max_size_mb=cache_max_mb) if use_cache else None
+    dim = model.encode(["dim"], convert_to_numpy=True).shape[1]
+    pool_context = EncoderPool(model_name, dim, workers, threads, tmp_dir=processed_dir) if workers > 1 else nullcontext()
 
-    print(f"[INFO] Forme des embeddings : {embeddings.shape}")
+    def encode_chunk(chunk_texts):
+        return encode_with_cache(
+            model,
+            chunk_texts,
+            model_name,
+            cache=cache,
+            batch_size=32,
+            normalize_embeddings=True,  # on normalise pour que cosine = dot
+            token_budget=token_budget,
+            show_progress_bar=False,
+            pool=pool,
+        )
 
-    # Sauvegarde des embeddings
-    np.save(embeddings_path, embeddings)
+    # Écriture bloc par bloc dans le .npy en memmap (reprise possible après crash)
+    remove_quantized(embeddings_path)
+    remove_projection(embeddings_path)
+    remove_ivf(embeddings_path)
+    with pool_context as pool:
+        encode_to_file(
+            encode_chunk,
+            texts,
+            embeddings_path,
+            dim,
+            chunk_size=chunk_size,
+            key=f"{model_name}|normalize=True",
+        )
+    if cache is not None:
+        cache.report()
+        cache.close()
+
+    print(f"[INFO] Forme des embeddings : ({len(texts)}, {dim})")
     print(f"[OK] Embeddings sauvegardés dans : {embeddings_path}")
 
-    # Sauvegarde d'un index minimal (login + quelques infos)
-        # Sauvegarde d'un index minimal (login + quelques infos)
-    index_cols = []
-    for col in ["login", "name", "company", "location", "total_stars", "nb_repos_fetched", "languages_list"]:
-        if col in df.columns:
-            index_cols.append(col)
+    if quantize:
+        compact_path = write_quantized(embeddings_path, quantize)
+        print(f"[OK] Embeddings {quantize} sauvegardés dans : {compact_path}")
+        report_quantization(embeddings_path, quantize)
+
+    if pca_dim:
+        explained = write_projection(embeddings_path, pca_dim)
+        print(f"[OK] Projection PCA {dim} -> {pca_dim} dimensions (variance expliquée : {explained:.1%})")
 
-    index_df = df[index_cols].copy()
+    if ann:
+        print("[INFO] Construction de l'index IVF...")
+        built_nlist = build_ivf(embeddings_path, nlist)
+        print(f"[OK] Index IVF ({built_nlist} listes) sauvegardé à côté de : {embeddings_path}")
 
-    index_df.to_csv(index_path, index=False, encoding="utf-8")
+    # Sauvegarde d'un index minimal (login + quelques infos)
+    write_index(df, index_path)
     print(f"[OK] Index des profils sauvegardé dans : {index_path}")
 
+    # Index des filtres (langages, stars), ouvert en memmap par TalentSearcher
+    filters = FilterIndex(read_index(columns=["total_stars", "languages_list"], path=index_path))
+    filters.save(filters_path(index_path))
+    print(f"[OK] Index des filtres sauvegardé dans : {filters_path(index_path)}")
+
+    if publish:
+        version = publish_index(processed_dir, metadata={
+            "n_profiles": len(texts),
+            "dim": int(dim),
+            "model_name": model_name,
+        })
+        print(f"[OK] Index publié : version {version} (POST /index/reload pour la servir)")
+
+
+def report_quantization(embeddings_path, dtype, n_queries=50, k=10, rescore_factor=4):
+    """Recall@k du scan compact + re-scoring, avec des profils tirés au hasard comme requêtes."""
+    full = np.load(embeddings_path, mmap_mode="r")
+    if len(full) == 0:
+        return
+    matrix, scales = load_compact(embeddings_path, dtype)
+    rng = np.random.default_rng(0)
+    queries = np.asarray(full[np.sort(rng.choice(len(full), min(n_queries, len(full)), replace=False))])
+    recall = recall_at_k(
+        full, lambda q: approx_scores(matrix, q, scales), queries, k=k, rescore_factor=rescore_factor
+    )
+    print(
+        f"[INFO] {dtype} : {matrix.nbytes / 1024 / 1024:.1f} Mo en RAM "
+        f"(float32 : {full.nbytes / 1024 / 1024:.1f} Mo), "
+        f"recall@{k} avec re-scoring x{rescore_factor} : {recall:.4f}"
+    )
+
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Génération des embeddings des profils")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ré-encode tous les profils sans passer par le cache d'embeddings"
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=2048,
+        help="Taille max du cache d'embeddings (éviction LRU au-delà)"
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        default=DEFAULT_TOKEN_BUDGET,
+        help="Tokens paddés max par lot (0 = lots fixes de 32 textes)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus d'encodage (1 = un seul process)"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=None,
+        help="Threads torch par worker (défaut : nb de cœurs / workers)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Profils encodés puis écrits sur disque à la fois"
+    )
+    parser.add_argument(
+        "--quantize",
+        choices=["float16", "int8"],
+        default=None,
+        help="Écrit aussi une matrice compacte pour la recherche (re-scoring en float32)"
+    )
+    parser.add_argument(
+        "--pca-dim",
+        type=int,
+        default=None,
+        help="Ajuste une projection PCA pour le premier tri de la recherche (ex. 64)"
+    )
+    parser.add_argument(
+        "--ann",
+        action="store_true",
+        help="Construit l'index IVF pour la recherche approchée"
+    )
+    parser.add_argument(
+        "--nlist",
+        type=int,
+        default=None,
+        help="Nombre de listes de l'index IVF (défaut : 4 * sqrt(N))"
+    )
+    parser.add_argument(
+        "--no-publish",
+        action="store_true",
+        help="N'écrit pas de nouvelle version dans data/processed/index/"
+    )
+    args = parser.parse_args()
+
+    main(
+        use_cache=not args.no_cache,
+        cache_max_mb=args.cache_max_mb,
+        token_budget=args.token_budget or None,
+        workers=args.workers,
+        threads=args.threads,
+        chunk_size=args.chunk_size,
+        quantize=args.quantize,
+        pca_dim=args.pca_dim,
+        ann=args.ann,
+        nlist=args.nlist,
+        publish=not args.no_publish,
+    )
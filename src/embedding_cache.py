@@ -0,0 +1,238 @@
+"""
+embedding_cache.py
+Cache disque des embeddings, adressé par le contenu.
+
+Clé : (nom du modèle, révision du modèle, sha256 du texte). Avant d'appeler
+SentenceTransformer.encode, on cherche chaque texte dans le cache : seuls
+les textes absents (misses) sont envoyés au modèle. Les profils inchangés
+d'un run à l'autre (et les essais Optuna qui réutilisent le même modèle)
+ne sont donc plus ré-encodés.
+
+Les vecteurs sont stockés bruts (non normalisés) en float32 dans SQLite ;
+la normalisation est faite à la lecture si demandée. Quand la taille totale
+dépasse `max_size_mb`, les entrées les moins récemment utilisées sont
+supprimées.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from src.encoding import encode_texts
+
+# Nombre de paramètres par requête SQL (limite SQLite : 999 sur les vieilles versions)
+SQL_CHUNK = 500
+
+# Réécrire last_used à chaque lecture coûte plus cher que la lecture
+# elle-même : on ne le rafraîchit que s'il date de plus d'une heure.
+TOUCH_INTERVAL = 3600
+
+
+def get_base_dir():
+    return os.path.dirname(os.path.dirname(__file__))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_revision(model) -> str:
+    """
+    Révision du modèle : commit du Hub si connu (config transformers),
+    sinon "local". Un modèle ré-entraîné doit être sauvegardé sous un autre
+    nom, ou le cache vidé.
+    """
+    try:
+        config = model[0].auto_model.config
+        revision = getattr(config, "_commit_hash", None)
+        if revision:
+            return revision
+    except (AttributeError, IndexError, KeyError, TypeError):
+        pass
+    return "local"
+
+
+class EmbeddingCache:
+    """
+    Une base SQLite (data/cache/embeddings.sqlite par défaut).
+    Compte les hits (vecteurs réutilisés) et les misses (textes encodés).
+    """
+
+    def __init__(self, path: str | None = None, max_size_mb: int = 2048):
+        if path is None:
+            path = os.path.join(get_base_dir(), "data", "cache", "embeddings.sqlite")
+        self.path = path
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                revision TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, revision, text_hash)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, model: str, revision: str, hashes) -> dict:
+        """{text_hash: vecteur float32} pour les hashes présents."""
+        found = {}
+        stale = []
+        now = time.time()
+        hashes = list(hashes)
+        for start in range(0, len(hashes), SQL_CHUNK):
+            chunk = hashes[start:start + SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT rowid, text_hash, vector, last_used FROM embeddings "
+                f"WHERE model = ? AND revision = ? AND text_hash IN ({placeholders})",
+                [model, revision, *chunk],
+            )
+            for rowid, h, blob, last_used in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float32)
+                if now - last_used > TOUCH_INTERVAL:
+                    stale.append(rowid)
+
+        # Mise à jour de last_used pour l'éviction LRU (au plus une fois par TOUCH_INTERVAL)
+        for start in range(0, len(stale), SQL_CHUNK):
+            chunk = stale[start:start + SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            self.conn.execute(
+                f"UPDATE embeddings SET last_used = ? WHERE rowid IN ({placeholders})",
+                [now, *chunk],
+            )
+        if stale:
+            self.conn.commit()
+        return found
+
+    def put_many(self, model: str, revision: str, items):
+        """items : liste de (text_hash, vecteur)."""
+        now = time.time()
+        rows = []
+        for h, vector in items:
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((model, revision, h, blob, len(blob), now))
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, revision, text_hash, vector, size, last_used) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self.conn.commit()
+        self.evict()
+
+    def total_size(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()[0]
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_size_mb."""
+        excess = self.total_size() - self.max_size_bytes
+        if excess <= 0:
+            return
+
+        freed = 0
+        to_delete = []
+        for rowid, size in self.conn.execute("SELECT rowid, size FROM embeddings ORDER BY last_used"):
+            to_delete.append((rowid,))
+            freed += size
+            if freed >= excess:
+                break
+        self.conn.executemany("DELETE FROM embeddings WHERE rowid = ?", to_delete)
+        self.conn.commit()
+        print(f"[INFO] Cache embeddings : {len(to_delete)} entrées évincées ({freed / 1024 / 1024:.1f} Mo)")
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        print(
+            f"[INFO] Cache embeddings : {self.hits} hits, "
+            f"{self.misses} misses, taux de hit {rate:.1f}%"
+        )
+
+    def close(self):
+        self.conn.close()
+
+
+def encode_with_cache(
+    model,
+    texts,
+    model_name: str,
+    cache: EmbeddingCache | None = None,
+    batch_size: int = 32,
+    normalize_embeddings: bool = True,
+    show_progress_bar: bool = True,
+    token_budget: int | None = None,
+    workers: int = 1,
+    threads_per_worker: int | None = None,
+    pool=None,
+) -> np.ndarray:
+    """
+    Équivalent de encode_texts(model, texts, ...) (cf. src/encoding.py) qui
+    ne passe au modèle que les textes absents du cache (dédupliqués).
+    Sans cache, appelle simplement encode_texts.
+    """
+    if cache is None or len(texts) == 0:
+        return encode_texts(
+            model,
+            texts,
+            batch_size=batch_size,
+            token_budget=token_budget,
+            normalize_embeddings=normalize_embeddings,
+            show_progress_bar=show_progress_bar,
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+            model_name=model_name,
+            pool=pool,
+        )
+
+    revision = model_revision(model)
+    hashes = [text_hash(t) for t in texts]
+    found = cache.get_many(model_name, revision, set(hashes))
+
+    # Textes à encoder : un seul exemplaire par hash manquant
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in found and h not in missing:
+            missing[h] = t
+
+    nb_misses = sum(1 for h in hashes if h in missing)
+    cache.hits += len(texts) - nb_misses
+    cache.misses += nb_misses
+
+    if missing:
+        print(f"[INFO] Encodage de {len(missing)} texte(s) absents du cache (sur {len(texts)})")
+        new_vectors = encode_texts(
+            model,
+            list(missing.values()),
+            batch_size=batch_size,
+            token_budget=token_budget,
+            normalize_embeddings=False,
+            show_progress_bar=show_progress_bar,
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+            model_name=model_name,
+            pool=pool,
+        )
+        new_items = list(zip(missing.keys(), new_vectors))
+        cache.put_many(model_name, revision, new_items)
+        found.update(new_items)
+
+    embeddings = np.vstack([found[h] for h in hashes]).astype(np.float32, copy=False)
+    if normalize_embeddings:
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.maximum(norms, 1e-12)
+    return embeddings
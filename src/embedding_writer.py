@@ -0,0 +1,109 @@
+"""
+embedding_writer.py
+Encodage en streaming vers profiles_embeddings.npy (memmap).
+
+Au lieu de garder toute la matrice en RAM puis de faire np.save, le
+fichier .npy est préalloué et ouvert en memmap. Les textes sont encodés par
+blocs de `chunk_size` lignes, chaque bloc est écrit à sa place puis flushé
+sur disque : la mémoire utilisée ne dépend plus de la taille du corpus.
+
+L'encodage se fait dans « <fichier>.partial », renommé (os.replace) sur le
+.npy une fois terminé : le fichier servi n'est jamais réécrit sur place,
+une API qui l'a ouvert en memmap garde l'ancienne version.
+
+Un fichier « .progress.json » accompagne le fichier partiel tant que
+l'encodage n'est pas terminé (masque des blocs déjà écrits + empreinte du
+corpus) ; un nouveau run sur le même corpus reprend aux blocs manquants.
+Il est supprimé à la fin.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+from tqdm import tqdm
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def progress_path(path: str) -> str:
+    return f"{path}.progress.json"
+
+
+def partial_path(path: str) -> str:
+    return f"{path}.partial"
+
+
+def is_partial(path: str) -> bool:
+    """True si `path` est un fichier incomplet (écrit sur place par une version précédente)."""
+    return os.path.exists(progress_path(path))
+
+
+def corpus_key(texts, extra: str = "") -> str:
+    """Empreinte du corpus (textes dans l'ordre + paramètres d'encodage)."""
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for text in texts:
+        digest.update(hashlib.sha256(text.encode("utf-8")).digest())
+    return digest.hexdigest()
+
+
+def _write_progress(path: str, state: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _open_output(path: str, n: int, dim: int, chunk_size: int, key: str):
+    """Reprend un fichier partiel compatible, sinon en préalloue un nouveau."""
+    n_chunks = (n + chunk_size - 1) // chunk_size
+    state = {"n": n, "dim": dim, "chunk_size": chunk_size, "key": key, "done": [False] * n_chunks}
+
+    if is_partial(path) and os.path.exists(path):
+        try:
+            with open(progress_path(path), encoding="utf-8") as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = None
+        same = previous is not None and all(previous.get(k) == state[k] for k in ("n", "dim", "chunk_size", "key"))
+        if same:
+            print(f"[INFO] Reprise de {path} : {sum(previous['done'])}/{n_chunks} blocs déjà encodés")
+            return np.load(path, mmap_mode="r+"), previous
+        print(f"[AVERTISSEMENT] Fichier partiel {path} d'un autre corpus, on repart de zéro")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Le fichier de progression est créé avant le .npy : un crash entre les
+    # deux laisse un fichier marqué partiel, jamais un .npy vide pris pour complet
+    _write_progress(progress_path(path), state)
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n, dim))
+    return out, state
+
+
+def encode_to_file(encode_fn, texts, path: str, dim: int, chunk_size: int = DEFAULT_CHUNK_SIZE, key: str = ""):
+    """
+    encode_fn(textes) -> matrice (len(textes), dim), appelée bloc par bloc.
+    `key` identifie les paramètres d'encodage (modèle, normalisation...) :
+    un fichier partiel n'est repris que pour le même corpus et la même clé.
+    `path` n'est remplacé qu'une fois tous les blocs écrits.
+    """
+    n = len(texts)
+    tmp_path = partial_path(path)
+    out, state = _open_output(tmp_path, n, dim, chunk_size, corpus_key(texts, key))
+
+    todo = [i for i, done in enumerate(state["done"]) if not done]
+    for chunk in tqdm(todo, desc="Blocs"):
+        start = chunk * chunk_size
+        end = min(start + chunk_size, n)
+        out[start:end] = encode_fn(texts[start:end])
+        out.flush()
+
+        state["done"][chunk] = True
+        _write_progress(progress_path(tmp_path), state)
+
+    del out
+    os.replace(tmp_path, path)
+    os.remove(progress_path(tmp_path))
+    # Fichier partiel écrit sur place par une version précédente
+    if is_partial(path):
+        os.remove(progress_path(path))
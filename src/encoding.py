@@ -0,0 +1,289 @@
+"""
+encoding.py
+Encodage des profils par lots de taille variable (budget de tokens).
+
+model.encode(texts, batch_size=32) fait des lots de 32 textes : une bio
+courte se retrouve paddée à la longueur de la plus longue description du
+lot, et les lots de textes courts sont sous-remplis.
+
+Ici on tokenise une fois tous les textes pour connaître leur longueur
+(tronquée à max_seq_length), on les trie par longueur décroissante, puis on
+remplit chaque lot tant que (nb textes x longueur max du lot) reste sous
+`token_budget`. Les textes courts partent donc par centaines, les longs par
+petits lots. Les embeddings sont replacés dans l'ordre d'origine.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+from tqdm import tqdm
+
+DEFAULT_TOKEN_BUDGET = 8192
+
+# Au-delà, le gain sur les textes très courts est négligeable
+MAX_BATCH_SIZE = 512
+
+# Textes tokenisés à la fois pour mesurer les longueurs
+TOKENIZE_CHUNK = 10_000
+
+# Mode multi-process : nb de shards par worker (équilibrage de charge)
+SHARDS_PER_WORKER = 4
+
+
+def token_lengths(model, texts) -> np.ndarray:
+    """Nombre de tokens de chaque texte (tokens spéciaux inclus, tronqué)."""
+    tokenizer = model.tokenizer
+    max_length = model.max_seq_length
+    lengths = np.empty(len(texts), dtype=np.int64)
+    for start in range(0, len(texts), TOKENIZE_CHUNK):
+        chunk = texts[start:start + TOKENIZE_CHUNK]
+        encoded = tokenizer(
+            chunk,
+            add_special_tokens=True,
+            truncation=True,
+            max_length=max_length,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )
+        lengths[start:start + len(chunk)] = [len(ids) for ids in encoded["input_ids"]]
+    return lengths
+
+
+def make_batches(lengths: np.ndarray, token_budget: int = DEFAULT_TOKEN_BUDGET, max_batch_size: int = MAX_BATCH_SIZE):
+    """
+    Découpe les indices (triés par longueur décroissante) en lots dont le
+    coût paddé (nb textes x plus grande longueur) tient dans token_budget.
+    Un texte plus long que le budget forme un lot à lui seul.
+    """
+    order = np.argsort(-lengths, kind="stable")
+    batches = []
+    start = 0
+    n = len(order)
+    while start < n:
+        # Le premier texte du lot est le plus long : il fixe le padding
+        longest = max(int(lengths[order[start]]), 1)
+        size = max(1, min(max_batch_size, token_budget // longest))
+        batches.append(order[start:start + size])
+        start += size
+    return batches
+
+
+def encode_texts(
+    model,
+    texts,
+    batch_size: int = 32,
+    token_budget: int | None = None,
+    normalize_embeddings: bool = True,
+    show_progress_bar: bool = True,
+    workers: int = 1,
+    threads_per_worker: int | None = None,
+    model_name: str | None = None,
+    pool: "EncoderPool | None" = None,
+) -> np.ndarray:
+    """
+    token_budget=None : model.encode avec des lots fixes de batch_size textes
+                        (comportement historique).
+    token_budget=N    : lots triés par longueur, N tokens paddés max par lot.
+    workers>1         : textes répartis entre `workers` processus, chacun avec
+                        sa copie de `model_name` (cf. encode_parallel).
+    pool              : EncoderPool déjà démarré (prioritaire sur workers).
+    Retourne une matrice float32 (len(texts), dim) dans l'ordre de `texts`.
+    """
+    if pool is not None and len(texts) > 0:
+        return pool.encode(
+            texts,
+            batch_size=batch_size,
+            token_budget=token_budget,
+            normalize_embeddings=normalize_embeddings,
+            show_progress_bar=show_progress_bar,
+        )
+
+    if workers > 1 and len(texts) > 0:
+        if model_name is None:
+            raise ValueError("Le mode multi-process a besoin de model_name (chargé dans chaque worker)")
+        return encode_parallel(
+            model_name,
+            texts,
+            workers=workers,
+            threads_per_worker=threads_per_worker,
+            batch_size=batch_size,
+            token_budget=token_budget,
+            normalize_embeddings=normalize_embeddings,
+            show_progress_bar=show_progress_bar,
+            dim=model.encode(list(texts[:1]), convert_to_numpy=True).shape[1],
+        )
+
+    if token_budget is None or len(texts) == 0:
+        return model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=show_progress_bar,
+            convert_to_numpy=True,
+            normalize_embeddings=normalize_embeddings,
+        )
+
+    texts = list(texts)
+    batches = make_batches(token_lengths(model, texts), token_budget)
+
+    embeddings = None
+    for idx in tqdm(batches, desc="Batches", disable=not show_progress_bar):
+        batch_embeddings = model.encode(
+            [texts[i] for i in idx],
+            batch_size=len(idx),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=normalize_embeddings,
+        )
+        if embeddings is None:
+            embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=np.float32)
+        embeddings[idx] = batch_embeddings
+    return embeddings
+
+
+# --- Mode multi-process ---------------------------------------------------
+
+# Modèle chargé une fois par worker (cf. _init_worker)
+_worker_model = None
+
+
+def _init_worker(model_name, threads):
+    global _worker_model
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _worker_model = SentenceTransformer(model_name, device="cpu")
+
+
+def _encode_shard(idx, texts, out_path, batch_size, token_budget, normalize_embeddings):
+    """Encode un shard et écrit ses lignes directement dans la matrice partagée."""
+    embeddings = encode_texts(
+        _worker_model,
+        texts,
+        batch_size=batch_size,
+        token_budget=token_budget,
+        normalize_embeddings=normalize_embeddings,
+        show_progress_bar=False,
+    )
+    out = np.load(out_path, mmap_mode="r+")
+    out[idx] = embeddings
+    out.flush()
+    return len(idx)
+
+
+def default_threads(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // workers)
+
+
+class EncoderPool:
+    """
+    `workers` processus de `threads_per_worker` threads torch chacun (par
+    défaut : cœurs / workers), chacun avec sa copie de `model_name`
+    (embeddings de dimension `dim`).
+    À utiliser comme context manager ; les workers restent chargés entre
+    deux appels à encode (encodage par blocs, cf. src/embedding_writer.py).
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        dim: int,
+        workers: int,
+        threads_per_worker: int | None = None,
+        tmp_dir: str | None = None,
+    ):
+        self.model_name = model_name
+        self.dim = dim
+        self.workers = workers
+        self.threads = threads_per_worker or default_threads(workers)
+        self.tmp_dir = tmp_dir
+        self.executor = None
+
+    def __enter__(self):
+        print(f"[INFO] Encodage multi-process : {self.workers} worker(s) x {self.threads} thread(s)")
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads),
+        )
+        return self
+
+    def __exit__(self, *exc):
+        self.executor.shutdown()
+        self.executor = None
+
+    def encode(
+        self,
+        texts,
+        batch_size: int = 32,
+        token_budget: int | None = None,
+        normalize_embeddings: bool = True,
+        show_progress_bar: bool = True,
+    ) -> np.ndarray:
+        """
+        Les textes sont découpés en workers x SHARDS_PER_WORKER shards
+        entrelacés (i, i + n, i + 2n...) pour que chaque shard ait un mélange
+        de textes courts et longs. Chaque worker écrit ses lignes dans une
+        matrice .npy en memmap partagée (pas de /dev/shm, souvent limité à
+        64 Mo en conteneur).
+        """
+        texts = list(texts)
+        work_dir = tempfile.mkdtemp(prefix="encode_", dir=self.tmp_dir)
+        out_path = os.path.join(work_dir, "embeddings.npy")
+        try:
+            out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(len(texts), self.dim))
+            del out
+
+            n_shards = min(len(texts), self.workers * SHARDS_PER_WORKER)
+            futures = []
+            for shard in range(n_shards):
+                idx = np.arange(shard, len(texts), n_shards)
+                futures.append(self.executor.submit(
+                    _encode_shard,
+                    idx,
+                    [texts[i] for i in idx],
+                    out_path,
+                    batch_size,
+                    token_budget,
+                    normalize_embeddings,
+                ))
+            with tqdm(total=len(texts), desc="Profils", disable=not show_progress_bar) as progress:
+                for future in as_completed(futures):
+                    progress.update(future.result())
+
+            return np.array(np.load(out_path, mmap_mode="r"))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def encode_parallel(
+    model_name: str,
+    texts,
+    workers: int,
+    threads_per_worker: int | None = None,
+    batch_size: int = 32,
+    token_budget: int | None = None,
+    normalize_embeddings: bool = True,
+    show_progress_bar: bool = True,
+    dim: int | None = None,
+    tmp_dir: str | None = None,
+) -> np.ndarray:
+    """Encodage ponctuel avec un EncoderPool créé pour l'occasion."""
+    if dim is None:
+        from sentence_transformers import SentenceTransformer
+
+        dim = SentenceTransformer(model_name, device="cpu").encode(["dim"], convert_to_numpy=True).shape[1]
+
+    with EncoderPool(model_name, dim, workers, threads_per_worker, tmp_dir) as pool:
+        return pool.encode(
+            texts,
+            batch_size=batch_size,
+            token_budget=token_budget,
+            normalize_embeddings=normalize_embeddings,
+            show_progress_bar=show_progress_bar,
+        )
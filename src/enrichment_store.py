@@ -0,0 +1,310 @@
+"""
+enrichment_store.py
+Store persistant des enrichissements LLM des profils (compétences + résumé).
+
+Clé : (version des enrichissements, sha256 du texte du profil). La version
+(cf. src/agent.py) combine le modèle LLM et un hash des prompts : changer
+l'un ou l'autre invalide les entrées. Une version par famille de prompts :
+ENRICHMENT_VERSION (appels séparés, pipeline) et ANALYSIS_VERSION (appel
+combiné de /agent_search). Le texte du profil change => nouveau hash =>
+ré-enrichi.
+
+/agent_search lit ce store (les deux versions) : seuls les profils absents
+(misses) sont envoyés à Ollama, et leurs résultats sont écrits sous la
+version des prompts qui les ont produits. Les échecs d'Ollama ne sont
+jamais mis en cache.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ajouter le répertoire racine au path (pour les imports src.*)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent import (
+    ANALYSIS_VERSION,
+    ENRICHMENT_VERSION,
+    aanalyse_profile,
+    aenrich_profile,
+    ascore_with_context,
+    enrich_profile,
+)
+from src.embedding_cache import SQL_CHUNK, text_hash
+
+UNAVAILABLE = {"skills": [], "summary": "Analyse indisponible"}
+
+# Appels en vol par worker : un lot de workers * CHUNK_PER_WORKER profils est
+# enrichi puis écrit dans le store (point de reprise) avant le suivant
+CHUNK_PER_WORKER = 8
+
+
+def get_base_dir():
+    return os.path.dirname(os.path.dirname(__file__))
+
+
+class EnrichmentStore:
+    """
+    Une base SQLite (data/cache/enrichments.sqlite par défaut), utilisable
+    depuis plusieurs threads. Compte les hits et les misses.
+    """
+
+    def __init__(self, path: str | None = None):
+        if path is None:
+            path = os.path.join(get_base_dir(), "data", "cache", "enrichments.sqlite")
+        self.path = path
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS enrichments (
+                version TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                skills TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (version, text_hash)
+            )
+            """
+        )
+        self.conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, version: str, hashes) -> dict:
+        """{text_hash: {"skills": [...], "summary": ...}} pour les hashes présents."""
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            for start in range(0, len(hashes), SQL_CHUNK):
+                chunk = hashes[start:start + SQL_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT text_hash, skills, summary FROM enrichments "
+                    f"WHERE version = ? AND text_hash IN ({placeholders})",
+                    [version, *chunk],
+                )
+                for h, skills, summary in rows:
+                    found[h] = {"skills": json.loads(skills), "summary": summary}
+        return found
+
+    def put_many(self, version: str, items):
+        """items : liste de (text_hash, {"skills": [...], "summary": ...})."""
+        now = time.time()
+        rows = [
+            (version, h, json.dumps(e["skills"], ensure_ascii=False), e["summary"], now)
+            for h, e in items
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO enrichments (version, text_hash, skills, summary, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+
+    def count(self, version: str | None = None) -> int:
+        with self._lock:
+            if version is None:
+                return self.conn.execute("SELECT COUNT(*) FROM enrichments").fetchone()[0]
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM enrichments WHERE version = ?", (version,)
+            ).fetchone()[0]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": ENRICHMENT_VERSION,
+            "entries": self.count(ENRICHMENT_VERSION),
+            "analysis_version": ANALYSIS_VERSION,
+            "analysis_entries": self.count(ANALYSIS_VERSION),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
+
+
+def enrich_with_store(texts, store: EnrichmentStore | None = None, enrich=enrich_profile,
+                      version: str = ENRICHMENT_VERSION) -> list[dict]:
+    """
+    Enrichissements {"skills", "summary"} de chaque texte, dans l'ordre.
+    Seuls les textes absents du store (dédupliqués) passent par enrich(texte),
+    puis sont écrits. Échec d'enrich : UNAVAILABLE, non mis en cache.
+    Sans store, enrich est appelé pour chaque texte distinct.
+    """
+    hashes = [text_hash(t) for t in texts]
+    found = store.get_many(version, set(hashes)) if store is not None else {}
+
+    # Textes à enrichir : un seul exemplaire par hash manquant
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in found and h not in missing:
+            missing[h] = t
+
+    if store is not None:
+        nb_misses = sum(1 for h in hashes if h in missing)
+        store.hits += len(texts) - nb_misses
+        store.misses += nb_misses
+
+    new_items = []
+    for h, t in missing.items():
+        try:
+            enrichment = enrich(t)
+            enrichment.pop("tokens", None)
+            new_items.append((h, enrichment))
+        except Exception as e:
+            print(f"[ERREUR] Enrichissement LLM impossible : {e}")
+    if store is not None and new_items:
+        store.put_many(version, new_items)
+    found.update(new_items)
+
+    return [found.get(h) or dict(UNAVAILABLE, skills=[]) for h in hashes]
+
+
+async def aanalyse_with_store(text: str, job_description: str, store: EnrichmentStore | None = None) -> dict:
+    """
+    Compétences, résumé et score d'un candidat pour un poste, avec le
+    minimum d'appels LLM :
+    - profil dans le store (pipeline ou appel combiné précédent) : un seul
+      appel, le score (dépend du poste) ;
+    - sinon un appel combiné (sortie JSON, cf. src/agent.aanalyse_profile),
+      compétences et résumé écrits sous ANALYSIS_VERSION ; s'ils sont
+      invalides, ils sont redemandés par les appels séparés et écrits sous
+      ENRICHMENT_VERSION.
+    Score None si aucun appel n'a donné de score lisible.
+    """
+    h = text_hash(text)
+    found = {}
+    if store is not None:
+        # Enrichissements du pipeline d'abord, puis ceux des appels combinés
+        for version in (ENRICHMENT_VERSION, ANALYSIS_VERSION):
+            found = store.get_many(version, [h])
+            if found:
+                break
+        store.hits += h in found
+        store.misses += h not in found
+
+    if h in found:
+        enrichment = found[h]
+        score = await ascore_with_context({"skills": enrichment["skills"], "raw_text": text}, job_description)
+        return {**enrichment, "score": score}
+
+    try:
+        analysis = await aanalyse_profile(text, job_description)
+    except Exception as e:
+        # Ollama injoignable ou délai dépassé : pas de nouvel essai
+        print(f"[ERREUR] Analyse LLM impossible : {e!r}")
+        return {**UNAVAILABLE, "skills": [], "score": None}
+
+    if analysis["skills"] is None or analysis["summary"] is None:
+        # Sortie incomplète ou invalide : compétences et résumé par les appels séparés
+        print("[ATTENTION] Réponse JSON invalide ou incomplète, appels séparés")
+        version = ENRICHMENT_VERSION
+        try:
+            enrichment = await aenrich_profile(text)
+            enrichment.pop("tokens", None)
+        except Exception as e:
+            print(f"[ERREUR] Enrichissement LLM impossible : {e!r}")
+            enrichment = None
+    else:
+        version = ANALYSIS_VERSION
+        enrichment = {"skills": analysis["skills"], "summary": analysis["summary"]}
+
+    if enrichment is not None and store is not None:
+        store.put_many(version, [(h, enrichment)])
+    enrichment = enrichment or dict(UNAVAILABLE, skills=[])
+
+    score = analysis["score"]
+    if score is None:
+        score = await ascore_with_context({"skills": enrichment["skills"], "raw_text": text}, job_description)
+    return {**enrichment, "score": score}
+
+
+def enrich_corpus(texts, store: EnrichmentStore, workers: int = 4, enrich=enrich_profile,
+                  version: str = ENRICHMENT_VERSION) -> dict:
+    """
+    Enrichissement hors ligne de tout un corpus : les textes déjà dans le
+    store (même hash, même version) sont sautés, les autres sont envoyés
+    à Ollama par `workers` threads (appels en vol bornés). Chaque lot est
+    écrit dès qu'il est terminé : un run interrompu reprend où il s'était
+    arrêté. S'arrête si un lot entier échoue (serveur injoignable).
+
+    Retourne les compteurs et le débit (profils/s, tokens/s).
+    """
+    start = time.perf_counter()
+    # Un seul exemplaire par texte
+    by_hash = {}
+    for t in texts:
+        by_hash.setdefault(text_hash(t), t)
+    done = store.get_many(version, by_hash.keys())
+    todo = [(h, t) for h, t in by_hash.items() if h not in done]
+    print(f"[INFO] Enrichissement LLM : {len(todo)} profil(s) à traiter, "
+          f"{len(by_hash) - len(todo)} déjà dans le store ({version})")
+
+    def run(item):
+        h, t = item
+        try:
+            return h, enrich(t), None
+        except Exception as e:
+            return h, None, e
+
+    stats = {"profiles": len(by_hash), "skipped": len(by_hash) - len(todo),
+             "enriched": 0, "failed": 0, "tokens": 0}
+    chunk_size = max(1, workers) * CHUNK_PER_WORKER
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for chunk_start in range(0, len(todo), chunk_size):
+            items, errors = [], []
+            for h, enrichment, error in pool.map(run, todo[chunk_start:chunk_start + chunk_size]):
+                if error is not None:
+                    errors.append(error)
+                    continue
+                stats["tokens"] += enrichment.pop("tokens", 0)
+                items.append((h, enrichment))
+            if items:
+                store.put_many(version, items)
+            stats["enriched"] += len(items)
+            stats["failed"] += len(errors)
+
+            processed = chunk_start + len(items) + len(errors)
+            print(f"[INFO] {processed}/{len(todo)} profils traités ({stats['failed']} échec(s))")
+            if errors and not items:
+                print(f"[ERREUR] Lot entièrement en échec, arrêt de l'enrichissement : {errors[0]}")
+                break
+            if errors:
+                print(f"[ATTENTION] {len(errors)} échec(s) dans le lot, ex. : {errors[0]}")
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["profiles_per_s"] = stats["enriched"] / elapsed if elapsed else 0.0
+    stats["tokens_per_s"] = stats["tokens"] / elapsed if elapsed else 0.0
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.profile_store import read_profiles
+
+    parser = argparse.ArgumentParser(description="Enrichissement LLM hors ligne des profils")
+    parser.add_argument("--workers", type=int, default=4, help="Appels Ollama en parallèle")
+    parser.add_argument("--limit", type=int, default=None, help="N premiers profils seulement")
+    args = parser.parse_args()
+
+    texts = read_profiles(columns=["profile_text"])["profile_text"].astype(str).tolist()[:args.limit]
+    store = EnrichmentStore()
+    stats = enrich_corpus(texts, store, workers=args.workers)
+    store.close()
+    print(f"[OK] {stats['enriched']} enrichis, {stats['skipped']} déjà présents, {stats['failed']} échecs "
+          f"en {stats['seconds']:.1f} s ({stats['profiles_per_s']:.2f} profils/s, "
+          f"{stats['tokens_per_s']:.0f} tokens/s)")
@@ -1,20 +1,32 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
 from sklearn.metrics import mean_absolute_error
 
+# Ajouter le répertoire racine au path (pour les imports src.*)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import DATA_PROCESSED_DIR, EMBEDDINGS_PATH
+from src.profile_store import read_agent_scores
+from src.projection import load_projection, projected_path, projected_scores
+from src.quantization import approx_scores, load_compact, quantized_path, recall_at_k, rescore, top_indices
+
 def evaluate_agent():
     # Chemins des fichiers
-    gold_path = "data/processed/gold_standard.csv"
-    results_path = "data/processed/profiles_enriched.csv"
+    gold_path = os.path.join(DATA_PROCESSED_DIR, "gold_standard.csv")
 
-    if not os.path.exists(gold_path) or not os.path.exists(results_path):
+    if not os.path.exists(gold_path):
         print(f"[ERREUR] Fichiers introuvables dans data/processed/")
         return
 
-    # 1. Chargement des données
+    # 1. Chargement des données (seuls login + agent_score sont utiles côté IA)
     gold_df = pd.read_csv(gold_path)
-    results_df = pd.read_csv(results_path)
+    try:
+        results_df = read_agent_scores()
+    except FileNotFoundError:
+        print(f"[ERREUR] Fichiers introuvables dans data/processed/")
+        return
 
     # 2. Harmonisation des noms de colonnes pour la fusion
     # On force tout en minuscules pour éviter les erreurs de casse
@@ -61,5 +73,85 @@ def evaluate_agent():
     print("plus Llama 3 réfléchit comme un humain.")
     print("="*45 + "\n")
 
+def _first_stages(embeddings_path):
+    """Premiers tris disponibles à côté des embeddings : (nom, Mo en RAM, fonction query -> scores)."""
+    stages = []
+    for dtype in ("float16", "int8"):
+        if os.path.exists(quantized_path(embeddings_path, dtype)):
+            matrix, scales = load_compact(embeddings_path, dtype)
+            stages.append((dtype, matrix.nbytes, lambda q, m=matrix, s=scales: approx_scores(m, q, s)))
+    if os.path.exists(projected_path(embeddings_path)):
+        components, projected = load_projection(embeddings_path)
+        stages.append((
+            f"pca {projected.shape[1]}d",
+            projected.nbytes,
+            lambda q, c=components, p=projected: projected_scores(c, p, q),
+        ))
+    return stages
+
+
+def evaluate_search(k=10, n_queries=100, rescore_factor=4, embeddings_path=EMBEDDINGS_PATH):
+    """
+    Compromis latence / recall de la recherche : recherche exacte (float32)
+    contre chaque premier tri approché disponible (float16, int8, PCA)
+    suivi du re-scoring de k * rescore_factor candidats. Les requêtes sont
+    des profils tirés au hasard.
+    """
+    import time
+
+    if not os.path.exists(embeddings_path):
+        print(f"[ERREUR] Embeddings introuvables : {embeddings_path}")
+        return
+
+    full = np.load(embeddings_path)
+    rng = np.random.default_rng(0)
+    queries = full[rng.choice(len(full), min(n_queries, len(full)), replace=False)]
+
+    def latencies(search):
+        times = []
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            times.append((time.perf_counter() - start) * 1000)
+        return np.mean(times), np.percentile(times, 99)
+
+    def exact_search(query):
+        return top_indices(full @ query, k)
+
+    def approx_search(first_stage):
+        def search(query):
+            shortlist = top_indices(first_stage(query), k * rescore_factor)
+            return shortlist[top_indices(rescore(full, shortlist, query), k)]
+        return search
+
+    print("\n" + "=" * 72)
+    print(f"RECHERCHE : {len(full)} profils, {len(queries)} requêtes, re-scoring x{rescore_factor}")
+    print("=" * 72)
+    print(f"{'premier tri':>14} | {'RAM (Mo)':>8} | {'moy. (ms)':>9} | {'p99 (ms)':>8} | {'recall@' + str(k):>9}")
+
+    mean_ms, p99_ms = latencies(exact_search)
+    print(f"{'exact float32':>14} | {full.nbytes / 1024 / 1024:>8.1f} | {mean_ms:>9.2f} | {p99_ms:>8.2f} | {1.0:>9.4f}")
+
+    for name, nbytes, first_stage in _first_stages(embeddings_path):
+        mean_ms, p99_ms = latencies(approx_search(first_stage))
+        recall = recall_at_k(full, first_stage, queries, k=k, rescore_factor=rescore_factor)
+        print(f"{name:>14} | {nbytes / 1024 / 1024:>8.1f} | {mean_ms:>9.2f} | {p99_ms:>8.2f} | {recall:>9.4f}")
+    print("=" * 72 + "\n")
+
+
 if __name__ == "__main__":
-    evaluate_agent()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Évaluation de l'agent IA et de la recherche")
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Évalue aussi le compromis latence / recall des premiers tris approchés"
+    )
+    parser.add_argument("--k", type=int, default=10, help="k du recall@k (mode --search)")
+    parser.add_argument("--rescore-factor", type=int, default=4, help="Taille de la shortlist = k x facteur")
+    args = parser.parse_args()
+
+    evaluate_agent()
+    if args.search:
+        evaluate_search(k=args.k, rescore_factor=args.rescore_factor)
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""
+filter_index.py
+Index des filtres de TalentSearcher (min_stars, language_filter), construits
+une fois au chargement.
+
+- langage -> ids des profils (tableaux triés) : index inversé sur les
+  langages de languages_list ("Python, Go" -> python, go)
+- ids triés par total_stars : min_stars = un searchsorted
+
+Un filtre renvoie les ids (triés) des profils qui le passent ; plusieurs
+filtres = intersection. Seuls ces profils sont ensuite scorés, donc plus
+un filtre est sélectif, plus la requête est rapide.
+
+embedding.py écrit l'index des filtres à côté de l'index des profils
+(profiles_index.filters/, fichiers .npy) : TalentSearcher l'ouvre en
+memmap au lieu de le reconstruire à chaque démarrage.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+ARRAYS = ("stars", "star_ids", "sorted_stars", "language_ids", "language_offsets")
+
+
+def filters_path(index_path: str) -> str:
+    root, _ = os.path.splitext(index_path)
+    return f"{root}.filters"
+
+
+def _contains(sorted_ids: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Masque : chaque élément de `ids` est-il dans `sorted_ids` ? (O(len(ids) log n))"""
+    if len(sorted_ids) == 0:
+        return np.zeros(len(ids), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+    return sorted_ids[positions] == ids
+
+
+def _union(postings) -> np.ndarray:
+    if not postings:
+        return np.empty(0, dtype=np.int64)
+    if len(postings) == 1:
+        return postings[0]
+    return np.unique(np.concatenate(postings))
+
+
+class FilterIndex:
+    def __init__(self, index_df: pd.DataFrame | None = None):
+        self.n = 0
+        self.stars, self.star_ids, self.sorted_stars = None, None, None
+        self.languages = None
+        if index_df is not None:
+            self._build(index_df)
+
+    def _build(self, index_df: pd.DataFrame):
+        self.n = len(index_df)
+
+        # min_stars : ids rangés par stars croissantes (stars manquantes exclues)
+        if "total_stars" in index_df.columns:
+            self.stars = pd.to_numeric(index_df["total_stars"], errors="coerce").to_numpy(dtype=np.float64)
+            valid = np.flatnonzero(~np.isnan(self.stars))
+            self.star_ids = valid[np.argsort(self.stars[valid], kind="stable")]
+            self.sorted_stars = self.stars[self.star_ids]
+
+        # language_filter : langage (minuscules) -> ids triés
+        if "languages_list" in index_df.columns:
+            tokens = (
+                index_df["languages_list"].reset_index(drop=True)
+                .dropna().astype(str).str.lower().str.split(",").explode().str.strip()
+            )
+            tokens = tokens[tokens != ""]
+            codes, vocabulary = pd.factorize(tokens)
+            order = np.argsort(codes, kind="stable")
+            groups = np.split(tokens.index.to_numpy(dtype=np.int64)[order], np.cumsum(np.bincount(codes))[:-1])
+            # np.unique : un langage répété dans la même liste ("Go, go")
+            self.languages = {language: np.unique(ids) for language, ids in zip(vocabulary, groups)}
+
+    def save(self, path: str):
+        """Écrit l'index des filtres dans le dossier `path` (un .npy par tableau)."""
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        arrays = {"stars": self.stars, "star_ids": self.star_ids, "sorted_stars": self.sorted_stars}
+        vocabulary = None
+        if self.languages is not None:
+            vocabulary = list(self.languages)
+            postings = [self.languages[language] for language in vocabulary]
+            arrays["language_ids"] = np.concatenate(postings) if postings else np.empty(0, dtype=np.int64)
+            arrays["language_offsets"] = np.concatenate([[0], np.cumsum([len(ids) for ids in postings])]).astype(np.int64)
+        # Nom temporaire puis os.replace : un TalentSearcher qui a ouvert les
+        # anciens tableaux en memmap les garde, rien n'est réécrit sur place
+        for name in ARRAYS:
+            if arrays.get(name) is not None:
+                tmp_path = os.path.join(path, f"{name}.tmp.npy")
+                np.save(tmp_path, arrays[name])
+                os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+        # meta.json en dernier : sa présence marque un index complet
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"n": self.n, "has_stars": self.stars is not None, "languages": vocabulary}, f)
+        os.replace(tmp_path, meta_path)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str | None = "r"):
+        """Index des filtres écrit par save(), tableaux en memmap par défaut."""
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        def array(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+
+        index = cls()
+        index.n = meta["n"]
+        if meta["has_stars"]:
+            index.stars, index.star_ids, index.sorted_stars = array("stars"), array("star_ids"), array("sorted_stars")
+        if meta["languages"] is not None:
+            ids, offsets = array("language_ids"), array("language_offsets")
+            index.languages = {
+                language: ids[offsets[i]:offsets[i + 1]] for i, language in enumerate(meta["languages"])
+            }
+        return index
+
+    def min_stars_ids(self, min_stars) -> np.ndarray:
+        """Ids des profils avec total_stars >= min_stars (non triés, vue sans copie)."""
+        return self.star_ids[np.searchsorted(self.sorted_stars, min_stars, side="left"):]
+
+    def language_postings(self, language_filter: str):
+        """
+        Listes d'ids des langages qui contiennent `language_filter` (sous-chaîne,
+        insensible à la casse : "java" trouve aussi javascript).
+        """
+        lf = language_filter.lower().strip()
+        return [ids for language, ids in self.languages.items() if lf in language]
+
+    def candidates(self, min_stars=None, language_filter=None):
+        """Ids (triés) des profils qui passent les filtres, None sans filtre."""
+        use_stars = min_stars is not None and self.star_ids is not None
+        use_languages = bool(language_filter) and self.languages is not None
+
+        if use_stars and not use_languages:
+            return np.sort(self.min_stars_ids(min_stars))
+        if not use_stars:
+            return _union(self.language_postings(language_filter)) if use_languages else None
+
+        # Intersection : on part du plus petit des deux ensembles
+        star_ids = self.min_stars_ids(min_stars)
+        postings = self.language_postings(language_filter)
+        if len(star_ids) <= sum(len(ids) for ids in postings):
+            ids = np.sort(star_ids)
+            keep = np.zeros(len(ids), dtype=bool)
+            for language_ids in postings:
+                keep |= _contains(language_ids, ids)
+            return ids[keep]
+        ids = _union(postings)
+        return ids[self.stars[ids] >= min_stars]
+
+
+def open_filter_index(index_path: str, table, mmap: bool = True) -> FilterIndex:
+    """
+    Index des filtres de l'index `index_path` (table Arrow déjà ouverte) :
+    lu en memmap s'il est à jour, sinon reconstruit en mémoire.
+    """
+    path = filters_path(index_path)
+    meta_path = os.path.join(path, "meta.json")
+    if mmap and os.path.exists(meta_path):
+        index = FilterIndex.load(path)
+        fresh = not os.path.exists(index_path) or os.path.getmtime(meta_path) >= os.path.getmtime(index_path)
+        if index.n == table.num_rows and fresh:
+            return index
+    if mmap:
+        print(f"[AVERTISSEMENT] {path} absent ou périmé, index des filtres reconstruit en mémoire")
+    columns = [c for c in ("total_stars", "languages_list") if c in table.column_names]
+    return FilterIndex(table.select(columns).to_pandas())
@@ -0,0 +1,211 @@
+"""
+github_async.py
+Récupération concurrente des repos GitHub (asyncio + aiohttp).
+
+Toutes les requêtes partagent une seule session HTTP (pool de connexions
+limité à `concurrency`). Le rythme est piloté par les headers
+X-RateLimit-Remaining / X-RateLimit-Reset renvoyés par GitHub, et les
+réponses 403/429 de rate limit sont réessayées au lieu d'abandonner l'user.
+
+Pour tester contre un serveur local, il suffit de passer `base_url`
+(ou de définir la variable d'environnement GITHUB_API_URL).
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+from src.scraping_github import (
+    GITHUB_API_URL,
+    GITHUB_TOKEN,
+    MAX_BACKOFF,
+    REPOS_PARAMS,
+    backoff_delay,
+    build_headers,
+    parse_repos,
+)
+
+
+class RateLimiter:
+    """
+    Rythme les requêtes à partir des headers de rate limit de GitHub.
+
+    Tant que le budget restant est au-dessus de `reserve`, les requêtes
+    partent librement. En dessous, tout le monde attend le reset annoncé
+    par X-RateLimit-Reset.
+    """
+
+    def __init__(self, reserve: int = 5):
+        self.reserve = reserve
+        self.remaining = None
+        self.reset_at = None
+        self._lock = asyncio.Lock()
+
+    def update(self, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        try:
+            if remaining is not None:
+                self.remaining = int(remaining)
+            if reset is not None:
+                self.reset_at = float(reset)
+        except ValueError:
+            pass
+
+    async def acquire(self):
+        async with self._lock:
+            now = time.time()
+            if (
+                self.remaining is not None
+                and self.reset_at is not None
+                and self.remaining <= self.reserve
+                and self.reset_at > now
+            ):
+                delay = self.reset_at - now + 1
+                print(f"[INFO] Budget API presque épuisé, pause de {delay:.0f}s jusqu'au reset")
+                # On garde le verrou : les autres requêtes attendent aussi
+                await asyncio.sleep(delay)
+                self.remaining = None
+                self.reset_at = None
+
+            # Les réponses arrivent en retard : on décompte localement
+            if self.remaining is not None:
+                self.remaining -= 1
+
+
+def _is_rate_limited(status: int, headers, body: str) -> bool:
+    if status == 429:
+        return True
+    if status != 403:
+        return False
+    return (
+        headers.get("X-RateLimit-Remaining") == "0"
+        or "Retry-After" in headers
+        or "rate limit" in body.lower()
+    )
+
+
+async def fetch_repos_for_user_async(session, login, limiter, base_url=None, max_retries=5, cache=None):
+    """
+    Version async de fetch_repos_for_user.
+    Réessaie (avec attente) sur rate limit, erreurs 5xx et erreurs réseau.
+    Avec un RepoCache, la requête est conditionnelle (304 = lignes du cache).
+    Comme la version synchrone, retourne None en cas d'échec définitif.
+    """
+    url = f"{base_url or GITHUB_API_URL}/users/{login}/repos"
+
+    entry = cache.get(login, REPOS_PARAMS) if cache is not None else None
+    headers = cache.conditional_headers(entry) if entry is not None else None
+
+    for attempt in range(max_retries + 1):
+        await limiter.acquire()
+        try:
+            async with session.get(url, params=REPOS_PARAMS, headers=headers) as r:
+                limiter.update(r.headers)
+
+                if r.status == 304 and entry is not None:
+                    return cache.reuse(entry)
+
+                if r.status == 200:
+                    try:
+                        repos = await r.json(content_type=None)
+                    except ValueError:
+                        print(f"[ERREUR] Réponse JSON invalide pour {login}.")
+                        return None
+                    repos_data = parse_repos(login, repos)
+                    if cache is not None:
+                        cache.put(login, REPOS_PARAMS, r.headers, repos_data)
+                    return repos_data
+
+                if r.status == 404:
+                    print(f"[INFO] Utilisateur {login} introuvable (404).")
+                    return []
+
+                body = await r.text()
+                if _is_rate_limited(r.status, r.headers, body) or r.status >= 500:
+                    delay = backoff_delay(r.headers, attempt)
+                    print(f"[ATTENTION] Code HTTP {r.status} pour {login}, nouvel essai dans {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+
+                print(f"[ERREUR] Code HTTP {r.status} pour {login}.")
+                return None
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            delay = min(MAX_BACKOFF, 2 ** attempt)
+            print(f"[ERREUR] Problème réseau pour l'utilisateur {login}: {e!r}, nouvel essai dans {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    print(f"[ERREUR] Abandon pour {login} après {max_retries + 1} essais.")
+    return None
+
+
+async def fetch_all_repos_async(
+    logins, concurrency=10, base_url=None, token=GITHUB_TOKEN, max_retries=5, cache=None, on_result=None
+):
+    """
+    Récupère les repos de tous les logins avec au plus `concurrency`
+    requêtes en vol. Retourne les lignes dans l'ordre des logins.
+
+    Si `on_result(login, repos)` est fourni, il est appelé dès qu'un user est
+    terminé (les users en échec sont sautés) et rien n'est gardé en mémoire.
+    """
+    logins = list(logins)
+    results = {}
+    queue = asyncio.Queue()
+    for login in logins:
+        queue.put_nowait(login)
+
+    limiter = RateLimiter()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=20)
+    total_users = len(logins)
+    done = 0
+
+    async with aiohttp.ClientSession(
+        headers=build_headers(token), connector=connector, timeout=timeout
+    ) as session:
+
+        async def worker():
+            nonlocal done
+            while True:
+                try:
+                    login = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                repos = await fetch_repos_for_user_async(
+                    session, login, limiter, base_url=base_url, max_retries=max_retries, cache=cache
+                )
+                done += 1
+                print(f"[{done}/{total_users}] Repos récupérés pour : {login}")
+                if repos is None:
+                    continue
+                if on_result is not None:
+                    on_result(login, repos)
+                else:
+                    results[login] = repos
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    all_repos = []
+    for login in logins:
+        all_repos.extend(results.get(login, []))
+    return all_repos
+
+
+def fetch_all_repos(
+    logins, concurrency=10, base_url=None, token=GITHUB_TOKEN, max_retries=5, cache=None, on_result=None
+):
+    """Point d'entrée synchrone (utilisé par scraping_github.main)."""
+    return asyncio.run(
+        fetch_all_repos_async(
+            logins,
+            concurrency=concurrency,
+            base_url=base_url,
+            token=token,
+            max_retries=max_retries,
+            cache=cache,
+            on_result=on_result,
+        )
+    )
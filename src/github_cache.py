@@ -0,0 +1,98 @@
+"""
+github_cache.py
+Cache disque des réponses GitHub pour les requêtes conditionnelles.
+
+Pour chaque (login, paramètres de requête) on garde l'ETag, le
+Last-Modified et les lignes de repos déjà parsées. Au run suivant on envoie
+If-None-Match / If-Modified-Since : si GitHub répond 304, on réutilise les
+lignes du cache (et une réponse 304 ne consomme pas de rate limit).
+"""
+
+import hashlib
+import json
+import os
+
+
+def get_base_dir():
+    return os.path.dirname(os.path.dirname(__file__))
+
+
+class RepoCache:
+    """
+    Un fichier JSON par clé dans `cache_dir` (data/cache/github par défaut).
+    Compte les hits (304 réutilisés) et les misses (réponses complètes).
+    """
+
+    def __init__(self, cache_dir: str | None = None):
+        if cache_dir is None:
+            cache_dir = os.path.join(get_base_dir(), "data", "cache", "github")
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, login, params):
+        key = json.dumps({"login": login, "params": params}, sort_keys=True)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, login, params):
+        """Retourne l'entrée en cache ou None."""
+        path = self._path(login, params)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Fichier corrompu (crash pendant l'écriture...) : on l'ignore
+            return None
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Headers If-None-Match / If-Modified-Since pour une entrée."""
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def reuse(self, entry):
+        """Réponse 304 : on renvoie les lignes en cache."""
+        self.hits += 1
+        return entry["rows"]
+
+    def put(self, login, params, headers, rows):
+        """Réponse 200 : on mémorise les validateurs et les lignes parsées."""
+        self.misses += 1
+
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            # Rien pour faire une requête conditionnelle plus tard
+            return
+
+        entry = {
+            "login": login,
+            "params": params,
+            "etag": etag,
+            "last_modified": last_modified,
+            "rows": rows,
+        }
+        path = self._path(login, params)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        print(
+            f"[INFO] Cache GitHub : {self.hits} hits (304), "
+            f"{self.misses} misses, taux de hit {rate:.1f}%"
+        )
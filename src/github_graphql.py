@@ -0,0 +1,243 @@
+"""
+github_graphql.py
+Récupération des repos de plusieurs users par requête GraphQL.
+
+Au lieu d'un appel REST /users/{login}/repos par login, on envoie une seule
+requête avec un alias par login :
+
+    query {
+      u0: repositoryOwner(login: "alice") { repositories(first: 5) { ... } }
+      u1: repositoryOwner(login: "bob")   { repositories(first: 5) { ... } }
+    }
+
+Les lignes produites ont exactement les mêmes colonnes que la version REST
+(owner_login, repo_name, description, language, stargazers_count, html_url).
+L'API GraphQL de GitHub exige un token.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import requests
+
+from src.scraping_github import (
+    GITHUB_API_URL,
+    GITHUB_TOKEN,
+    REPOS_PARAMS,
+    backoff_delay,
+    build_headers,
+)
+
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+
+# Limite de l'API GitHub pour `first:`
+MAX_PAGE_SIZE = 100
+
+REPOSITORY_FIELDS = """
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        description
+        primaryLanguage { name }
+        stargazerCount
+        url
+      }"""
+
+
+def build_query(batch):
+    """
+    batch : liste de (alias, login, first, after).
+    Les repos sont triés comme en REST (sort=updated, direction=desc).
+    """
+    parts = ["  rateLimit { cost remaining resetAt }"]
+    for alias, login, first, after in batch:
+        after_arg = f", after: {json.dumps(after)}" if after else ""
+        parts.append(
+            f"  {alias}: repositoryOwner(login: {json.dumps(login)}) {{\n"
+            f"    repositories(first: {first}{after_arg}, ownerAffiliations: OWNER, "
+            f"orderBy: {{field: UPDATED_AT, direction: DESC}}) {{{REPOSITORY_FIELDS}\n"
+            f"    }}\n"
+            f"  }}"
+        )
+    return "query {\n" + "\n".join(parts) + "\n}"
+
+
+def parse_graphql_repos(login, nodes):
+    """Même format de lignes que scraping_github.parse_repos."""
+    repos_data = []
+    for repo in nodes:
+        language = repo.get("primaryLanguage") or {}
+        repos_data.append({
+            "owner_login": login,
+            "repo_name": repo.get("name", ""),
+            "description": repo.get("description") or "",
+            "language": language.get("name") or "",
+            "stargazers_count": repo.get("stargazerCount", 0),
+            "html_url": repo.get("url", ""),
+        })
+    return repos_data
+
+
+def _wait_for_budget(rate_limit, next_cost):
+    """Attend le reset si le budget GraphQL restant ne couvre pas la requête suivante."""
+    if not rate_limit:
+        return
+    remaining = rate_limit.get("remaining")
+    reset_at = rate_limit.get("resetAt")
+    if remaining is None or reset_at is None or remaining >= next_cost:
+        return
+    reset_ts = datetime.fromisoformat(reset_at.replace("Z", "+00:00")).timestamp()
+    delay = reset_ts - time.time() + 1
+    if delay > 0:
+        print(f"[INFO] Budget GraphQL presque épuisé, pause de {delay:.0f}s jusqu'au reset")
+        time.sleep(delay)
+
+
+def _post_query(session, url, query, max_retries):
+    """
+    Envoie une requête GraphQL, avec réessais sur rate limit / 5xx / réseau.
+    Retourne le JSON de la réponse, ou None après max_retries échecs.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            r = session.post(url, json={"query": query}, timeout=60)
+        except requests.exceptions.RequestException as e:
+            print(f"[ERREUR] Problème réseau GraphQL : {e}")
+            time.sleep(backoff_delay({}, attempt))
+            continue
+
+        if r.status_code in (403, 429) or r.status_code >= 500:
+            delay = backoff_delay(r.headers, attempt)
+            print(f"[ATTENTION] Code HTTP {r.status_code} (GraphQL), nouvel essai dans {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        if r.status_code != 200:
+            print(f"[ERREUR] Code HTTP {r.status_code} (GraphQL) : {r.text[:200]}")
+            return None
+
+        try:
+            payload = r.json()
+        except ValueError:
+            print("[ERREUR] Réponse JSON invalide (GraphQL).")
+            return None
+
+        errors = payload.get("errors") or []
+        if any(e.get("type") == "RATE_LIMITED" for e in errors):
+            delay = backoff_delay(r.headers, attempt)
+            print(f"[ATTENTION] Rate limit GraphQL, nouvel essai dans {delay:.1f}s")
+            time.sleep(delay)
+            continue
+
+        return payload
+
+    print(f"[ERREUR] Abandon de la requête GraphQL après {max_retries + 1} essais.")
+    return None
+
+
+def _not_found_aliases(errors) -> set:
+    """Aliases dont le login n'existe pas : erreurs NOT_FOUND dont le path est l'alias."""
+    return {
+        e["path"][0]
+        for e in errors or []
+        if e.get("type") == "NOT_FOUND" and e.get("path")
+    }
+
+
+def fetch_repos_graphql(
+    logins,
+    batch_size=50,
+    repos_per_user=REPOS_PARAMS["per_page"],
+    page_size=None,
+    url=None,
+    token=GITHUB_TOKEN,
+    max_retries=5,
+    on_result=None,
+):
+    """
+    Récupère les `repos_per_user` repos les plus récents de chaque login,
+    `batch_size` logins par requête. Les users qui ont plus de repos que
+    `page_size` sont paginés (curseur `after`) dans les requêtes suivantes.
+
+    Comme fetch_all_repos : si `on_result(login, repos)` est fourni il est
+    appelé à chaque user terminé, sinon les lignes sont retournées dans
+    l'ordre des logins. Les users en échec sont sautés.
+    """
+    if not token:
+        raise ValueError("L'API GraphQL de GitHub nécessite un token (GITHUB_TOKEN).")
+
+    url = url or GITHUB_GRAPHQL_URL
+    page_size = min(MAX_PAGE_SIZE, page_size or repos_per_user)
+    logins = list(logins)
+    results = {}
+    done = 0
+
+    session = requests.Session()
+    session.headers.update(build_headers(token))
+
+    rate_limit = None
+    for start in range(0, len(logins), batch_size):
+        batch_logins = logins[start:start + batch_size]
+        state = {login: {"rows": [], "after": None} for login in batch_logins}
+        pending = list(batch_logins)
+        failed = False
+        failed_logins = set()
+
+        while pending:
+            _wait_for_budget(rate_limit, next_cost=1)
+
+            batch = []
+            for i, login in enumerate(pending):
+                remaining = repos_per_user - len(state[login]["rows"])
+                batch.append((f"u{i}", login, min(page_size, remaining), state[login]["after"]))
+
+            payload = _post_query(session, url, build_query(batch), max_retries)
+            if payload is None:
+                failed = True
+                break
+
+            # data null : erreur sur toute la requête, aucun login n'est introuvable
+            data = payload.get("data") or {}
+            rate_limit = data.get("rateLimit") or rate_limit
+            not_found = _not_found_aliases(payload.get("errors"))
+
+            next_pending = []
+            for alias, login, _, _ in batch:
+                owner = data.get(alias)
+                if owner is None:
+                    if alias in not_found:
+                        # Login inexistant (erreur NOT_FOUND) : comme un 404 en REST
+                        print(f"[INFO] Utilisateur {login} introuvable (GraphQL).")
+                    else:
+                        # Autre erreur (limite de ressources, timeout...) : réessayé au prochain run
+                        print(f"[ATTENTION] Repos de {login} non récupérés (erreur GraphQL), login sauté.")
+                        failed_logins.add(login)
+                    continue
+
+                repositories = owner["repositories"]
+                state[login]["rows"].extend(parse_graphql_repos(login, repositories["nodes"]))
+
+                page_info = repositories["pageInfo"]
+                if page_info["hasNextPage"] and len(state[login]["rows"]) < repos_per_user:
+                    state[login]["after"] = page_info["endCursor"]
+                    next_pending.append(login)
+
+            pending = next_pending
+
+        for login in batch_logins:
+            done += 1
+            if (failed and login in pending) or login in failed_logins:
+                continue
+            rows = state[login]["rows"]
+            if on_result is not None:
+                on_result(login, rows)
+            else:
+                results[login] = rows
+
+        print(f"[{done}/{len(logins)}] Repos récupérés (GraphQL, lot de {len(batch_logins)})")
+
+    all_repos = []
+    for login in logins:
+        all_repos.extend(results.get(login, []))
+    return all_repos
@@ -0,0 +1,156 @@
+"""
+index_registry.py
+Versions publiées de l'index de recherche, servies par l'API.
+
+    data/processed/index/
+        20261017-101500/          une version = copie figée des artefacts
+            manifest.json         écrit en dernier : version complète
+            profiles_embeddings.npy (+ .float16/.int8/.pca/.ivf)
+            profiles_index.parquet, profiles_index.arrow, profiles_index.filters/
+        CURRENT                   nom de la version servie (remplacé atomiquement)
+
+embedding.py construit les artefacts dans data/processed puis appelle
+publish_index : les fichiers sont copiés (jamais liés : le prochain
+encodage réécrit data/processed sur place) dans un nouveau dossier, le
+manifeste est écrit, puis CURRENT bascule par os.replace. Un lecteur voit
+donc soit l'ancienne version complète, soit la nouvelle.
+"""
+
+import json
+import os
+import shutil
+import time
+
+from src.config import DATA_PROCESSED_DIR
+
+INDEX_ROOT = os.path.join(DATA_PROCESSED_DIR, "index")
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+EMBEDDINGS_FILE = "profiles_embeddings.npy"
+INDEX_FILE = "profiles_index.parquet"
+
+# Versions gardées sur disque (la version servie n'est jamais supprimée)
+KEEP_VERSIONS = 3
+
+
+def _serving_files(source_dir: str):
+    """Artefacts servis par TalentSearcher présents dans `source_dir`."""
+    embeddings_root = os.path.splitext(EMBEDDINGS_FILE)[0]
+    index_root = os.path.splitext(INDEX_FILE)[0]
+    files = []
+    for name in sorted(os.listdir(source_dir)):
+        if ".tmp" in name or name.endswith(".progress.json"):
+            continue
+        if name.startswith(embeddings_root) and name.endswith((".npy", ".npz")):
+            files.append(name)
+        elif name in (INDEX_FILE, f"{index_root}.arrow", f"{index_root}.filters"):
+            files.append(name)
+    return files
+
+
+def version_dir(version: str, root: str = INDEX_ROOT) -> str:
+    return os.path.join(root, version)
+
+
+def read_manifest(version: str, root: str = INDEX_ROOT) -> dict:
+    with open(os.path.join(version_dir(version, root), MANIFEST_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def current_version(root: str = INDEX_ROOT):
+    """Version servie (contenu de CURRENT), None si rien n'est publié."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(root: str = INDEX_ROOT):
+    """Versions complètes (avec manifeste), de la plus ancienne à la plus récente."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        name for name in os.listdir(root)
+        if os.path.exists(os.path.join(root, name, MANIFEST_FILE))
+    )
+
+
+def set_current(version: str, root: str = INDEX_ROOT):
+    """Bascule atomique de la version servie."""
+    if not os.path.exists(os.path.join(version_dir(version, root), MANIFEST_FILE)):
+        raise ValueError(f"Version d'index inconnue ou incomplète : {version}")
+    tmp_path = os.path.join(root, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+
+def resolve_index_dir(version: str | None = None, root: str = INDEX_ROOT) -> str:
+    """
+    Dossier des artefacts à servir : `version`, sinon la version courante,
+    sinon (rien de publié) data/processed directement.
+    """
+    version = version or current_version(root)
+    if version is None:
+        return DATA_PROCESSED_DIR
+    path = version_dir(version, root)
+    if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        raise ValueError(f"Version d'index inconnue ou incomplète : {version}")
+    return path
+
+
+def publish_index(source_dir: str = DATA_PROCESSED_DIR, root: str = INDEX_ROOT, metadata: dict | None = None,
+                  keep: int = KEEP_VERSIONS) -> str:
+    """
+    Copie les artefacts de `source_dir` dans une nouvelle version, écrit
+    son manifeste puis la rend courante. Retourne le nom de la version.
+    """
+    files = _serving_files(source_dir)
+    if EMBEDDINGS_FILE not in files or INDEX_FILE not in files:
+        raise FileNotFoundError(f"{EMBEDDINGS_FILE} et {INDEX_FILE} sont requis dans {source_dir}")
+
+    version = time.strftime("%Y%m%d-%H%M%S")
+    suffix = 1
+    while os.path.exists(version_dir(version, root)):
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{suffix}"
+        suffix += 1
+
+    # Copie dans un dossier temporaire, renommé une fois complet
+    tmp_dir = version_dir(f".{version}.tmp", root)
+    os.makedirs(tmp_dir)
+    sizes = {}
+    for name in files:
+        source = os.path.join(source_dir, name)
+        if os.path.isdir(source):
+            shutil.copytree(source, os.path.join(tmp_dir, name))
+            sizes[name] = sum(
+                os.path.getsize(os.path.join(source, f)) for f in os.listdir(source)
+            )
+        else:
+            shutil.copy2(source, os.path.join(tmp_dir, name))
+            sizes[name] = os.path.getsize(source)
+
+    manifest = {
+        "version": version,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": sizes,
+        **(metadata or {}),
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_dir, version_dir(version, root))
+
+    set_current(version, root)
+    prune_versions(keep, root)
+    return version
+
+
+def prune_versions(keep: int = KEEP_VERSIONS, root: str = INDEX_ROOT):
+    """Supprime les versions les plus anciennes au-delà de `keep` (jamais la courante)."""
+    current = current_version(root)
+    versions = list_versions(root)
+    for version in versions[:max(0, len(versions) - keep)]:
+        if version != current:
+            shutil.rmtree(version_dir(version, root), ignore_errors=True)
@@ -1,39 +1,232 @@
 import os
+import sys
 import numpy as np
 import pandas as pd
 from sentence_transformers import SentenceTransformer
 
+# Ajouter le répertoire racine au path (pour les imports src.*)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.ann_index import DEFAULT_NPROBE, IVFIndex
+from src.embedding_writer import is_partial
+from src.filter_index import open_filter_index
+from src.index_registry import EMBEDDINGS_FILE, INDEX_FILE, resolve_index_dir
+from src.profile_store import index_arrow_path, open_index
+from src.projection import load_projection, projected_scores
+from src.quantization import STORAGE_DTYPES, approx_scores, load_compact, rescore, top_indices
+from src.query_cache import QueryEmbeddingCache
+
+
+# Au-delà de cette fraction de profils retenus par les filtres, on score toute
+# la matrice (produit contigu) plutôt que de copier les lignes retenues
+SUBSET_SCORING_RATIO = 0.25
+# Lignes retenues copiées puis scorées à la fois (mémoire temporaire bornée)
+GATHER_ROWS = 8192
+# Requêtes scorées ensemble par search_many (matrice de scores SEARCH_BATCH x N)
+SEARCH_BATCH = 32
+
 
 def get_base_dir():
     return os.path.dirname(os.path.dirname(__file__))
 
 
+def subset_scores(score_rows, rows, n):
+    """
+    Scores des lignes `rows` (ids triés, toutes si None) d'une matrice de n
+    lignes. score_rows(lignes) score une tranche ou un tableau d'indices.
+    """
+    if rows is None or len(rows) > SUBSET_SCORING_RATIO * n:
+        scores = score_rows(slice(None))
+        return scores if rows is None else scores[rows]
+    scores = np.empty(len(rows), dtype=np.float32)
+    for start in range(0, len(rows), GATHER_ROWS):
+        block = rows[start:start + GATHER_ROWS]
+        scores[start:start + len(block)] = score_rows(block)
+    return scores
+
+
+def select_top_k(scores, k, positions=None):
+    """
+    (positions, scores) des k meilleurs scores, par score décroissant :
+    sélection partielle (argpartition, O(N)) puis tri des seuls k gagnants.
+    `positions` : lignes correspondant à `scores` quand seul un sous-ensemble
+    a été scoré (sinon scores[i] est la ligne i).
+    """
+    top = top_indices(scores, k)
+    top = top[np.argsort(-scores[top], kind="stable")]
+    if positions is not None:
+        return positions[top], scores[top]
+    return top, scores[top]
+
+
 class TalentSearcher:
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
-        base_dir = get_base_dir()
-        processed_dir = os.path.join(base_dir, "data", "processed")
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        storage: str = os.getenv("EMBEDDINGS_STORAGE", "float32"),
+        rescore_factor: int = 4,
+        projection: bool = os.getenv("EMBEDDINGS_PROJECTION", "0") == "1",
+        index: str = os.getenv("EMBEDDINGS_INDEX", "exact"),
+        nprobe: int = int(os.getenv("ANN_NPROBE", DEFAULT_NPROBE)),
+        query_cache: QueryEmbeddingCache | None = None,
+        mmap: bool = os.getenv("EMBEDDINGS_MMAP", "1") == "1",
+        index_dir: str | None = None,
+        model: SentenceTransformer | None = None,
+    ):
+        """
+        storage        : matrice parcourue à chaque requête : float32 (exact),
+                         float16 ou int8 (cf. src/quantization.py). En
+                         compact, les top_k x rescore_factor meilleurs
+                         candidats sont re-scorés en float32 (lu en memmap).
+        projection     : premier tri dans l'espace PCA ajusté par
+                         embedding.py --pca-dim (cf. src/projection.py),
+                         même re-scoring. Prioritaire sur storage.
+        index          : "exact" (parcours de toute la matrice) ou "ivf"
+                         (index construit par embedding.py --ann, cf.
+                         src/ann_index.py). Prioritaire sur les deux précédents.
+        nprobe         : listes IVF parcourues par requête (rappel / vitesse).
+        query_cache    : cache LRU des embeddings de requêtes (cf.
+                         src/query_cache.py), partageable avec l'API.
+        mmap           : matrices (.npy), index Arrow et index des filtres
+                         ouverts en memmap : démarrage en temps constant,
+                         pages partagées par tous les workers de l'API via
+                         le cache disque. False = tout charger en RAM.
+        index_dir      : dossier des artefacts (défaut : version courante de
+                         data/processed/index/, sinon data/processed, cf.
+                         src/index_registry.py).
+        model          : SentenceTransformer déjà chargé (rechargement de
+                         l'index sans recharger le modèle).
+        """
+        if storage not in STORAGE_DTYPES:
+            raise ValueError(f"storage doit être l'un de {STORAGE_DTYPES}, reçu : {storage}")
+        if index not in ("exact", "ivf"):
+            raise ValueError(f"index doit être 'exact' ou 'ivf', reçu : {index}")
+        self.storage = storage
+        self.rescore_factor = rescore_factor
+        self.projection = projection
+        self.nprobe = nprobe
+        # Premier tri approché => re-scoring exact de la shortlist
+        self.approximate = index == "exact" and (projection or storage != "float32")
 
-        self.embeddings_path = os.path.join(processed_dir, "profiles_embeddings.npy")
-        self.index_path = os.path.join(processed_dir, "profiles_index.csv")
+        self.index_dir = index_dir or resolve_index_dir()
+        self.embeddings_path = os.path.join(self.index_dir, EMBEDDINGS_FILE)
+        self.index_path = os.path.join(self.index_dir, INDEX_FILE)
 
         # Chargement des embeddings et de l'index
-        print(f"[INFO] Chargement des embeddings depuis : {self.embeddings_path}")
-        self.embeddings = np.load(self.embeddings_path)
+        if is_partial(self.embeddings_path):
+            raise ValueError(
+                f"{self.embeddings_path} est incomplet (encodage interrompu), "
+                "relancer src/embedding.py pour le terminer"
+            )
+        print(f"[INFO] Chargement des embeddings depuis : {self.embeddings_path} ({storage})")
+        mmap_mode = "r" if mmap else None
+        self.compact, self.scales = None, None
+        self.components, self.projected = None, None
+        self.ivf = None
+        if index == "ivf":
+            # float32 sur disque pour la recherche exacte de secours
+            self.embeddings = np.load(self.embeddings_path, mmap_mode="r")
+            self.ivf = IVFIndex(self.embeddings_path, mmap_mode)
+            print(f"[INFO] Index IVF : {self.ivf.nlist} listes, nprobe = {nprobe}")
+        elif not self.approximate:
+            self.embeddings = np.load(self.embeddings_path, mmap_mode=mmap_mode)
+            self.compact = self.embeddings
+        else:
+            # float32 sur disque pour le re-scoring, matrice du premier tri en RAM / memmap
+            self.embeddings = np.load(self.embeddings_path, mmap_mode="r")
+            if projection:
+                self.components, self.projected = load_projection(self.embeddings_path, mmap_mode)
+                print(f"[INFO] Premier tri dans l'espace PCA ({self.projected.shape[1]} dimensions)")
+            else:
+                self.compact, self.scales = load_compact(self.embeddings_path, storage, mmap_mode)
 
-        print(f"[INFO] Chargement de l'index depuis : {self.index_path}")
-        self.index_df = pd.read_csv(self.index_path)
+        print(f"[INFO] Chargement de l'index depuis : {index_arrow_path(self.index_path) if mmap else self.index_path}")
+        self.index_table = open_index(self.index_path, mmap=mmap)
+        self.n_profiles = self.index_table.num_rows
+        self._index_df = None
 
-        if len(self.embeddings) != len(self.index_df):
+        if len(self.embeddings) != self.n_profiles:
             raise ValueError(
                 f"Nombre d'embeddings ({len(self.embeddings)}) "
-                f"différent du nombre de lignes de l'index ({len(self.index_df)})"
+                f"différent du nombre de lignes de l'index ({self.n_profiles})"
             )
 
-        print(f"[INFO] Nombre de profils chargés : {len(self.index_df)}")
+        print(f"[INFO] Nombre de profils chargés : {self.n_profiles}")
+
+        # Index des filtres (langages, stars), écrit par embedding.py
+        self.filters = open_filter_index(self.index_path, self.index_table, mmap=mmap)
 
         # Chargement du modèle NLP
-        print(f"[INFO] Chargement du modèle : {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model_name = model_name
+        if model is None:
+            print(f"[INFO] Chargement du modèle : {model_name}")
+            model = SentenceTransformer(model_name)
+        self.model = model
+        self.query_cache = query_cache if query_cache is not None else QueryEmbeddingCache()
+
+    def _scores(self, query_emb, rows=None, exact=False):
+        """
+        Scores des lignes `rows` (toutes si None) : exacts (float32) ou du
+        premier tri approché (matrice compacte ou projetée).
+        """
+        if exact or not self.approximate:
+            def score_rows(r):
+                return np.asarray(self.embeddings[r] @ query_emb)
+        elif self.projected is not None:
+            def score_rows(r):
+                return projected_scores(self.components, self.projected[r], query_emb)
+        else:
+            def score_rows(r):
+                return approx_scores(self.compact[r], query_emb, self.scales)
+        return subset_scores(score_rows, rows, self.n_profiles)
+
+    def _scores_many(self, query_embs, exact=False):
+        """Scores (m, N) de m requêtes sur toute la matrice, en un produit matrice-matrice."""
+        if exact or not self.approximate:
+            return np.asarray(query_embs @ self.embeddings.T)
+        if self.projected is not None:
+            return projected_scores(self.components, self.projected, query_embs)
+        return approx_scores(self.compact, query_embs, self.scales)
+
+    @property
+    def index_df(self) -> pd.DataFrame:
+        """Index complet en DataFrame (converti à la première demande : coûteux)."""
+        if self._index_df is None:
+            self._index_df = self.index_table.to_pandas()
+        return self._index_df
+
+    def _rows(self, positions, scores):
+        """Lignes de l'index des seuls profils retenus, avec leur similarité."""
+        rows = self.index_table.take(np.asarray(positions, dtype=np.int64)).to_pandas()
+        return rows.assign(similarity=scores)
+
+    def _search_ivf(self, query_emb, top_k, candidates):
+        """Recherche dans les nprobe listes IVF les plus proches, None si recherche exacte nécessaire."""
+        # Filtre plus sélectif que les listes parcourues : recherche exacte directe
+        probed = self.n_profiles * self.nprobe / self.ivf.nlist
+        if candidates is not None and len(candidates) <= probed:
+            return None
+        ids, scores = self.ivf.search(query_emb, self.nprobe)
+        if candidates is not None:
+            keep = np.isin(ids, candidates, assume_unique=True)
+            ids, scores = ids[keep], scores[keep]
+        # Trop peu de profils retenus dans les listes parcourues : recherche exacte
+        if len(ids) < top_k:
+            return None
+        top, top_scores = select_top_k(scores, top_k)
+        return self._rows(ids[top], top_scores)
+
+    def _top_k(self, query_emb, similarities, top_k, candidates, exact):
+        """top_k à partir des scores des candidats (re-scoring si premier tri approché)."""
+        # Premier tri approché : re-scoring exact d'une shortlist
+        if self.approximate and not exact:
+            shortlist, _ = select_top_k(similarities, top_k * self.rescore_factor, candidates)
+            top, top_scores = select_top_k(rescore(self.embeddings, shortlist, query_emb), top_k)
+            return self._rows(shortlist[top], top_scores)
+
+        # top_k par sélection partielle, puis métadonnées des seuls gagnants
+        top, top_scores = select_top_k(similarities, top_k, candidates)
+        return self._rows(top, top_scores)
 
     def search(
         self,
@@ -41,42 +234,83 @@ class TalentSearcher:
         top_k: int = 5,
         min_stars: int | None = None,
         language_filter: str | None = None,
+        exact: bool = False,
     ):
         """
         Retourne les top_k profils les plus pertinents pour une description de poste,
         avec filtres optionnels sur les stars et le langage.
+        exact=True force le parcours float32 de toute la matrice (sans index
+        ni premier tri approché).
+        """
+        query = {
+            "job_description": job_description,
+            "top_k": top_k,
+            "min_stars": min_stars,
+            "language_filter": language_filter,
+        }
+        return self.search_many([query], exact=exact)[0]
+
+    def search_many(self, queries: list[dict], exact: bool = False):
         """
-        if not job_description or not job_description.strip():
-            raise ValueError("La description de poste est vide.")
+        Recherche groupée : une liste de requêtes (dicts avec les arguments de
+        search : job_description, top_k, min_stars, language_filter), un
+        DataFrame de résultats par requête, dans le même ordre.
 
-        # Encodage de la description du poste
-        query_emb = self.model.encode(
-            [job_description],
-            convert_to_numpy=True,
+        Les descriptions absentes du cache de requêtes sont encodées en un
+        seul lot, et les requêtes qui parcourent toute la matrice sont scorées
+        ensemble par un produit matrice-matrice (SEARCH_BATCH requêtes à la fois).
+        """
+        texts = [query.get("job_description") for query in queries]
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                where = f" (requête {i})" if len(texts) > 1 else ""
+                raise ValueError(f"La description de poste est vide{where}.")
+        if not texts:
+            return []
+
+        # Encodage des descriptions de poste en un seul lot (hors cache)
+        query_embs = self.query_cache.encode(
+            self.model,
+            self.model_name,
+            texts,
             normalize_embeddings=True,
-        )[0]  # vecteur 1D
+        )  # (m, d)
 
-        # Similarité cosinus = produit scalaire (embeddings normalisés)
-        similarities = np.dot(self.embeddings, query_emb)  # (N,)
+        # IVF sauf exact=True ; sinon (ou en secours) scores exacts en float32
+        use_ivf = self.ivf is not None and not exact
+        exact = exact or self.ivf is not None
 
-        # On met tout dans un DataFrame pour filtrer facilement
-        df = self.index_df.copy()
-        df["similarity"] = similarities
+        results = [None] * len(queries)
+        full_scan = []  # (i, top_k, candidates) des requêtes qui scorent toute la matrice
+        for i, (query, query_emb) in enumerate(zip(queries, query_embs)):
+            top_k = query.get("top_k", 5)
+            # Profils retenus par les filtres (ids triés, None sans filtre) :
+            # seuls ceux-là sont scorés
+            candidates = self.filters.candidates(query.get("min_stars"), query.get("language_filter"))
 
-        # Filtre sur les stars
-        if min_stars is not None and "total_stars" in df.columns:
-            df = df[df["total_stars"] >= min_stars]
+            # Index IVF : seuls les profils des nprobe listes les plus proches
+            if use_ivf:
+                results[i] = self._search_ivf(query_emb, top_k, candidates)
+                if results[i] is not None:
+                    continue
 
-        # Filtre sur le langage
-        if language_filter and "languages_list" in df.columns:
-            lf = language_filter.lower()
-            df = df[df["languages_list"].fillna("").str.lower().str.contains(lf)]
+            if candidates is None or len(candidates) > SUBSET_SCORING_RATIO * self.n_profiles:
+                full_scan.append((i, top_k, candidates))
+            else:
+                # Filtre sélectif : seules les lignes retenues sont scorées
+                similarities = self._scores(query_emb, candidates, exact)
+                results[i] = self._top_k(query_emb, similarities, top_k, candidates, exact)
 
-        # Tri par similarité + top_k
-        df = df.sort_values("similarity", ascending=False)
-        df = df.head(min(top_k, len(df)))
+        # Similarité cosinus = produit scalaire (embeddings normalisés)
+        # (approchée si la matrice est compacte ou projetée)
+        for start in range(0, len(full_scan), SEARCH_BATCH):
+            batch = full_scan[start:start + SEARCH_BATCH]
+            scores = self._scores_many(query_embs[[i for i, _, _ in batch]], exact)  # (m, N)
+            for row, (i, top_k, candidates) in enumerate(batch):
+                similarities = scores[row] if candidates is None else scores[row][candidates]
+                results[i] = self._top_k(query_embs[i], similarities, top_k, candidates, exact)
 
-        return df.reset_index(drop=True)
+        return results
 
 
 def main():
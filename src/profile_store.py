@@ -0,0 +1,205 @@
+"""
+profile_store.py
+Stockage des profils en Parquet typé et compressé.
+
+Remplace les allers-retours CSV entre build_profiles, embedding, matching,
+l'API et l'évaluation :
+- profiles_processed.parquet : profils enrichis (config.PROCESSED_DATA_PATH)
+- profiles_index.parquet     : index minimal aligné sur les embeddings
+- profiles_index.arrow       : même index en Arrow IPC non compressé, ouvert
+                               en memmap par TalentSearcher (pages partagées
+                               entre les workers de l'API)
+- agent_scores.parquet       : scores de l'agent IA écrits par l'API
+- profiles_fingerprints.parquet : empreintes pour la reconstruction incrémentale
+
+Chaque lecteur ne charge que les colonnes dont il a besoin. Si le fichier
+Parquet n'existe pas encore, on retombe sur l'ancien CSV.
+"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import DATA_PROCESSED_DIR, PROCESSED_DATA_PATH
+
+PROFILES_STORE_PATH = PROCESSED_DATA_PATH
+PROFILES_CSV_PATH = os.path.join(DATA_PROCESSED_DIR, "profiles_enriched.csv")
+
+INDEX_STORE_PATH = os.path.join(DATA_PROCESSED_DIR, "profiles_index.parquet")
+INDEX_CSV_PATH = os.path.join(DATA_PROCESSED_DIR, "profiles_index.csv")
+
+AGENT_SCORES_PATH = os.path.join(DATA_PROCESSED_DIR, "agent_scores.parquet")
+
+# Empreintes par login des entrées de profile_text (cf. src/profiles_incremental.py)
+FINGERPRINTS_PATH = os.path.join(DATA_PROCESSED_DIR, "profiles_fingerprints.parquet")
+
+# Colonnes conservées dans l'index de recherche
+INDEX_COLS = ["login", "name", "company", "location", "total_stars", "nb_repos_fetched", "languages_list"]
+
+# Schéma des colonnes connues ; les autres colonnes gardent le type inféré
+PROFILE_SCHEMA = {
+    "login": pa.string(),
+    "name": pa.string(),
+    "company": pa.string(),
+    "location": pa.string(),
+    "bio": pa.string(),
+    "followers": pa.int64(),
+    "public_repos": pa.int64(),
+    "public_gists": pa.int64(),
+    "repos_descriptions": pa.string(),
+    "languages_list": pa.string(),
+    "total_stars": pa.int64(),
+    "nb_repos_fetched": pa.int64(),
+    "profile_text": pa.string(),
+    "agent_score": pa.float64(),
+}
+
+COMPRESSION = "zstd"
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """DataFrame -> table Arrow avec les types de PROFILE_SCHEMA."""
+    df = df.copy()
+    for col, dtype in PROFILE_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if pa.types.is_string(dtype):
+            df[col] = df[col].fillna("").astype(str)
+        elif pa.types.is_integer(dtype):
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = [
+        pa.field(f.name, PROFILE_SCHEMA.get(f.name, f.type)) for f in table.schema
+    ]
+    return table.cast(pa.schema(fields))
+
+
+def write_table(df: pd.DataFrame, path: str):
+    """Écriture atomique (fichier temporaire puis rename)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(to_arrow(df), tmp_path, compression=COMPRESSION)
+    os.replace(tmp_path, path)
+
+
+def read_table(path: str, csv_path: str | None = None, columns=None) -> pd.DataFrame:
+    """
+    Lit uniquement `columns` (toutes si None). Les colonnes demandées mais
+    absentes du fichier sont ignorées. Fallback CSV si le Parquet manque.
+    """
+    if os.path.exists(path):
+        if columns is not None:
+            available = pq.read_schema(path).names
+            columns = [c for c in columns if c in available]
+        return pq.read_table(path, columns=columns).to_pandas()
+
+    if csv_path is not None and os.path.exists(csv_path):
+        print(f"[AVERTISSEMENT] {path} introuvable, lecture de l'ancien CSV {csv_path}")
+        usecols = None if columns is None else (lambda c: c in columns)
+        return pd.read_csv(csv_path, usecols=usecols)
+
+    raise FileNotFoundError(f"Fichier introuvable : {path}")
+
+
+class ProfileStoreWriter:
+    """Écriture du store par lots (mode streaming de build_profiles)."""
+
+    def __init__(self, path: str = PROFILES_STORE_PATH):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.writer = None
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        table = to_arrow(df)
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self.writer = pq.ParquetWriter(self.tmp_path, table.schema, compression=COMPRESSION)
+        self.writer.write_table(table.cast(self.writer.schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+
+
+def write_profiles(df: pd.DataFrame, path: str = PROFILES_STORE_PATH):
+    write_table(df, path)
+
+
+def read_profiles(columns=None, path: str = PROFILES_STORE_PATH) -> pd.DataFrame:
+    return read_table(path, PROFILES_CSV_PATH, columns)
+
+
+def export_csv(path: str = PROFILES_STORE_PATH, csv_path: str = PROFILES_CSV_PATH, batch_size: int = 100_000):
+    """Export CSV du store (par lots, pour les outils qui attendent encore un CSV)."""
+    tmp_path = f"{csv_path}.tmp"
+    header = True
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            batch.to_pandas().to_csv(out, index=False, header=header)
+            header = False
+    os.replace(tmp_path, csv_path)
+
+
+def index_arrow_path(path: str = INDEX_STORE_PATH) -> str:
+    root, _ = os.path.splitext(path)
+    return f"{root}.arrow"
+
+
+def write_index(df: pd.DataFrame, path: str = INDEX_STORE_PATH):
+    """Index en Parquet + copie Arrow IPC (non compressée, lisible en memmap)."""
+    df = df[[c for c in INDEX_COLS if c in df.columns]]
+    write_table(df, path)
+
+    arrow_path = index_arrow_path(path)
+    tmp_path = f"{arrow_path}.tmp"
+    table = to_arrow(df)
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, arrow_path)
+
+
+def read_index(columns=None, path: str = INDEX_STORE_PATH) -> pd.DataFrame:
+    return read_table(path, INDEX_CSV_PATH, columns)
+
+
+def open_index(path: str = INDEX_STORE_PATH, mmap: bool = True) -> pa.Table:
+    """
+    Index sous forme de table Arrow. mmap=True : Arrow IPC en memmap (aucune
+    copie, démarrage en temps constant) ; sinon, ou si le .arrow manque ou
+    est plus ancien que le Parquet, lecture complète en mémoire.
+    """
+    arrow_path = index_arrow_path(path)
+    if mmap and os.path.exists(arrow_path):
+        if not os.path.exists(path) or os.path.getmtime(arrow_path) >= os.path.getmtime(path):
+            return pa.ipc.open_file(pa.memory_map(arrow_path, "r")).read_all()
+    if mmap:
+        print(f"[AVERTISSEMENT] {arrow_path} absent ou périmé, index chargé en mémoire")
+    return pa.Table.from_pandas(read_index(path=path), preserve_index=False)
+
+
+def read_agent_scores(path: str = AGENT_SCORES_PATH) -> pd.DataFrame:
+    """
+    Scores de l'agent (login, agent_score). Avant le store Parquet, l'API
+    les écrivait directement dans profiles_enriched.csv.
+    """
+    if os.path.exists(path):
+        return pq.read_table(path).to_pandas()
+    return read_profiles(columns=["login", "agent_score"])
+
+
+def update_agent_scores(scores: dict, path: str = AGENT_SCORES_PATH):
+    """Ajoute / remplace les scores {login: agent_score}."""
+    new_df = pd.DataFrame({"login": list(scores.keys()), "agent_score": list(scores.values())})
+    if os.path.exists(path):
+        old_df = pq.read_table(path).to_pandas()
+        new_df = pd.concat([old_df[~old_df["login"].isin(new_df["login"])], new_df], ignore_index=True)
+    write_table(new_df, path)
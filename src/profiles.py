@@ -0,0 +1,177 @@
+"""
+profiles.py
+Construction vectorisée des profils (users + repos agrégés + profile_text).
+
+Utilisé par src/build_profiles.py et par l'étape preprocess_data du
+pipeline ZenML. Pas de groupby().apply(lambda ...) ni de apply(axis=1) :
+uniquement des agrégations groupby et des opérations colonne par colonne.
+"""
+
+import numpy as np
+import pandas as pd
+
+USERS_COLS = [
+    "login",
+    "name",
+    "company",
+    "location",
+    "bio",
+    "followers",
+    "public_repos",
+    "public_gists",
+]
+
+# Compteurs côté users : toujours des entiers (0 si absent)
+USERS_COUNT_COLS = ["followers", "public_repos", "public_gists"]
+
+# Colonne technique : position de l'user dans github_users.csv.
+# Conservée par clean_users si présente (cf. src/profiles_streaming.py).
+ORDER_COL = "_order"
+
+
+def _group_join(keys: pd.Series, values: pd.Series, sep: str) -> pd.Series:
+    """
+    sep.join(values) par clé, dans l'ordre des lignes.
+    On préfixe chaque valeur (sauf la première du groupe) par le séparateur
+    puis on fait un groupby().sum(), qui concatène en Cython.
+    """
+    position = values.groupby(keys, sort=False).cumcount()
+    prefixed = values.where(position == 0, sep + values)
+    return prefixed.groupby(keys).sum()
+
+
+def clean_users(users_df: pd.DataFrame) -> pd.DataFrame:
+    """On ne garde que les colonnes utiles côté users."""
+    users_df = users_df[[c for c in USERS_COLS + [ORDER_COL] if c in users_df.columns]].copy()
+    for col in USERS_COUNT_COLS:
+        if col in users_df.columns:
+            users_df[col] = pd.to_numeric(users_df[col], errors="coerce").fillna(0).astype(int)
+    return users_df.fillna("")
+
+
+def aggregate_repos(repos_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrège les repos par owner_login :
+    repos_descriptions, languages_list, total_stars, nb_repos_fetched.
+    """
+    description = repos_df["description"].fillna("").astype(str)
+    language = repos_df["language"].fillna("").astype(str)
+    stars = pd.to_numeric(repos_df.get("stargazers_count", 0), errors="coerce")
+    stars = pd.Series(stars, index=repos_df.index).fillna(0)
+
+    repos = pd.DataFrame({
+        "login": repos_df["owner_login"],
+        "description": description,
+        "language": language,
+        "stargazers_count": stars,
+        "repo_name": repos_df["repo_name"],
+    })
+
+    # Total de stars et nb de repos (tous les owners, même sans description)
+    grouped = repos.groupby("login")
+    counts = grouped.agg(
+        total_stars=("stargazers_count", "sum"),
+        nb_repos_fetched=("repo_name", "count"),
+    )
+    logins = counts.index
+
+    # Texte concaténé des descriptions non vides (ordre d'origine conservé)
+    with_desc = repos[description.str.strip() != ""]
+    agg_desc = _group_join(with_desc["login"], with_desc["description"], " . ")
+
+    # Liste unique et triée des langages non vides
+    langs = repos.loc[language.str.strip() != "", ["login", "language"]]
+    langs = langs.drop_duplicates().sort_values("language", kind="stable")
+    agg_lang = _group_join(langs["login"], langs["language"], ", ")
+
+    return pd.DataFrame({
+        "login": logins,
+        "repos_descriptions": agg_desc.reindex(logins).fillna("").values,
+        "languages_list": agg_lang.reindex(logins).fillna("").values,
+        "total_stars": counts["total_stars"].astype(int).values,
+        "nb_repos_fetched": counts["nb_repos_fetched"].astype(int).values,
+    })
+
+
+def _as_text(df: pd.DataFrame, col: str) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].fillna("").astype(str)
+
+
+def build_profile_text(df: pd.DataFrame, repos_label: str = "Number of repositories fetched") -> pd.Series:
+    """
+    Texte profil pour le NLP, construit colonne par colonne :
+    nom . bio . Company . Location . Languages . nb repos . stars . Projects
+    """
+    empty = pd.Series("", index=df.index, dtype=object)
+
+    name = _as_text(df, "name")
+    bio = _as_text(df, "bio")
+    company = _as_text(df, "company")
+    location = _as_text(df, "location")
+    languages = _as_text(df, "languages_list")
+    descriptions = _as_text(df, "repos_descriptions")
+
+    nb_repos = pd.to_numeric(df.get("nb_repos_fetched", empty), errors="coerce").fillna(0)
+    stars = pd.to_numeric(df.get("total_stars", empty), errors="coerce").fillna(0)
+
+    parts = [
+        name,
+        bio,
+        ("Company: " + company).where(company != "", ""),
+        ("Location: " + location).where(location != "", ""),
+        ("Languages: " + languages).where(languages != "", ""),
+        (f"{repos_label}: " + _as_text(df, "nb_repos_fetched")).where(nb_repos > 0, ""),
+        ("Total stars: " + _as_text(df, "total_stars")).where(stars > 0, ""),
+        ("Projects: " + descriptions).where(descriptions != "", ""),
+    ]
+
+    # " . ".join des parties non vides (une partie faite d'espaces compte comme vide)
+    text = empty
+    for part in parts:
+        part = part.where(part.str.strip() != "", "")
+        sep = np.where((text != "") & (part != ""), " . ", "")
+        text = text + sep + part
+    return text
+
+
+def build_profiles_df(
+    users_df: pd.DataFrame,
+    repos_df: pd.DataFrame,
+    repos_label: str = "Number of repositories fetched",
+    verbose: bool = True,
+) -> pd.DataFrame:
+    """
+    Pipeline complet : nettoyage users, agrégation repos, fusion (inner),
+    profile_text, suppression des profils vides, tri par total_stars.
+
+    Le tri est stable : à stars égales, l'ordre de github_users.csv est
+    conservé (c'est ce qui permet au mode streaming de produire exactement
+    la même sortie).
+    """
+    if "login" not in users_df.columns:
+        raise ValueError("La colonne 'login' est absente de github_users.csv")
+    if "owner_login" not in repos_df.columns:
+        raise ValueError("La colonne 'owner_login' est absente de github_repos.csv")
+
+    users_df = clean_users(users_df)
+    repos_agg_df = aggregate_repos(repos_df)
+
+    # on garde seulement ceux pour lesquels on a des repos
+    merged_df = pd.merge(users_df, repos_agg_df, on="login", how="inner")
+
+    if verbose:
+        print(f"[INFO] Utilisateurs avec au moins un repo récupéré : {len(repos_agg_df)}")
+        print(f"[INFO] Taille finale après merge : {len(merged_df)}")
+
+    merged_df["profile_text"] = build_profile_text(merged_df, repos_label=repos_label)
+
+    # On enlève les lignes où le texte profil est vide
+    merged_df = merged_df[merged_df["profile_text"].str.strip() != ""].copy()
+
+    # On trie par total_stars pour avoir les plus 'forts' en premier
+    merged_df["total_stars"] = pd.to_numeric(merged_df["total_stars"], errors="coerce").fillna(0).astype(int)
+    merged_df = merged_df.sort_values("total_stars", ascending=False, kind="stable")
+
+    return merged_df
@@ -0,0 +1,149 @@
+"""
+profiles_incremental.py
+Reconstruction incrémentale des profils.
+
+On garde, pour chaque login, une empreinte (hash 64 bits) de tout ce qui
+alimente sa ligne du store :
+- les colonnes users (USERS_COLS),
+- ses repos, dans l'ordre du fichier (nom, description, langage, stars),
+- le libellé utilisé dans profile_text.
+
+Au run suivant, seuls les logins ajoutés, modifiés ou supprimés sont
+recalculés avec build_profiles_df ; les autres lignes sont reprises telles
+quelles du store existant. Le résultat est identique à une reconstruction
+complète (même tri : total_stars desc, puis ordre de github_users.csv).
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.profile_store import FINGERPRINTS_PATH, read_profiles, read_table, write_profiles, write_table
+from src.profiles import USERS_COLS, build_profiles_df
+
+# Colonnes repos qui influencent le profil
+REPOS_HASH_COLS = ["repo_name", "description", "language", "stargazers_count"]
+
+FINGERPRINT_COL = "fingerprint"
+
+
+def _row_hash(df: pd.DataFrame, cols) -> pd.Series:
+    """Hash uint64 par ligne (colonnes absentes = vides)."""
+    values = df.reindex(columns=cols).fillna("").astype(str)
+    return pd.util.hash_pandas_object(values, index=False, categorize=False)
+
+
+def compute_fingerprints(users_df: pd.DataFrame, repos_df: pd.DataFrame, repos_label: str) -> pd.Series:
+    """
+    Empreinte par login (index = login, dans l'ordre de users_df).
+
+    Les repos d'un login sont combinés avec leur position (l'ordre des
+    descriptions compte dans profile_text), puis sommés modulo 2**64.
+    """
+    repo_hash = _row_hash(repos_df, REPOS_HASH_COLS)
+    owners = repos_df["owner_login"]
+    position = owners.groupby(owners, sort=False).cumcount()
+    mixed = pd.util.hash_pandas_object(
+        pd.DataFrame({"h": repo_hash.values, "p": position.values}), index=False
+    )
+    repos_fp = mixed.groupby(owners.values).sum()
+
+    logins = users_df["login"]
+    label_hash = pd.util.hash_pandas_object(pd.Series([repos_label]), index=False).iloc[0]
+    combined = pd.DataFrame({
+        "u": _row_hash(users_df, USERS_COLS).values,
+        # fill_value garde le dtype uint64 (fillna passerait par float64 et tronquerait les hashes)
+        "r": repos_fp.reindex(logins.values, fill_value=0).astype(np.uint64).values,
+        "l": np.full(len(users_df), label_hash, dtype=np.uint64),
+    })
+    return pd.Series(
+        pd.util.hash_pandas_object(combined, index=False).values,
+        index=logins.values,
+    )
+
+
+def write_fingerprints(fingerprints: pd.Series, path: str = FINGERPRINTS_PATH):
+    write_table(pd.DataFrame({"login": fingerprints.index, FINGERPRINT_COL: fingerprints.values}), path)
+
+
+def read_fingerprints(path: str = FINGERPRINTS_PATH) -> pd.Series | None:
+    if not os.path.exists(path):
+        return None
+    df = read_table(path)
+    return pd.Series(df[FINGERPRINT_COL].values, index=df["login"].values)
+
+
+def build_profiles_incremental(
+    users_df: pd.DataFrame,
+    repos_df: pd.DataFrame,
+    output_path: str,
+    fingerprints_path: str = FINGERPRINTS_PATH,
+    repos_label: str = "Number of repositories fetched",
+):
+    """
+    Met à jour le store `output_path` à partir des données brutes.
+    Reconstruction complète si le store ou les empreintes manquent, ou si
+    github_users.csv contient des logins en double.
+    Retourne le nombre de profils écrits.
+    """
+    fingerprints = compute_fingerprints(users_df, repos_df, repos_label)
+    old_fingerprints = read_fingerprints(fingerprints_path)
+
+    full_reason = None
+    if old_fingerprints is None or not os.path.exists(output_path):
+        full_reason = "pas d'empreintes précédentes"
+    elif fingerprints.index.has_duplicates:
+        full_reason = "logins en double dans github_users.csv"
+
+    if full_reason is not None:
+        print(f"[INFO] Reconstruction complète ({full_reason})")
+        merged_df = build_profiles_df(users_df, repos_df, repos_label=repos_label)
+        write_profiles(merged_df, output_path)
+        if fingerprints.index.has_duplicates:
+            # Empreintes inutilisables : le prochain run sera aussi complet
+            if os.path.exists(fingerprints_path):
+                os.remove(fingerprints_path)
+        else:
+            write_fingerprints(fingerprints, fingerprints_path)
+        return len(merged_df)
+
+    # Logins ajoutés / modifiés / supprimés
+    previous = old_fingerprints.reindex(fingerprints.index)
+    changed = fingerprints.index[previous.isna().values | (previous.values != fingerprints.values)]
+    removed = old_fingerprints.index.difference(fingerprints.index)
+    nb_added = int(previous.isna().sum())
+
+    print(
+        f"[INFO] Incrémental : {nb_added} ajouté(s), {len(changed) - nb_added} modifié(s), "
+        f"{len(removed)} supprimé(s), {len(fingerprints) - len(changed)} inchangé(s)"
+    )
+    if len(changed) == 0 and len(removed) == 0:
+        write_fingerprints(fingerprints, fingerprints_path)
+        return len(read_profiles(columns=["login"], path=output_path))
+
+    delta_df = build_profiles_df(
+        users_df[users_df["login"].isin(changed)],
+        repos_df[repos_df["owner_login"].isin(changed)],
+        repos_label=repos_label,
+        verbose=False,
+    )
+
+    old_df = read_profiles(path=output_path)
+    if set(old_df.columns) != set(delta_df.columns):
+        print("[AVERTISSEMENT] Colonnes du store différentes, reconstruction complète")
+        merged_df = build_profiles_df(users_df, repos_df, repos_label=repos_label)
+    else:
+        kept_df = old_df[~old_df["login"].isin(changed.union(removed))]
+        merged_df = pd.concat([kept_df[delta_df.columns], delta_df], ignore_index=True)
+
+        # Même ordre que build_profiles_df : stars desc, puis ordre des users
+        order = pd.Series(np.arange(len(fingerprints)), index=fingerprints.index)
+        merged_df["_position"] = merged_df["login"].map(order).values
+        merged_df = merged_df.sort_values(
+            ["total_stars", "_position"], ascending=[False, True], kind="stable"
+        ).drop(columns=["_position"])
+
+    write_profiles(merged_df, output_path)
+    write_fingerprints(fingerprints, fingerprints_path)
+    return len(merged_df)
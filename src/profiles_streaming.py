@@ -0,0 +1,153 @@
+"""
+profiles_streaming.py
+Construction des profils hors mémoire, pour des dumps de repos plus gros
+que la RAM.
+
+1. github_users.csv et github_repos.csv sont lus par chunks et répartis
+   par hash du login dans N partitions sur disque. Toutes les lignes d'un
+   même login tombent dans la même partition, dans l'ordre du fichier.
+2. Chaque partition tient en mémoire : ses agrégats par login (descriptions,
+   langages, somme des stars, nb de repos) sont calculés avec
+   src/profiles.build_profiles_df, puis triés par total_stars.
+3. Les partitions triées sont fusionnées (k-way merge) et écrites par lots
+   dans le store Parquet. Le résultat est identique à celui du mode en
+   mémoire.
+
+N est choisi pour que la plus grosse étape tienne dans `max_memory_mb`.
+"""
+
+import heapq
+import math
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from src.profile_store import ProfileStoreWriter, write_profiles
+from src.profiles import ORDER_COL, build_profiles_df
+
+# Ratio approximatif entre la taille d'un CSV et celle du DataFrame pandas
+# (objets str Python, index, copies intermédiaires de l'agrégation)
+MEMORY_FACTOR = 6
+
+
+def choose_partitions(paths, max_memory_mb):
+    """Nombre de partitions pour que chacune tienne dans max_memory_mb."""
+    total_bytes = sum(os.path.getsize(p) for p in paths)
+    budget = max_memory_mb * 1024 * 1024
+    return max(1, math.ceil(total_bytes * MEMORY_FACTOR / budget))
+
+
+def _partition_csv(path, key_col, out_dir, prefix, n_partitions, chunksize, add_order=False):
+    """Répartit les lignes d'un CSV dans n_partitions fichiers selon hash(key_col)."""
+    written = set()
+    offset = 0
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+        if key_col not in chunk.columns:
+            raise ValueError(f"La colonne '{key_col}' est absente de {os.path.basename(path)}")
+
+        if add_order:
+            chunk[ORDER_COL] = range(offset, offset + len(chunk))
+            offset += len(chunk)
+
+        part = pd.util.hash_pandas_object(chunk[key_col], index=False).to_numpy() % n_partitions
+        for p in pd.unique(part):
+            out_path = os.path.join(out_dir, f"{prefix}-{p:05d}.csv")
+            chunk[part == p].to_csv(out_path, mode="a", index=False, header=p not in written)
+            written.add(p)
+
+
+def _read_partition(path, **kwargs):
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, dtype=str, **kwargs)
+
+
+def _iter_rows(path, chunksize):
+    """Lignes (texte brut) d'une partition triée, chunk par chunk."""
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def build_profiles_streaming(
+    users_path,
+    repos_path,
+    output_path,
+    chunksize=100_000,
+    max_memory_mb=1024,
+    repos_label="Number of repositories fetched",
+    tmp_dir=None,
+):
+    """
+    Mode streaming de build_profiles : même store Parquet que
+    write_profiles(build_profiles_df(...)), avec une mémoire bornée.
+    Retourne le nombre de profils écrits.
+    """
+    n_partitions = choose_partitions([users_path, repos_path], max_memory_mb)
+    print(f"[INFO] Mode streaming : {n_partitions} partition(s), chunks de {chunksize} lignes")
+
+    work_dir = tempfile.mkdtemp(prefix="profiles_", dir=tmp_dir)
+    try:
+        # 1) Répartition par hash du login
+        print(f"[INFO] Partitionnement utilisateurs : {users_path}")
+        _partition_csv(users_path, "login", work_dir, "users", n_partitions, chunksize, add_order=True)
+        print(f"[INFO] Partitionnement repos : {repos_path}")
+        _partition_csv(repos_path, "owner_login", work_dir, "repos", n_partitions, chunksize)
+
+        # 2) Agrégation partition par partition
+        sorted_parts = []
+        columns = None
+        for p in range(n_partitions):
+            users_df = _read_partition(os.path.join(work_dir, f"users-{p:05d}.csv"))
+            repos_df = _read_partition(os.path.join(work_dir, f"repos-{p:05d}.csv"))
+            if users_df is None or repos_df is None:
+                continue
+
+            users_df[ORDER_COL] = users_df[ORDER_COL].astype(int)
+            part_df = build_profiles_df(users_df, repos_df, repos_label=repos_label, verbose=False)
+            if part_df.empty:
+                continue
+
+            part_path = os.path.join(work_dir, f"profiles-{p:05d}.csv")
+            part_df.to_csv(part_path, index=False, encoding="utf-8")
+            sorted_parts.append(part_path)
+            columns = list(part_df.columns)
+            print(f"[INFO] Partition {p + 1}/{n_partitions} : {len(part_df)} profils")
+
+        if columns is None:
+            # Aucun profil : même en-tête que le mode en mémoire
+            empty_users = pd.read_csv(users_path, nrows=0)
+            empty_repos = pd.read_csv(repos_path, nrows=0)
+            write_profiles(
+                build_profiles_df(empty_users, empty_repos, repos_label=repos_label, verbose=False),
+                output_path,
+            )
+            return 0
+
+        # 3) Fusion des partitions triées (total_stars desc, puis ordre du CSV users)
+        stars_idx = columns.index("total_stars")
+        order_idx = columns.index(ORDER_COL)
+        merge_chunksize = max(1_000, chunksize // len(sorted_parts))
+
+        streams = [_iter_rows(path, merge_chunksize) for path in sorted_parts]
+        merged = heapq.merge(*streams, key=lambda row: (-int(row[stars_idx]), int(row[order_idx])))
+
+        writer = ProfileStoreWriter(output_path)
+        buffer = []
+        for row in merged:
+            buffer.append(row)
+            if len(buffer) >= chunksize:
+                _write_rows(writer, buffer, columns)
+                buffer = []
+        _write_rows(writer, buffer, columns)
+        writer.close()
+
+        return writer.rows
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _write_rows(writer, rows, columns):
+    if rows:
+        writer.write(pd.DataFrame(rows, columns=columns).drop(columns=[ORDER_COL]))
@@ -0,0 +1,100 @@
+"""
+projection.py
+Projection PCA des embeddings pour le premier tri de TalentSearcher.
+
+Les 384 dimensions de MiniLM sont plus que nécessaire pour présélectionner
+des candidats : on ajuste une PCA (moyenne + k composantes principales) sur
+profiles_embeddings.npy, on projette la matrice en k dimensions, et
+TalentSearcher cherche dans cet espace avant de re-scorer la shortlist avec
+les vecteurs complets.
+
+    x . q  =  (x - m) . q + m . q       (m . q identique pour tous les x)
+           ~= P(x - m) . Pq             (P : k x d, composantes principales)
+
+Artefacts écrits à côté des embeddings (et versionnés avec eux par DVC) :
+- profiles_embeddings.pca.npz : mean, components, explained_variance_ratio
+- profiles_embeddings.pca.npy : matrice projetée (N, k) en float32
+"""
+
+import os
+
+import numpy as np
+
+from src.quantization import BLOCK_ROWS
+
+
+def projection_path(embeddings_path: str) -> str:
+    root, _ = os.path.splitext(embeddings_path)
+    return f"{root}.pca.npz"
+
+
+def projected_path(embeddings_path: str) -> str:
+    root, ext = os.path.splitext(embeddings_path)
+    return f"{root}.pca{ext}"
+
+
+def fit_pca(embeddings: np.ndarray, dim: int):
+    """
+    PCA calculée bloc par bloc (moyenne puis covariance d x d), sans
+    charger toute la matrice. Retourne (mean, components (dim, d), ratios).
+    """
+    n, d = embeddings.shape
+    if not 0 < dim <= d:
+        raise ValueError(f"Dimension de projection invalide : {dim} (attendu entre 1 et {d})")
+
+    total = np.zeros(d, dtype=np.float64)
+    for start in range(0, n, BLOCK_ROWS):
+        total += np.asarray(embeddings[start:start + BLOCK_ROWS], dtype=np.float64).sum(axis=0)
+    mean = total / n
+
+    cov = np.zeros((d, d), dtype=np.float64)
+    for start in range(0, n, BLOCK_ROWS):
+        block = np.asarray(embeddings[start:start + BLOCK_ROWS], dtype=np.float64) - mean
+        cov += block.T @ block
+    cov /= max(n - 1, 1)
+
+    eigenvalues, eigenvectors = np.linalg.eigh(cov)
+    top = np.argsort(eigenvalues)[::-1][:dim]
+    ratios = eigenvalues[top] / max(eigenvalues.sum(), 1e-12)
+    return mean.astype(np.float32), eigenvectors[:, top].T.astype(np.float32), ratios.astype(np.float32)
+
+
+def write_projection(embeddings_path: str, dim: int):
+    """Ajuste la PCA et écrit les deux artefacts. Retourne la variance expliquée."""
+    embeddings = np.load(embeddings_path, mmap_mode="r")
+    mean, components, ratios = fit_pca(embeddings, dim)
+
+    out_path = projected_path(embeddings_path)
+    tmp_path = f"{out_path}.tmp.npy"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(embeddings), dim))
+    for start in range(0, len(embeddings), BLOCK_ROWS):
+        block = np.asarray(embeddings[start:start + BLOCK_ROWS], dtype=np.float32)
+        out[start:start + len(block)] = (block - mean) @ components.T
+    out.flush()
+    del out
+
+    np.savez(projection_path(embeddings_path), mean=mean, components=components, explained_variance_ratio=ratios)
+    os.replace(tmp_path, out_path)
+    return float(ratios.sum())
+
+
+def remove_projection(embeddings_path: str):
+    """Supprime les artefacts PCA (périmés dès que le float32 change)."""
+    for path in (projection_path(embeddings_path), projected_path(embeddings_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_projection(embeddings_path: str, mmap_mode: str | None = None):
+    """(components, matrice projetée), la matrice en RAM ou en memmap (mmap_mode="r")."""
+    with np.load(projection_path(embeddings_path)) as artifact:
+        components = artifact["components"]
+    return components, np.load(projected_path(embeddings_path), mmap_mode=mmap_mode)
+
+
+def projected_scores(components: np.ndarray, projected: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Scores du premier tri dans l'espace réduit (à une constante près) :
+    (N,) pour une requête (d,), (m, N) pour m requêtes (m, d).
+    """
+    return (query.astype(np.float32) @ components.T) @ projected.T
@@ -0,0 +1,163 @@
+"""
+quantization.py
+Stockage compact des embeddings (float16 ou int8) pour le premier tri de
+TalentSearcher, avec re-scoring exact d'une shortlist en float32.
+
+- float16 : simple conversion, 2x plus petit.
+- int8    : quantification scalaire par dimension, 4x plus petit.
+            code = round(x / scale[d]), scale[d] = max |x[:, d]| / 127
+            q . x  ~=  (q * scale) . code
+
+Les fichiers compacts sont écrits à côté de profiles_embeddings.npy :
+profiles_embeddings.float16.npy, profiles_embeddings.int8.npy (+ .scales.npy).
+Le float32 reste sur disque, lu en memmap uniquement pour la shortlist.
+"""
+
+import os
+import warnings
+
+import numpy as np
+
+STORAGE_DTYPES = ("float32", "float16", "int8")
+
+# Lignes traitées à la fois (quantification et scan) : mémoire temporaire bornée
+BLOCK_ROWS = 65_536
+
+
+def quantized_path(embeddings_path: str, dtype: str) -> str:
+    root, ext = os.path.splitext(embeddings_path)
+    return f"{root}.{dtype}{ext}"
+
+
+def scales_path(embeddings_path: str) -> str:
+    root, ext = os.path.splitext(embeddings_path)
+    return f"{root}.int8.scales{ext}"
+
+
+def int8_scales(embeddings: np.ndarray) -> np.ndarray:
+    """Échelle par dimension (max |x| / 127), calculée bloc par bloc."""
+    max_abs = np.zeros(embeddings.shape[1], dtype=np.float32)
+    for start in range(0, len(embeddings), BLOCK_ROWS):
+        block = np.asarray(embeddings[start:start + BLOCK_ROWS], dtype=np.float32)
+        np.maximum(max_abs, np.abs(block).max(axis=0), out=max_abs)
+    return np.maximum(max_abs, 1e-12) / 127.0
+
+
+def write_quantized(embeddings_path: str, dtype: str) -> str:
+    """
+    Écrit la version compacte de `embeddings_path` (lu en memmap, bloc par
+    bloc). Retourne le chemin du fichier écrit.
+    """
+    if dtype not in ("float16", "int8"):
+        raise ValueError(f"Type de stockage inconnu : {dtype} (attendu : float16, int8)")
+
+    embeddings = np.load(embeddings_path, mmap_mode="r")
+    out_path = quantized_path(embeddings_path, dtype)
+    tmp_path = f"{out_path}.tmp.npy"
+
+    scales = None
+    if dtype == "int8":
+        scales = int8_scales(embeddings)
+
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=embeddings.shape)
+    for start in range(0, len(embeddings), BLOCK_ROWS):
+        block = np.asarray(embeddings[start:start + BLOCK_ROWS], dtype=np.float32)
+        if scales is None:
+            out[start:start + len(block)] = block.astype(np.float16)
+        else:
+            out[start:start + len(block)] = np.clip(np.rint(block / scales), -127, 127).astype(np.int8)
+    out.flush()
+    del out
+
+    if scales is not None:
+        np.save(scales_path(embeddings_path), scales)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def remove_quantized(embeddings_path: str):
+    """Supprime les matrices compactes (périmées dès que le float32 change)."""
+    for path in (quantized_path(embeddings_path, "float16"), quantized_path(embeddings_path, "int8"), scales_path(embeddings_path)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def load_compact(embeddings_path: str, dtype: str, mmap_mode: str | None = None):
+    """(matrice compacte, scales ou None), en RAM ou en memmap (mmap_mode="r")."""
+    if dtype == "float32":
+        return np.load(embeddings_path, mmap_mode=mmap_mode), None
+    matrix = np.load(quantized_path(embeddings_path, dtype), mmap_mode=mmap_mode)
+    scales = np.load(scales_path(embeddings_path)) if dtype == "int8" else None
+    return matrix, scales
+
+
+def approx_scores(matrix: np.ndarray, query: np.ndarray, scales: np.ndarray | None = None) -> np.ndarray:
+    """
+    Scores approchés query . x sur la matrice compacte : (N,) pour une
+    requête (d,), (m, N) pour m requêtes (m, d).
+
+    numpy n'a pas de produit matriciel BLAS en float16 / int8 (conversion
+    implicite de toute la matrice) : on passe par torch, déjà présent avec
+    sentence-transformers. L'int8 est converti en float32 par blocs.
+    """
+    import torch
+
+    if matrix.dtype == np.float32:
+        return query.astype(np.float32) @ matrix.T
+
+    with warnings.catch_warnings():
+        # Matrice en memmap lecture seule : torch la lit sans jamais l'écrire
+        warnings.filterwarnings("ignore", message="The given NumPy array is not writable")
+        tensor = torch.from_numpy(matrix)
+
+    if matrix.dtype == np.float16:
+        scores = torch.from_numpy(query.astype(np.float16)) @ tensor.T
+        return scores.float().numpy()
+
+    queries = np.atleast_2d(query)
+    scaled_queries = torch.from_numpy((queries * scales).astype(np.float32))
+    codes = tensor
+    scores = torch.empty((len(queries), len(matrix)), dtype=torch.float32)
+    buffer = torch.empty((min(BLOCK_ROWS, len(matrix)), matrix.shape[1]), dtype=torch.float32)
+    for start in range(0, len(matrix), BLOCK_ROWS):
+        block = codes[start:start + BLOCK_ROWS]
+        dequant = buffer[:len(block)]
+        dequant.copy_(block)
+        scores[:, start:start + len(block)] = scaled_queries @ dequant.T
+    scores = scores.numpy()
+    return scores[0] if query.ndim == 1 else scores
+
+
+def top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices des k meilleurs scores (non triés), sans tri complet."""
+    if k >= len(scores):
+        return np.arange(len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    # Partition sur les scores eux-mêmes (pas de copie négée de taille N)
+    return np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+
+
+def rescore(full_embeddings: np.ndarray, candidates: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Scores exacts (float32) des seules lignes `candidates`, dans leur ordre."""
+    # Lecture dans l'ordre du fichier (memmap)
+    order = np.argsort(candidates)
+    rows = np.asarray(full_embeddings[candidates[order]], dtype=np.float32)
+    exact = np.empty(len(candidates), dtype=np.float32)
+    exact[order] = rows @ query.astype(np.float32)
+    return exact
+
+
+def recall_at_k(full_embeddings, first_stage, queries, k=10, rescore_factor=4) -> float:
+    """
+    Fraction des top-k exacts retrouvés par un premier tri approché
+    (first_stage(query) -> scores) + re-scoring d'une shortlist de
+    k * rescore_factor candidats.
+    """
+    hits = 0
+    for query in queries:
+        exact_top = top_indices(np.asarray(full_embeddings @ query), k)
+        shortlist = top_indices(first_stage(query), k * rescore_factor)
+        approx_top = shortlist[top_indices(rescore(full_embeddings, shortlist, query), k)]
+        hits += len(np.intersect1d(exact_top, approx_top))
+    return hits / (len(exact_top) * len(queries))
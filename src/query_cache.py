@@ -0,0 +1,106 @@
+"""
+query_cache.py
+Cache LRU en mémoire des embeddings de requêtes (descriptions de poste,
+textes de /predict).
+
+Clé : (version du modèle, texte normalisé). La normalisation (Unicode NFC,
+espaces multiples fusionnés, bords retirés) ne change pas la tokenisation :
+deux textes de même clé ont le même embedding. La casse est conservée
+(tous les modèles ne sont pas « uncased »).
+
+Borné en nombre d'entrées (éviction LRU), avec une durée de vie optionnelle.
+Changer de modèle invalide les entrées de l'ancienne version.
+"""
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float | None = None):
+        """
+        max_entries : nombre max d'embeddings gardés (0 = cache désactivé).
+        ttl_seconds : durée de vie d'une entrée (None = pas d'expiration).
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # clé -> (embedding, date d'expiration)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model_version: str, text: str):
+        """Embedding en cache (lecture seule) ou None."""
+        key = (model_version, normalize_text(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, model_version: str, text: str, embedding: np.ndarray):
+        if self.max_entries <= 0:
+            return
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.setflags(write=False)
+        expires = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            key = (model_version, normalize_text(text))
+            self._entries[key] = (embedding, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def encode(self, model, model_version: str, texts, **encode_kwargs) -> np.ndarray:
+        """
+        Embeddings (len(texts), d) : les textes absents du cache sont encodés
+        en un seul appel à model.encode(..., **encode_kwargs) puis ajoutés.
+        """
+        cached = [self.get(model_version, text) for text in texts]
+        missing = [i for i, embedding in enumerate(cached) if embedding is None]
+        if missing:
+            # Doublons dans le lot : un seul encodage par texte normalisé
+            unique = list(dict.fromkeys(normalize_text(texts[i]) for i in missing))
+            encoded = model.encode(unique, convert_to_numpy=True, **encode_kwargs)
+            by_text = dict(zip(unique, encoded))
+            for i in missing:
+                cached[i] = by_text[normalize_text(texts[i])]
+                self.put(model_version, texts[i], cached[i])
+        return np.stack(cached).astype(np.float32, copy=False)
+
+    def invalidate(self, model_version: str | None = None):
+        """Supprime les entrées d'une version du modèle (toutes si None)."""
+        with self._lock:
+            if model_version is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == model_version]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
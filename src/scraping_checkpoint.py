@@ -0,0 +1,160 @@
+"""
+scraping_checkpoint.py
+Écriture incrémentale et reprise du scraping GitHub.
+
+Les repos sont écrits au fil de l'eau dans des shards CSV append-only
+(data/raw/github_repos_shards/part-00001.csv, ...). Après chaque shard, les
+logins qu'il contient sont ajoutés au journal de progression
+(progress.jsonl). Un run interrompu reprend donc au dernier shard écrit, et
+les users rafraîchis récemment (fenêtre `max_age`) ne sont pas re-scrapés.
+
+À la fin, consolidate_shards() reconstruit github_repos.csv en gardant, pour
+chaque login, uniquement la version la plus récente.
+"""
+
+import json
+import os
+import re
+import time
+
+import pandas as pd
+
+SHARD_PATTERN = re.compile(r"^part-(\d+)\.csv$")
+
+REPO_COLUMNS = [
+    "owner_login",
+    "repo_name",
+    "description",
+    "language",
+    "stargazers_count",
+    "html_url",
+]
+
+
+def list_shards(shard_dir):
+    """Retourne [(numéro, chemin)] des shards triés par numéro."""
+    if not os.path.isdir(shard_dir):
+        return []
+    shards = []
+    for name in os.listdir(shard_dir):
+        m = SHARD_PATTERN.match(name)
+        if m:
+            shards.append((int(m.group(1)), os.path.join(shard_dir, name)))
+    return sorted(shards)
+
+
+class ProgressJournal:
+    """
+    Journal JSONL append-only : une ligne par login terminé
+    {"login", "fetched_at", "shard", "n_repos"}.
+    La dernière ligne d'un login fait foi.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Dernière ligne tronquée par un crash : on l'ignore
+                        continue
+                    self.entries[entry["login"]] = entry
+
+    def is_fresh(self, login, max_age=None):
+        """True si le login a été récupéré il y a moins de `max_age` secondes."""
+        entry = self.entries.get(str(login))
+        if entry is None:
+            return False
+        if max_age is None:
+            return True
+        return time.time() - entry["fetched_at"] < max_age
+
+    def record(self, entries):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                self.entries[entry["login"]] = entry
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class ShardWriter:
+    """
+    Accumule les repos et écrit un nouveau shard dès `shard_size` lignes.
+    Les logins ne sont journalisés qu'une fois leur shard écrit sur disque.
+    """
+
+    def __init__(self, shard_dir, journal, shard_size=1000):
+        self.shard_dir = shard_dir
+        self.journal = journal
+        self.shard_size = shard_size
+        os.makedirs(shard_dir, exist_ok=True)
+
+        shards = list_shards(shard_dir)
+        self.next_shard = shards[-1][0] + 1 if shards else 1
+
+        self.rows = []
+        self.pending = []
+        self.total_rows = 0
+
+    def add(self, login, repos):
+        self.rows.extend(repos)
+        self.pending.append({"login": str(login), "n_repos": len(repos)})
+        if len(self.rows) >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        shard = self.next_shard
+        if self.rows:
+            path = os.path.join(self.shard_dir, f"part-{shard:05d}.csv")
+            tmp_path = f"{path}.tmp"
+            pd.DataFrame(self.rows, columns=REPO_COLUMNS).to_csv(tmp_path, index=False, encoding="utf-8")
+            os.replace(tmp_path, path)
+            self.next_shard += 1
+
+        now = time.time()
+        self.journal.record(
+            {**p, "fetched_at": now, "shard": shard} for p in self.pending
+        )
+
+        self.total_rows += len(self.rows)
+        self.rows = []
+        self.pending = []
+
+    def close(self):
+        self.flush()
+
+
+def consolidate_shards(shard_dir, output_path, journal, chunksize=100_000):
+    """
+    Reconstruit le CSV final en streaming : pour chaque login on ne garde que
+    les lignes du shard référencé par sa dernière entrée de journal.
+    """
+    latest_shard = {login: e["shard"] for login, e in journal.entries.items()}
+
+    tmp_path = f"{output_path}.tmp"
+    nb_rows = 0
+    header = True
+    with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+        for shard, path in list_shards(shard_dir):
+            # dtype=str + keep_default_na=False : le texte est recopié tel quel
+            for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+                keep = chunk["owner_login"].map(latest_shard) == shard
+                chunk = chunk[keep]
+                chunk.to_csv(out, index=False, header=header)
+                header = False
+                nb_rows += len(chunk)
+
+        if header:
+            pd.DataFrame(columns=REPO_COLUMNS).to_csv(out, index=False)
+
+    os.replace(tmp_path, output_path)
+    return nb_rows
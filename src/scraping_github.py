@@ -1,14 +1,35 @@
 import os
+import random
+import sys
 import time
 import requests
 import pandas as pd
 
+# Ajouter le répertoire racine au path (pour les imports src.*)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.github_cache import RepoCache
+from src.scraping_checkpoint import ProgressJournal, ShardWriter, consolidate_shards
+
 
 # 👉 MET TON TOKEN ICI
 # Exemple : GITHUB_TOKEN = "ghp_xxxxxxxx..."
 # Si tu laisses None, ça marchera mais avec beaucoup moins de requêtes possibles
 GITHUB_TOKEN = None
 
+# URL de base de l'API (surchargeable pour tester contre un serveur local)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+# Attente max entre deux essais quand GitHub ne donne pas d'indication
+MAX_BACKOFF = 60.0
+
+# Paramètres de la requête /users/{login}/repos
+REPOS_PARAMS = {
+    "per_page": 5,     # max 5 repos
+    "sort": "updated", # les plus récents / mis à jour en premier
+    "direction": "desc",
+}
+
 
 def get_base_dir():
     """Retourne le chemin du dossier de base du projet (Talent_hunter_nlp)."""
@@ -44,94 +65,245 @@ def load_users(max_users=500):
     return df
 
 
-def fetch_repos_for_user(login):
+def build_headers(token=GITHUB_TOKEN):
+    """Headers communs à toutes les requêtes vers l'API GitHub."""
+    headers = {
+        "Accept": "application/vnd.github+json",
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def backoff_delay(headers, attempt):
+    """
+    Temps d'attente avant de réessayer après un 403/429/5xx : Retry-After si
+    présent, sinon le reset du rate limit, sinon un backoff exponentiel.
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+        try:
+            return max(0.0, float(headers["X-RateLimit-Reset"]) - time.time()) + 1
+        except ValueError:
+            pass
+
+    return min(MAX_BACKOFF, 2 ** attempt) + random.random()
+
+
+def parse_repos(login, repos):
+    """Extrait seulement les infos qui nous intéressent de la réponse JSON."""
+    repos_data = []
+    for repo in repos:
+        repos_data.append({
+            "owner_login": login,
+            "repo_name": repo.get("name", ""),
+            "description": repo.get("description") or "",
+            "language": repo.get("language") or "",
+            "stargazers_count": repo.get("stargazers_count", 0),
+            "html_url": repo.get("html_url", ""),
+        })
+    return repos_data
+
+
+def fetch_repos_for_user(login, cache=None):
     """
     Récupère les repos publics d'un utilisateur via l'API GitHub.
     On limite à 5 repos par user (les plus récents).
+
+    Si un RepoCache est fourni, la requête est conditionnelle (ETag /
+    Last-Modified) et un 304 renvoie les lignes déjà en cache.
+
+    Retourne None en cas d'échec (réseau, 403, ...) pour que l'user ne soit
+    pas marqué comme traité dans le journal, et [] si l'user n'existe pas.
     """
-    url = f"https://api.github.com/users/{login}/repos"
-    params = {
-        "per_page": 5,     # max 5 repos
-        "sort": "updated", # les plus récents / mis à jour en premier
-        "direction": "desc",
-    }
+    url = f"{GITHUB_API_URL}/users/{login}/repos"
 
-    headers = {
-        "Accept": "application/vnd.github+json",
-    }
-    if GITHUB_TOKEN:
-        headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
+    headers = build_headers()
+    entry = cache.get(login, REPOS_PARAMS) if cache is not None else None
+    if entry is not None:
+        headers.update(cache.conditional_headers(entry))
 
     try:
-        r = requests.get(url, headers=headers, params=params, timeout=20)
+        r = requests.get(url, headers=headers, params=REPOS_PARAMS, timeout=20)
     except requests.exceptions.RequestException as e:
         print(f"[ERREUR] Problème réseau pour l'utilisateur {login}: {e}")
-        return []
+        return None
 
-    if r.status_code == 403:
+    if r.status_code == 304 and entry is not None:
+        return cache.reuse(entry)
+    elif r.status_code == 403:
         print(f"[ERREUR] 403 (rate limit ou accès refusé) pour {login}.")
-        return []
+        return None
     elif r.status_code == 404:
         print(f"[INFO] Utilisateur {login} introuvable (404).")
         return []
     elif r.status_code != 200:
         print(f"[ERREUR] Code HTTP {r.status_code} pour {login}.")
-        return []
+        return None
 
     try:
         repos = r.json()
     except ValueError:
         print(f"[ERREUR] Réponse JSON invalide pour {login}.")
-        return []
+        return None
 
-    # On extrait seulement les infos qui nous intéressent
-    repos_data = []
-    for repo in repos:
-        repos_data.append({
-            "owner_login": login,
-            "repo_name": repo.get("name", ""),
-            "description": repo.get("description") or "",
-            "language": repo.get("language") or "",
-            "stargazers_count": repo.get("stargazers_count", 0),
-            "html_url": repo.get("html_url", ""),
-        })
+    repos_data = parse_repos(login, repos)
+    if cache is not None:
+        cache.put(login, REPOS_PARAMS, r.headers, repos_data)
 
     return repos_data
 
 
-def main():
+def main(
+    mode="sync",
+    concurrency=10,
+    use_cache=True,
+    max_age_hours=24.0,
+    shard_size=1000,
+    batch_size=50,
+    repos_per_user=REPOS_PARAMS["per_page"],
+):
+    """
+    mode="sync"   : un utilisateur à la fois (comportement historique).
+    mode="async"  : requêtes concurrentes (cf. src/github_async.py), au plus
+                    `concurrency` connexions ouvertes en même temps.
+    mode="graphql": `batch_size` users par requête GraphQL, `repos_per_user`
+                    repos par user (cf. src/github_graphql.py, token requis).
+    use_cache     : requêtes conditionnelles via le cache ETag (data/cache/github).
+    max_age_hours : les users récupérés il y a moins longtemps sont sautés
+                    (None = jamais re-scrapés, 0 = tout re-scraper).
+    shard_size    : nombre de repos par shard écrit sur disque.
+
+    Les repos sont écrits au fil de l'eau dans data/raw/github_repos_shards/
+    (cf. src/scraping_checkpoint.py) : un run interrompu reprend là où il
+    s'était arrêté. github_repos.csv est reconstruit à partir des shards.
+    """
     base_dir = get_base_dir()
     raw_dir = os.path.join(base_dir, "data", "raw")
     os.makedirs(raw_dir, exist_ok=True)
     repos_output_path = os.path.join(raw_dir, "github_repos.csv")
+    shard_dir = os.path.join(raw_dir, "github_repos_shards")
 
     # 1) Charger les utilisateurs Kaggle (par ex. 500 pour commencer)
     users_df = load_users(max_users=30)
 
-    all_repos = []
-    total_users = len(users_df)
-
-    for i, (_, row) in enumerate(users_df.iterrows(), start=1):
-        login = row["login"]
-        print(f"[{i}/{total_users}] Récupération des repos pour : {login}")
+    cache = RepoCache() if use_cache else None
 
+    # 2) Reprise : on saute les users déjà récupérés récemment
+    journal = ProgressJournal(os.path.join(shard_dir, "progress.jsonl"))
+    max_age = max_age_hours * 3600 if max_age_hours is not None else None
+    logins = [login for login in users_df["login"] if not journal.is_fresh(login, max_age)]
+    skipped = len(users_df) - len(logins)
+    if skipped:
+        print(f"[INFO] {skipped} utilisateurs déjà à jour (journal), ignorés.")
 
-        repos = fetch_repos_for_user(login)
-        all_repos.extend(repos)
+    writer = ShardWriter(shard_dir, journal, shard_size=shard_size)
+    total_users = len(logins)
 
-        # Petit sleep pour être gentils avec l'API (surtout si pas de token)
-        time.sleep(0.5)
-
-    if not all_repos:
+    try:
+        if mode == "async":
+            from src.github_async import fetch_all_repos
+
+            print(f"[INFO] Mode async : {concurrency} connexions simultanées max")
+            fetch_all_repos(logins, concurrency=concurrency, cache=cache, on_result=writer.add)
+        elif mode == "graphql":
+            from src.github_graphql import fetch_repos_graphql
+
+            print(f"[INFO] Mode GraphQL : {batch_size} users par requête, {repos_per_user} repos par user")
+            fetch_repos_graphql(
+                logins,
+                batch_size=batch_size,
+                repos_per_user=repos_per_user,
+                on_result=writer.add,
+            )
+        else:
+            for i, login in enumerate(logins, start=1):
+                print(f"[{i}/{total_users}] Récupération des repos pour : {login}")
+
+                repos = fetch_repos_for_user(login, cache=cache)
+                if repos is not None:
+                    writer.add(login, repos)
+
+                # Petit sleep pour être gentils avec l'API (surtout si pas de token)
+                time.sleep(0.5)
+    finally:
+        # Même en cas d'interruption, on écrit ce qui a été récupéré
+        writer.close()
+
+    if cache is not None:
+        cache.report()
+
+    print(f"[INFO] Nombre de repos récupérés pendant ce run : {writer.total_rows}")
+
+    nb_rows = consolidate_shards(shard_dir, repos_output_path, journal)
+    if nb_rows == 0:
         print("[ATTENTION] Aucune donnée de repo récupérée.")
         return
 
-    repos_df = pd.DataFrame(all_repos)
-    print(f"[INFO] Nombre total de repos récupérés : {len(repos_df)}")
-
-    repos_df.to_csv(repos_output_path, index=False, encoding="utf-8")
+    print(f"[INFO] Nombre total de repos (tous runs) : {nb_rows}")
     print(f"[OK] Données repos sauvegardées dans : {repos_output_path}")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Scraping des repos GitHub")
+    parser.add_argument(
+        "--mode",
+        type=str,
+        choices=["sync", "async", "graphql"],
+        default="sync",
+        help="sync (un user à la fois), async (requêtes concurrentes) ou graphql (plusieurs users par requête)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=10,
+        help="Nombre max de connexions simultanées (mode async uniquement)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Désactive le cache ETag (tout est re-téléchargé)"
+    )
+    parser.add_argument(
+        "--max-age-hours",
+        type=float,
+        default=24.0,
+        help="Fenêtre de fraîcheur : les users récupérés plus récemment sont ignorés"
+    )
+    parser.add_argument(
+        "--shard-size",
+        type=int,
+        default=1000,
+        help="Nombre de repos par shard écrit sur disque"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Nombre de users par requête (mode graphql uniquement)"
+    )
+    parser.add_argument(
+        "--repos-per-user",
+        type=int,
+        default=REPOS_PARAMS["per_page"],
+        help="Nombre de repos récupérés par user (mode graphql uniquement)"
+    )
+    args = parser.parse_args()
+
+    main(
+        mode=args.mode,
+        concurrency=args.concurrency,
+        use_cache=not args.no_cache,
+        max_age_hours=args.max_age_hours,
+        shard_size=args.shard_size,
+        batch_size=args.batch_size,
+        repos_per_user=args.repos_per_user,
+    )